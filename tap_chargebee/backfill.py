@@ -0,0 +1,123 @@
+"""Plans of backfills split into time slices, resumable from the stream state."""
+
+from __future__ import annotations
+
+import math
+
+#: Maximum number of time slices in a backfill. Longer backfills get wider slices.
+MAX_BACKFILL_SLICES = 100
+
+
+class BackfillPlan:
+    """Equal time slices of a backfill window, and which of them are complete.
+
+    The plan is saved in the stream state by its bounds and slice width, with the
+    complete slices as ranges of slice indexes, so the state stays small however
+    many slices complete.
+    """
+
+    def __init__(
+        self,
+        start: int,
+        end: int,
+        step: int,
+        completed: set[int] | None = None,
+    ) -> None:
+        """Create a plan.
+
+        Args:
+            start: Start of the window, as an inclusive unix timestamp.
+            end: End of the window, as an exclusive unix timestamp.
+            step: Width of the slices in seconds; the last one may be narrower.
+            completed: Indexes of the complete slices.
+        """
+        self.start = start
+        self.end = end
+        self.step = step
+        self.completed = completed or set()
+
+    @classmethod
+    def create(
+        cls,
+        start: int,
+        end: int,
+        step: int,
+        max_slices: int = MAX_BACKFILL_SLICES,
+    ) -> BackfillPlan:
+        """Plan a backfill, widening slices so there are at most `max_slices`.
+
+        Args:
+            start: Start of the window, as an inclusive unix timestamp.
+            end: End of the window, as an exclusive unix timestamp.
+            step: Requested width of the slices in seconds.
+            max_slices: Maximum number of slices.
+
+        Returns:
+            The plan.
+        """
+        return cls(start, end, max(step, math.ceil((end - start) / max_slices)))
+
+    @classmethod
+    def from_state(cls, state: dict) -> BackfillPlan:
+        """Load a plan saved by `to_state`.
+
+        Args:
+            state: The `backfill` entry of the stream state.
+
+        Returns:
+            The plan.
+        """
+        return cls(
+            state["start"],
+            state["end"],
+            state["step"],
+            {
+                index
+                for lower, upper in state["completed"]
+                for index in range(lower, upper)
+            },
+        )
+
+    def to_state(self) -> dict:
+        """Return the plan to save in the stream state.
+
+        Returns:
+            The window bounds, the slice width, and the `[start, end)` ranges of
+            indexes of the complete slices.
+        """
+        ranges: list[list[int]] = []
+        for index in sorted(self.completed):
+            if ranges and ranges[-1][1] == index:
+                ranges[-1][1] = index + 1
+            else:
+                ranges.append([index, index + 1])
+        return {
+            "start": self.start,
+            "end": self.end,
+            "step": self.step,
+            "completed": ranges,
+        }
+
+    @property
+    def slices(self) -> list[list[int]]:
+        """Return the `[start, end)` unix timestamp bounds of every slice.
+
+        Returns:
+            The slices, in order.
+        """
+        return [
+            [lower, min(lower + self.step, self.end)]
+            for lower in range(self.start, self.end, self.step)
+        ]
+
+    def pending(self) -> list[tuple[int, list[int]]]:
+        """Return the slices that are not complete.
+
+        Returns:
+            The index and bounds of each pending slice.
+        """
+        return [
+            (index, bounds)
+            for index, bounds in enumerate(self.slices)
+            if index not in self.completed
+        ]
@@ -0,0 +1,177 @@
+"""Batch files for the SDK's BATCH message mode."""
+
+from __future__ import annotations
+
+import contextlib
+import gzip
+import json
+import threading
+import typing as t
+from dataclasses import dataclass
+from uuid import uuid4
+
+from singer_sdk.batch import BaseBatcher, lazy_chunked_generator
+from singer_sdk.helpers._batch import BaseBatchFileEncoding
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore[assignment]
+
+if t.TYPE_CHECKING:
+    from types import ModuleType
+
+    import pyarrow as pa
+
+# Creating the storage root is not safe across concurrently synced streams.
+_STORAGE_LOCK = threading.Lock()
+
+
+@dataclass
+class ParquetEncoding(BaseBatchFileEncoding):
+    """Parquet encoding for batch files, registered as the `parquet` format."""
+
+    __encoding_format__ = "parquet"
+
+
+def _require_pyarrow() -> ModuleType:
+    # Imported on first use: it is slow to import, and only writes Parquet files.
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet  # Loads `pa.parquet`.
+    except ImportError as e:  # pragma: no cover - optional dependency
+        msg = "Parquet batch files require the `parquet` extra (pyarrow)."
+        raise RuntimeError(msg) from e
+    return pa
+
+
+def _encode_jsonl(records: t.Iterable[dict]) -> t.Iterator[bytes]:
+    if orjson is not None:
+        for record in records:
+            yield orjson.dumps(record, default=str) + b"\n"
+        return
+    for record in records:
+        yield (json.dumps(record, default=str) + "\n").encode()
+
+
+def _arrow_type(schema: dict) -> pa.DataType:
+    pa = _require_pyarrow()
+    types = schema.get("type", [])
+    types = [types] if isinstance(types, str) else types
+    if "integer" in types:
+        return pa.int64()
+    if "number" in types:
+        return pa.float64()
+    if "boolean" in types:
+        return pa.bool_()
+    # Strings, and nested objects and arrays as JSON text.
+    return pa.string()
+
+
+def arrow_schema(schema: dict) -> pa.Schema:
+    """Return the Arrow schema of a stream's top-level properties.
+
+    Args:
+        schema: The stream's JSON schema.
+
+    Returns:
+        A `pyarrow.Schema` with one nullable column per property.
+    """
+    pa = _require_pyarrow()
+    return pa.schema(
+        [
+            pa.field(name, _arrow_type(prop))
+            for name, prop in schema.get("properties", {}).items()
+        ],
+    )
+
+
+def _arrow_value(value: object) -> object:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return value
+
+
+class ChargebeeBatcher(BaseBatcher):
+    """Writes batches of records as JSON Lines or Parquet files.
+
+    JSON Lines files are gzip compressed unless the encoding's compression is
+    `none`. Parquet files are written with the `parquet` extra, storing nested
+    objects and arrays as JSON text.
+    """
+
+    def __init__(self, *args: t.Any, schema: dict, **kwargs: t.Any) -> None:
+        """Create a batcher.
+
+        Args:
+            *args: Positional arguments for the SDK `BaseBatcher`.
+            schema: The JSON schema of the batched records.
+            **kwargs: Keyword arguments for the SDK `BaseBatcher`.
+
+        Raises:
+            RuntimeError: If Parquet files are requested without `pyarrow`.
+        """
+        super().__init__(*args, **kwargs)
+        self.schema = schema
+        if isinstance(self.batch_config.encoding, ParquetEncoding):
+            _require_pyarrow()
+
+    def get_batches(self, records: t.Iterator[dict]) -> t.Iterator[list[str]]:
+        """Yield the manifest of each batch file written.
+
+        Args:
+            records: The records to batch.
+
+        Yields:
+            A list holding the URL of one batch file.
+        """
+        sync_id = f"{self.tap_name}--{self.stream_name}-{uuid4()}"
+        prefix = self.batch_config.storage.prefix or ""
+        encoding = self.batch_config.encoding
+        parquet = isinstance(encoding, ParquetEncoding)
+        compressed = encoding.compression != "none"
+        if parquet:
+            extension = ".parquet"
+        elif compressed:
+            extension = ".json.gz"
+        else:
+            extension = ".json"
+        schema = arrow_schema(self.schema) if parquet else None
+
+        with contextlib.ExitStack() as stack:
+            with _STORAGE_LOCK:
+                fs = stack.enter_context(self.batch_config.storage.fs(create=True))
+            for index, chunk in enumerate(
+                lazy_chunked_generator(records, self.batch_config.batch_size),
+                start=1,
+            ):
+                filename = f"{prefix}{sync_id}-{index}{extension}"
+                with fs.open(filename, "wb") as f:
+                    if parquet:
+                        self._write_parquet(f, chunk, schema, compressed=compressed)
+                    elif compressed:
+                        with gzip.GzipFile(fileobj=f, mode="wb") as gz:
+                            gz.writelines(_encode_jsonl(chunk))
+                    else:
+                        f.writelines(_encode_jsonl(chunk))
+                yield [fs.geturl(filename)]
+
+    @staticmethod
+    def _write_parquet(
+        f: t.IO[bytes],
+        records: t.Iterator[dict],
+        schema: pa.Schema,
+        *,
+        compressed: bool,
+    ) -> None:
+        pa = _require_pyarrow()
+        columns: dict[str, list] = {name: [] for name in schema.names}
+        for record in records:
+            for name, values in columns.items():
+                values.append(_arrow_value(record.get(name)))
+        table = pa.table(columns, schema=schema)
+        pa.parquet.write_table(
+            table,
+            f,
+            compression="gzip" if compressed else "none",
+        )
@@ -0,0 +1,92 @@
+"""Files cached on disk across tap invocations."""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+
+try:
+    from importlib import metadata
+except ImportError:  # pragma: no cover - Python < 3.8
+    import importlib_metadata as metadata  # type: ignore[no-redef]
+
+#: Name of the distribution installing the tap.
+DISTRIBUTION_NAME = "GtheSheep-tap-chargebee"
+
+
+def default_cache_dir() -> Path:
+    """Return the default cache directory, under `$XDG_CACHE_HOME` or `~/.cache`.
+
+    Returns:
+        The directory path.
+    """
+    root = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(root) / "tap-chargebee"
+
+
+def _distribution_version(name: str) -> str:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def package_fingerprint() -> str:
+    """Return a fingerprint of the installed tap and SDK.
+
+    It changes with the tap and SDK versions, and with the size or modification time
+    of the tap's modules, so editable installs do not read stale entries.
+
+    Returns:
+        A short hex digest.
+    """
+    sources = [
+        (path.name, stat.st_size, stat.st_mtime_ns)
+        for path in sorted(Path(__file__).parent.glob("*.py"))
+        for stat in [path.stat()]
+    ]
+    fingerprint = [
+        _distribution_version(DISTRIBUTION_NAME),
+        _distribution_version("singer-sdk"),
+        sources,
+    ]
+    return hashlib.sha256(json.dumps(fingerprint).encode()).hexdigest()[:16]
+
+
+def read_json_file(path: Path) -> Any | None:
+    """Read a cached JSON file.
+
+    Args:
+        path: The file to read.
+
+    Returns:
+        The decoded document, or None if the file is missing or unreadable.
+    """
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def write_json_file(path: Path, document: object) -> None:
+    """Atomically write a JSON file, so concurrent invocations never read a partial one.
+
+    Args:
+        path: The file to write.
+        document: The JSON document.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w") as tmp:
+            json.dump(document, tmp)
+        Path(tmp_path).replace(path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            Path(tmp_path).unlink()
+        raise
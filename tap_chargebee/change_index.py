@@ -0,0 +1,214 @@
+"""On-disk index of emitted record versions, to sync full-table streams by change."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+from typing import TYPE_CHECKING, Iterable
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS partitions (
+    stream TEXT NOT NULL,
+    site TEXT NOT NULL,
+    committed_run INTEGER,
+    pending_run INTEGER,
+    PRIMARY KEY (stream, site)
+);
+CREATE TABLE IF NOT EXISTS digests (
+    stream TEXT NOT NULL,
+    site TEXT NOT NULL,
+    key TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    PRIMARY KEY (stream, site, key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS pending (
+    stream TEXT NOT NULL,
+    site TEXT NOT NULL,
+    key TEXT NOT NULL,
+    digest TEXT,
+    PRIMARY KEY (stream, site, key)
+) WITHOUT ROWID;
+"""
+
+
+def record_digest(record: dict) -> str:
+    """Return a digest identifying the version of a record.
+
+    Args:
+        record: The record, after `post_process`.
+
+    Returns:
+        The record's `resource_version` if it has one, otherwise a hash of its
+        content.
+    """
+    version = record.get("resource_version")
+    if version is not None:
+        return str(version)
+    content = json.dumps(record, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(content.encode(), digest_size=12).hexdigest()
+
+
+class ChangeIndex:
+    """Digests of the records last emitted by each stream partition, in SQLite.
+
+    Changes found by a run are saved as pending, and only replace the committed
+    digests once the next run starts from a state that includes that run (see
+    `load`): if the target never received the state of a run, its changes are
+    emitted again. If the state matches neither run, the partition is reset and
+    every record is emitted.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Open the index, creating it if needed.
+
+        Args:
+            path: The SQLite database file.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(path), check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.executescript(_SCHEMA)
+
+    def load(self, stream: str, site: str, run: int | None) -> dict[str, str]:
+        """Return the committed digests of a stream partition.
+
+        Args:
+            stream: The stream name.
+            site: The site ID.
+            run: The change index run recorded in the partition's state, if any.
+
+        Returns:
+            The digest of each record emitted up to `run`, by record key.
+        """
+        partition = (stream, site)
+        with self._lock, self._connection as connection:
+            row = connection.execute(
+                "SELECT committed_run, pending_run FROM partitions "
+                "WHERE stream = ? AND site = ?",
+                partition,
+            ).fetchone()
+            committed_run, pending_run = row or (None, None)
+            if run is not None and run == pending_run:
+                # The target received the state of the last run: commit its changes.
+                connection.execute(
+                    "INSERT OR REPLACE INTO digests "
+                    "SELECT stream, site, key, digest FROM pending "
+                    "WHERE stream = ? AND site = ? AND digest IS NOT NULL",
+                    partition,
+                )
+                connection.execute(
+                    "DELETE FROM digests WHERE stream = ? AND site = ? AND key IN "
+                    "(SELECT key FROM pending "
+                    "WHERE stream = ? AND site = ? AND digest IS NULL)",
+                    partition * 2,
+                )
+                committed_run = run
+            elif run is None or run != committed_run:
+                connection.execute(
+                    "DELETE FROM digests WHERE stream = ? AND site = ?",
+                    partition,
+                )
+                committed_run = None
+            connection.execute(
+                "DELETE FROM pending WHERE stream = ? AND site = ?",
+                partition,
+            )
+            connection.execute(
+                "INSERT OR REPLACE INTO partitions VALUES (?, ?, ?, NULL)",
+                (*partition, committed_run),
+            )
+            return dict(
+                connection.execute(
+                    "SELECT key, digest FROM digests WHERE stream = ? AND site = ?",
+                    partition,
+                ),
+            )
+
+    def save(
+        self,
+        stream: str,
+        site: str,
+        run: int,
+        changes: Iterable[tuple[str, str | None]],
+    ) -> None:
+        """Save the changes found by a run, pending until the run's state is received.
+
+        Args:
+            stream: The stream name.
+            site: The site ID.
+            run: The run, which is recorded in the partition's state.
+            changes: The new digest of each changed record by key, None for deleted
+                records.
+        """
+        partition = (stream, site)
+        with self._lock, self._connection as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO pending VALUES (?, ?, ?, ?)",
+                ((*partition, key, digest) for key, digest in changes),
+            )
+            connection.execute(
+                "UPDATE partitions SET pending_run = ? WHERE stream = ? AND site = ?",
+                (run, *partition),
+            )
+
+    def close(self) -> None:
+        """Close the database."""
+        self._connection.close()
+
+
+class PartitionChanges:
+    """Compares the records of a stream partition with their committed digests."""
+
+    def __init__(self, digests: dict[str, str], key_properties: list[str]) -> None:
+        """Start comparing.
+
+        Args:
+            digests: The committed digests, from `ChangeIndex.load`.
+            key_properties: The properties identifying a record in the partition.
+        """
+        self.digests = digests
+        self.key_properties = key_properties
+        self.changes: list[tuple[str, str | None]] = []
+        self.unchanged = 0
+        self.deleted = 0
+        self._seen: set[str] = set()
+
+    def is_changed(self, record: dict) -> bool:
+        """Return whether a record is new or changed since it was last emitted.
+
+        Args:
+            record: The record, after `post_process`.
+
+        Returns:
+            True if the record must be emitted.
+        """
+        key = json.dumps([record.get(name) for name in self.key_properties])
+        digest = record_digest(record)
+        self._seen.add(key)
+        if self.digests.get(key) == digest:
+            self.unchanged += 1
+            return False
+        self.changes.append((key, digest))
+        return True
+
+    def tombstones(self) -> list[dict]:
+        """Return tombstones of the records that disappeared, once all were compared.
+
+        Returns:
+            A record per disappeared record, holding its key properties and
+            `deleted` set to true.
+        """
+        tombstones = []
+        for key in sorted(self.digests.keys() - self._seen):
+            self.deleted += 1
+            self.changes.append((key, None))
+            tombstones.append(
+                {**dict(zip(self.key_properties, json.loads(key))), "deleted": True},
+            )
+        return tombstones
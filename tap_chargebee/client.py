@@ -2,42 +2,706 @@
 
 from __future__ import annotations
 
-from pathlib import Path
-from typing import Any, Callable, Iterable
+import asyncio
+import datetime
+import enum
+import json
+import math
+import operator
+import re
+import sys
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Callable,
+    Generator,
+    Iterable,
+    Iterator,
+)
 
 import requests
+from singer_sdk import metrics
+from singer_sdk._singerlib.messages import RecordMessage, format_message
 from singer_sdk.authenticators import BasicAuthenticator
+from singer_sdk.exceptions import (
+    ConfigValidationError,
+    FatalAPIError,
+    RetriableAPIError,
+)
+from singer_sdk.helpers._batch import BaseBatchFileEncoding, BatchConfig  # noqa: TCH002
+from singer_sdk.helpers._typing import (
+    TypeConformanceLevel,
+    conform_record_data_types,
+)
+from singer_sdk.helpers._util import utc_now
 from singer_sdk.helpers.jsonpath import extract_jsonpath
-from singer_sdk.helpers._typing import TypeConformanceLevel
-from singer_sdk.pagination import BaseAPIPaginator  # noqa: TCH002
+from singer_sdk.mapper import DefaultStreamMap
+from singer_sdk.pagination import BaseAPIPaginator
 from singer_sdk.streams import RESTStream
+from singer_sdk.streams.core import REPLICATION_FULL_TABLE
+
+from tap_chargebee.backfill import BackfillPlan
+from tap_chargebee.custom_fields import (
+    META_DATA,
+    infer_custom_fields,
+    merge_properties,
+)
+from tap_chargebee.dedupe import BoundaryIndex
+from tap_chargebee.instrumentation import Stage, StageTimer
+from tap_chargebee.offload import EncodedRecord, RecordOffload
+from tap_chargebee.parsing import (
+    ListPageParser,
+    envelope_resource,
+    iter_envelope_records,
+    json_loads,
+    read_next_offset,
+)
+from tap_chargebee.projection import Projection, compile_projection, project
+from tap_chargebee.scheduling import add_sync, expected_seconds
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+    from singer_sdk._singerlib import Catalog
+
+    from tap_chargebee.change_index import PartitionChanges
 
 _Auth = Callable[[requests.PreparedRequest], requests.PreparedRequest]
 
+#: Shortest time slice a stream is split into by `planned_slices`.
+MIN_PLANNED_SLICE_SECONDS = 60 * 60
+#: Seconds between STATE messages saving backfill progress, unless
+#: `checkpoint_seconds` is set.
+BACKFILL_STATE_SECONDS = 30
+
+# Context keys bounding a backfill time slice, as unix timestamps.
+WINDOW_START = "window_start"
+WINDOW_END = "window_end"
+# Context key holding the `[after]` bound of a query resumed from a checkpoint.
+CHECKPOINT_AFTER = "checkpoint_after"
+# Context key of queries that must not apply the configured `filters`.
+UNFILTERED = "unfiltered"
+# Context key of the site partition of streams synced with `sites`, and the record
+# property tagging each record with its site.
+SITE_ID = "site_id"
+# Context key of reads that need the parsed records rather than encoded messages.
+RAW_RECORDS = "raw_records"
+# Context key of child stream reads, holding a `ParentBatch` of parent records.
+PARENT_RECORDS = "parent_records"
+# Context key of reads of specific records, holding their IDs.
+RECORD_IDS = "record_ids"
+# Child context key of a single parent record, before it is batched.
+_PARENT_RECORD = "parent_record"
+# Context keys that only shape the requests of a read.
+_QUERY_KEYS = (
+    WINDOW_START,
+    WINDOW_END,
+    CHECKPOINT_AFTER,
+    UNFILTERED,
+    RAW_RECORDS,
+    PARENT_RECORDS,
+    RECORD_IDS,
+)
+
+# Operators of the Chargebee list filters, by type of the filtered field.
+ID_FILTERS = ("is", "is_not", "starts_with", "in", "not_in")
+STRING_FILTERS = ("is", "is_not", "starts_with")
+ENUM_FILTERS = ("is", "is_not", "in", "not_in")
+BOOLEAN_FILTERS = ("is",)
+NUMBER_FILTERS = ("is", "is_not", "lt", "lte", "gt", "gte", "between")
+TIMESTAMP_FILTERS = ("after", "before", "on", "between")
+# Operators taking a list of values.
+_LIST_FILTERS = {"in", "not_in", "between"}
+_FILTER_PARAM = re.compile(r"^(\w+)\[(\w+)\]$")
+# Operators matching records whose field is missing.
+_NEGATED_FILTERS = {"is_not", "not_in"}
+_FILTER_COMPARISONS = {
+    "lt": operator.lt,
+    "lte": operator.le,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "after": operator.gt,
+    "before": operator.lt,
+    "on": operator.eq,
+}
+
+# Largest page size the Chargebee list API accepts.
+MAX_PAGE_SIZE = 100
+# Maximum number of parent records whose children are synced at once, which is
+# also the number of IDs sent in one `<parent>_id[in]` filter.
+MAX_PARENT_BATCH = 100
+
+# Response attribute holding the `next_offset` read while parsing the page.
+_NEXT_OFFSET_ATTR = "_chargebee_next_offset"
+# Response attribute holding the time spent waiting for the response.
+_HTTP_WAIT_ATTR = "_chargebee_http_wait"
+# Request attribute holding the ID of the site the request is sent to.
+_SITE_ATTR = "_chargebee_site_id"
+_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class ChargebeeMetric(str, enum.Enum):
+    """Tap-specific metrics logged alongside the SDK's own."""
+
+    PAGE_SIZE = "page_size"
+    PAGE_DURATION = "page_duration"
+    STAGE_DURATION = "stage_duration"
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a `Retry-After` header into a number of seconds.
+
+    Args:
+        value: The header value, either delay seconds or an HTTP date.
+
+    Returns:
+        The number of seconds to wait, or None if the header is missing or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def _filter_text(value: object) -> str:
+    return json.dumps(value) if isinstance(value, bool) else str(value)
+
+
+def matches_filter(
+    value: object,
+    filter_operator: str,
+    operand: str | float | list,
+) -> bool:
+    """Return whether a record value passes a list filter, as the API applies it.
+
+    Args:
+        value: The value of the filtered field in the record, as returned by the API.
+        filter_operator: The filter operator, such as `is` or `between`.
+        operand: The filter value; a list for `in`, `not_in` and `between`.
+
+    Returns:
+        True if the list endpoint would return the record.
+    """
+    if value is None:
+        return filter_operator in _NEGATED_FILTERS
+    if filter_operator in _FILTER_COMPARISONS:
+        return _FILTER_COMPARISONS[filter_operator](float(value), float(operand))
+    if filter_operator == "between":
+        low, high = operand
+        return float(low) <= float(value) <= float(high)
+    if filter_operator == "starts_with":
+        return _filter_text(value).startswith(_filter_text(operand))
+    operands = operand if filter_operator in _LIST_FILTERS else [operand]
+    found = _filter_text(value) in {_filter_text(item) for item in operands}
+    return found != (filter_operator in _NEGATED_FILTERS)
+
+
+def to_unix_timestamp(value: str | int) -> int:
+    """Convert a replication key value to a unix timestamp.
+
+    Args:
+        value: An epoch timestamp, or an ISO 8601 date-time string.
+
+    Returns:
+        The value as whole seconds since the epoch.
+    """
+    try:
+        return int(value)
+    except ValueError:
+        parsed = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+        return int(parsed.timestamp())
+
+
+class RateLimiter:
+    """Token bucket pacing the requests of every stream against one Chargebee site.
+
+    The rate starts at `requests_per_minute` (or unthrottled when unset) and adapts to
+    the API: `X-RateLimit-Remaining`/`X-RateLimit-Reset` headers spread the remaining
+    budget over the reset window, a 429 halves the rate, and successful responses
+    raise it again linearly, by a tenth of the highest rate a 429 was received at
+    (see `RECOVERY_RESPONSES`), up to the configured maximum. A
+    `Retry-After` header pauses all callers for exactly the requested time.
+
+    The rate is halved once per rate limiting episode: 429s to requests sent before
+    the last decrease, or received during a `Retry-After` pause, answer requests
+    paced at the old rate and are ignored.
+    """
+
+    MIN_RATE = 0.1
+    RECOVERY_RESPONSES = 10
+    MEASURE_WINDOW = 10.0
+
+    def __init__(self, requests_per_minute: float | None = None) -> None:
+        """Create a rate limiter.
+
+        Args:
+            requests_per_minute: The maximum request rate, or None for no maximum.
+        """
+        self.max_rate = requests_per_minute / 60 if requests_per_minute else None
+        self.rate = self.max_rate
+        self._tokens = 1.0
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._decreased_at = -math.inf
+        self._rate_increase = self.MIN_RATE
+        self._recent: deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token for one request.
+
+        Returns:
+            The number of seconds the caller must wait before sending the request.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._recent.append(now)
+            while self._recent[0] < now - self.MEASURE_WINDOW:
+                self._recent.popleft()
+
+            delay = max(0.0, self._paused_until - now)
+            if self.rate is None:
+                return delay
+            self._tokens = min(
+                max(1.0, self.rate),
+                self._tokens + (now - self._updated_at) * self.rate,
+            )
+            self._updated_at = now
+            self._tokens -= 1
+            if self._tokens < 0:
+                delay = max(delay, -self._tokens / self.rate)
+            return delay
+
+    def acquire(self) -> None:
+        """Block until the next request may be sent."""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        """Wait on the event loop until the next request may be sent."""
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def is_paused(self) -> bool:
+        """Return True while callers are held back by a `Retry-After` pause."""
+        return self._paused_until > time.monotonic()
+
+    def update(self, response: requests.Response) -> None:
+        """Adapt the request rate to an API response.
+
+        Args:
+            response: The response to a request paced by this limiter.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if response.status_code == HTTPStatus.TOO_MANY_REQUESTS:
+                sent_at = now - response.elapsed.total_seconds()
+                same_episode = sent_at < self._decreased_at or now < self._paused_until
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if retry_after is not None:
+                    self._paused_until = max(self._paused_until, now + retry_after)
+                if same_episode:
+                    return
+                span = now - self._recent[0] if self._recent else 0.0
+                measured = len(self._recent) / max(0.1, span)
+                previous_rate = self.rate or measured
+                self._set_rate(max(self.MIN_RATE, previous_rate / 2))
+                # Kept at its largest, so repeated episodes do not slow the recovery.
+                self._rate_increase = max(
+                    self._rate_increase,
+                    previous_rate / self.RECOVERY_RESPONSES,
+                )
+                self._decreased_at = now
+                return
+
+            remaining = response.headers.get("X-RateLimit-Remaining")
+            reset = response.headers.get("X-RateLimit-Reset")
+            if remaining is not None and reset is not None:
+                try:
+                    remaining_requests = float(remaining)
+                    reset_seconds = float(reset)
+                except ValueError:
+                    pass
+                else:
+                    if reset_seconds > time.time():
+                        # An epoch timestamp rather than a number of seconds.
+                        reset_seconds -= time.time()
+                    budget_rate = remaining_requests / max(1.0, reset_seconds)
+                    self._set_rate(max(self.MIN_RATE, budget_rate))
+                    return
+
+            if self.rate is not None:
+                self._set_rate(self.rate + self._rate_increase)
+
+    def _set_rate(self, rate: float) -> None:
+        if self.max_rate is not None:
+            rate = min(rate, self.max_rate)
+        self.rate = rate
+
+
+class PageSizeTuner:
+    """Adapts a stream's page size to how long pages take and how large they are.
+
+    Pages slower than `target_seconds` or larger than `max_bytes` halve the page size;
+    pages well under both limits double it again, up to `maximum`.
+    """
+
+    MIN_PAGE_SIZE = 10
+
+    def __init__(
+        self,
+        maximum: int = MAX_PAGE_SIZE,
+        target_seconds: float = 2.0,
+        max_bytes: int = 5 * 1024 * 1024,
+    ) -> None:
+        """Create a page size tuner starting at the maximum page size.
+
+        Args:
+            maximum: The largest page size to request.
+            target_seconds: The slowest acceptable response time.
+            max_bytes: The largest acceptable response body.
+        """
+        self.maximum = maximum
+        self.minimum = min(self.MIN_PAGE_SIZE, maximum)
+        self.target_seconds = target_seconds
+        self.max_bytes = max_bytes
+        self.size = maximum
+
+    def update(self, elapsed: float, size_bytes: int) -> bool:
+        """Adjust the page size after a response.
+
+        Args:
+            elapsed: Seconds the response took.
+            size_bytes: Size of the response body.
+
+        Returns:
+            True if the page size changed.
+        """
+        previous = self.size
+        if elapsed > self.target_seconds or size_bytes > self.max_bytes:
+            self.size = max(self.minimum, self.size // 2)
+        elif elapsed < self.target_seconds / 4 and size_bytes < self.max_bytes / 4:
+            self.size = min(self.maximum, self.size * 2)
+        return self.size != previous
+
+
+class ParentBatch:
+    """Parent records whose child records are synced together.
+
+    Child streams receive it in their context under `PARENT_RECORDS`. The SDK logs
+    contexts and adds them to metrics, where the batch is summarized rather than
+    listed.
+    """
+
+    def __init__(self, stream_name: str, records: list[dict]) -> None:
+        """Create a batch.
+
+        Args:
+            stream_name: Name of the parent stream.
+            records: The parent records, before projection.
+        """
+        self.stream_name = stream_name
+        self.records = records
+
+    def __iter__(self) -> Iterator[dict]:
+        """Iterate over the parent records."""
+        return iter(self.records)
+
+    def __len__(self) -> int:
+        """Return the number of parent records."""
+        return len(self.records)
+
+    def __repr__(self) -> str:
+        """Summarize the batch in logs and metrics."""
+        return f"<{len(self.records)} {self.stream_name} records>"
+
+
+class NextOffsetPaginator(BaseAPIPaginator):
+    """Follows the `next_offset` token of Chargebee list responses.
+
+    The token is read by `ChargebeeStream.parse_response` while it parses the page, so
+    the response body is only decoded once.
+    """
+
+    def __init__(self, start_value: str | None = None) -> None:
+        """Create a paginator.
+
+        Args:
+            start_value: Offset of the first page to request, None for the first page.
+        """
+        super().__init__(start_value)
+
+    def get_next(self, response: requests.Response) -> str | None:
+        """Return the offset of the next page.
+
+        Args:
+            response: The response of the current page.
+
+        Returns:
+            The next page offset, or None on the last page.
+        """
+        if hasattr(response, _NEXT_OFFSET_ATTR):
+            return getattr(response, _NEXT_OFFSET_ATTR)
+        return response.json().get("next_offset")
+
 
 class ChargebeeStream(RESTStream):
     """Chargebee stream class."""
 
     @property
     def url_base(self) -> str:
-        """Return the API URL root, configurable via tap settings."""
-        return "https://{site_id}.chargebee.com/api/v2".format(site_id=self.config['site_id'])
+        """Return the API URL root of the first site, configurable via tap settings."""
+        return self.get_url_base(None)
 
     records_jsonpath = "$.list[*]"
-    next_page_token_jsonpath = "$.next_offset"  # noqa: S105
     TYPE_CONFORMANCE_LEVEL = TypeConformanceLevel.ROOT_ONLY
 
+    #: Key under which events embed this stream's resource in `content`, if any.
+    event_content_key: str | None = None
+
+    #: Whether the stream's records are the events of the feed themselves.
+    is_event_feed: bool = False
+
+    #: Fields the list endpoint can filter on, with the operators each supports.
+    filterable_fields: dict[str, tuple[str, ...]] = {}
+
+    #: Context keys partitioning the stream state. Other context keys, such as the
+    #: bounds of a time window, only narrow queries within the partition.
+    state_partitioning_keys: list[str] = [SITE_ID]
+
+    #: Whether records may carry custom fields, see `sample_custom_fields`.
+    has_custom_fields: bool = True
+
+    #: Whether the API fails to advance the replication key of changed records. With
+    #: `change_index`, such streams are synced by change, see `uses_change_index`.
+    unreliable_replication_key: bool = False
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the stream.
+
+        Args:
+            *args: Positional arguments for the SDK `RESTStream`.
+            **kwargs: Keyword arguments for the SDK `RESTStream`.
+        """
+        # Records are tagged with their site.
+        self.schema = {
+            **self.schema,
+            "properties": {
+                **self.schema.get("properties", {}),
+                SITE_ID: {"type": ["string", "null"]},
+            },
+        }
+        super().__init__(*args, **kwargs)
+        if self._tap.multi_site:
+            # Record IDs are only unique within a site.
+            self.primary_keys = [*(self.primary_keys or []), SITE_ID]
+        if self.uses_change_index:
+            self.replication_key = None
+        self._authenticators: dict[str, BasicAuthenticator] = {}
+        self._envelope_resource = envelope_resource(self.records_jsonpath)
+        self._page_size_tuner: PageSizeTuner | None = None
+        self.stage_timer = StageTimer()
+        self._projection: Projection | None = None
+        self._projection_compiled = False
+        self.unchanged_partitions: list[dict | None] = []
+        self._pending_parents: list[dict] = []
+        #: Number of time slices to split this sync in, set by the tap's scheduling.
+        self.planned_slices = 1
+        self._slice_parallelism = 1
+        filters = self.config.get("filters", {}).get(self.name, {})
+        self.filter_params = self.get_filter_params(filters)
+        self._filters = [
+            (*_FILTER_PARAM.match(name).groups(), value)
+            for name, value in filters.items()
+        ]
+        if self.config.get("adaptive_page_size"):
+            self._page_size_tuner = PageSizeTuner(
+                maximum=min(self.config["limit"], MAX_PAGE_SIZE),
+            )
+
+    @property
+    def uses_change_index(self) -> bool:
+        """Return whether the stream is synced by change, with the tap's change index.
+
+        Such streams are full-table streams, but only emit the records that are new
+        or changed since the last run, and a tombstone (`deleted` set to true) per
+        record that disappeared.
+
+        Returns:
+            True for streams with an `unreliable_replication_key`, with `change_index`.
+        """
+        return self.unreliable_replication_key and self.config.get(
+            "change_index",
+            False,
+        )
+
+    def apply_catalog(self, catalog: Catalog) -> None:
+        """Apply the input catalog, keeping change-indexed streams full-table.
+
+        Args:
+            catalog: The input catalog.
+        """
+        super().apply_catalog(catalog)
+        if self.uses_change_index:
+            self.replication_key = None
+            self.forced_replication_method = REPLICATION_FULL_TABLE
+
+    @property
+    def partitions(self) -> list[dict] | None:
+        """Return one partition per site when syncing `sites`.
+
+        Returns:
+            The site partitions, or None for a single site.
+        """
+        if not self._tap.multi_site:
+            return None
+        return [{SITE_ID: site_id} for site_id in self._tap.sites]
+
+    def get_site(self, context: dict | None) -> dict:
+        """Return the settings of the site a context belongs to.
+
+        Args:
+            context: The stream context.
+
+        Returns:
+            The site's settings, see `TapChargebee.sites`.
+        """
+        sites = self._tap.sites
+        site_id = (context or {}).get(SITE_ID)
+        if site_id is None:
+            return next(iter(sites.values()))
+        return sites[site_id]
+
+    def get_url_base(self, context: dict | None) -> str:
+        """Return the API URL root of the context's site.
+
+        Args:
+            context: The stream context.
+
+        Returns:
+            The site's `api_url`, else `https://<site_id>.chargebee.com/api/v2`.
+        """
+        site = self.get_site(context)
+        if site.get("api_url"):
+            return site["api_url"].rstrip("/")
+        return f"https://{site['site_id']}.chargebee.com/api/v2"
+
+    def get_url(self, context: dict | None) -> str:
+        """Return the URL of the stream's endpoint on the context's site.
+
+        Args:
+            context: The stream context.
+
+        Returns:
+            The endpoint URL, with `{key}` placeholders of `path` filled from the
+            context.
+        """
+        url = self.get_url_base(context) + (self.path or "")
+        for key, value in (context or {}).items():
+            url = url.replace(f"{{{key}}}", self._url_encode(value))
+        return url
+
     @property
     def authenticator(self) -> BasicAuthenticator:
-        """Return a new authenticator object.
+        """Return the authenticator of the first site.
+
+        Returns:
+            An authenticator instance.
+        """
+        return self.get_authenticator(None)
+
+    def get_authenticator(self, context: dict | None) -> BasicAuthenticator:
+        """Return the authenticator of the context's site, creating it on first use.
+
+        Args:
+            context: The stream context.
 
         Returns:
             An authenticator instance.
         """
-        return BasicAuthenticator.create_for_stream(
-            self,
-            username=self.config.get("api_key", ""),
-            password="",
+        site = self.get_site(context)
+        authenticator = self._authenticators.get(site["site_id"])
+        if authenticator is None:
+            authenticator = BasicAuthenticator.create_for_stream(
+                self,
+                username=site["api_key"],
+                password="",
+            )
+            self._authenticators[site["site_id"]] = authenticator
+        return authenticator
+
+    @property
+    def requests_session(self) -> requests.Session:
+        """Return the pooled HTTP session shared by all streams of the tap.
+
+        Returns:
+            The tap's `requests.Session`.
+        """
+        return self._tap.requests_session
+
+    def build_prepared_request(
+        self,
+        *args: Any,
+        context: dict | None = None,
+        **kwargs: Any,
+    ) -> requests.PreparedRequest:
+        """Build a request authenticated for a site, without mutating the session.
+
+        Args:
+            *args: Arguments to pass to `requests.Request`.
+            context: The stream context, selecting the site's credentials.
+            **kwargs: Keyword arguments to pass to `requests.Request`.
+
+        Returns:
+            A `requests.PreparedRequest` object.
+        """
+        request = requests.Request(
+            *args,
+            auth=self.get_authenticator(context),
+            **kwargs,
+        )
+        prepared_request = self.requests_session.prepare_request(request)
+        setattr(prepared_request, _SITE_ATTR, self.get_site(context)["site_id"])
+        return prepared_request
+
+    def prepare_request(
+        self,
+        context: dict | None,
+        next_page_token: Any | None,
+    ) -> requests.PreparedRequest:
+        """Prepare a request to the context's site.
+
+        Args:
+            context: The stream context.
+            next_page_token: The token of the page to request.
+
+        Returns:
+            A `requests.PreparedRequest` object.
+        """
+        return self.build_prepared_request(
+            method=self.rest_method,
+            url=self.get_url(context),
+            params=self.get_url_params(context, next_page_token),
+            headers=self.http_headers,
+            json=self.prepare_request_payload(context, next_page_token),
+            context=context,
         )
 
     @property
@@ -52,53 +716,1772 @@ class ChargebeeStream(RESTStream):
             headers["User-Agent"] = self.config.get("user_agent")
         return headers
 
+    def get_rate_limiter(self, context: dict | None) -> RateLimiter:
+        """Return the rate limiter shared by all streams of the context's site.
+
+        Args:
+            context: The stream context.
+
+        Returns:
+            The site's rate limiter.
+        """
+        return self._tap.get_rate_limiter(self.get_site(context)["site_id"])
+
+    def _get_response_rate_limiter(self, response: requests.Response) -> RateLimiter:
+        return self._tap.get_rate_limiter(getattr(response.request, _SITE_ATTR, None))
+
+    @property
+    def page_size(self) -> int:
+        """Return the number of records to request per page.
+
+        Returns:
+            The adaptive page size if enabled, else the configured `limit`.
+        """
+        if self._page_size_tuner is not None:
+            return self._page_size_tuner.size
+        return self.config["limit"]
+
+    def _request(
+        self,
+        prepared_request: requests.PreparedRequest,
+        context: dict | None,
+    ) -> requests.Response:
+        response_cache = self._tap.response_cache
+        if response_cache is not None:
+            response = response_cache.get(prepared_request)
+            if response is not None:
+                return response
+        self.get_rate_limiter(context).acquire()
+        # Cached responses are stored whole, so their body is not streamed.
+        stream_body = response_cache is None and self.config.get(
+            "stream_json_parsing",
+            False,
+        )
+        start = time.perf_counter()
+        response = self.requests_session.send(
+            prepared_request,
+            timeout=self.timeout,
+            stream=stream_body,
+        )
+        self._handle_response(
+            response,
+            context,
+            time.perf_counter() - start,
+            streamed=stream_body,
+        )
+        if response_cache is not None:
+            response_cache.put(prepared_request, response)
+        return response
+
+    async def _request_async(
+        self,
+        prepared_request: requests.PreparedRequest,
+        context: dict | None,
+    ) -> requests.Response:
+        response_cache = self._tap.response_cache
+        if response_cache is not None:
+            response = response_cache.get(prepared_request)
+            if response is not None:
+                return response
+        await self.get_rate_limiter(context).acquire_async()
+        start = time.perf_counter()
+        response = await self._tap.async_transport.send(prepared_request, self.timeout)
+        self._handle_response(
+            response,
+            context,
+            time.perf_counter() - start,
+        )
+        if response_cache is not None:
+            response_cache.put(prepared_request, response)
+        return response
+
+    def _handle_response(
+        self,
+        response: requests.Response,
+        context: dict | None,
+        http_wait: float,
+        *,
+        streamed: bool = False,
+    ) -> None:
+        """Time, log and validate a response, and feed it to the page size tuner.
+
+        Args:
+            response: The response received, with the request sent.
+            context: The stream context.
+            http_wait: Time spent waiting for the response.
+            streamed: Whether the response body is still to be read.
+        """
+        self.stage_timer.add(Stage.HTTP_WAIT, http_wait)
+        setattr(response, _HTTP_WAIT_ATTR, http_wait)
+        self._write_request_duration_log(
+            endpoint=self.path,
+            response=response,
+            context=context,
+            extra_tags={"url": response.request.path_url}
+            if self._LOG_REQUEST_METRIC_URLS
+            else None,
+        )
+        self.validate_response(response)
+        if self._page_size_tuner is not None:
+            if streamed:
+                size_bytes = int(response.headers.get("Content-Length") or 0)
+            else:
+                size_bytes = len(response.content)
+            if self._page_size_tuner.update(
+                response.elapsed.total_seconds(),
+                size_bytes,
+            ):
+                self._log_page_size()
+
+    async def request_async(
+        self,
+        prepared_request: requests.PreparedRequest,
+        context: dict | None,
+    ) -> requests.Response:
+        """Send a request with the async transport, retrying like `request_decorator`.
+
+        Retries follow `backoff_wait_generator`, `backoff_jitter`, `backoff_max_tries`
+        and `backoff_handler`, waiting on the event loop instead of blocking a thread.
+
+        Args:
+            prepared_request: The request to send.
+            context: The stream context.
+
+        Returns:
+            The validated response.
+        """
+        # The transport module imports httpx, so it is only imported when enabled.
+        from tap_chargebee.transport import RETRIABLE_ERRORS
+
+        wait_generator = self.backoff_wait_generator()
+        next(wait_generator)
+        max_tries = self.backoff_max_tries()
+        start = time.monotonic()
+        tries = 0
+        while True:
+            tries += 1
+            try:
+                return await self._request_async(prepared_request, context)
+            except (RetriableAPIError, *RETRIABLE_ERRORS) as ex:
+                if tries >= max_tries:
+                    raise
+                wait = self.backoff_jitter(wait_generator.send(ex))
+                self.backoff_handler(
+                    {
+                        "target": self._request_async,
+                        "args": (prepared_request, context),
+                        "kwargs": {},
+                        "tries": tries,
+                        "elapsed": time.monotonic() - start,
+                        "wait": wait,
+                        "exception": ex,
+                    },
+                )
+                await asyncio.sleep(wait)
+
+    def log_sync_costs(self) -> None:
+        """Log a summary of sync costs, including the final adaptive page size."""
+        super().log_sync_costs()
+        if self._page_size_tuner is not None and self.selected:
+            self._log_page_size()
+        if self.config.get("stage_metrics") and self.selected:
+            self._log_stage_durations()
+
+    def _log_stage_durations(self) -> None:
+        """Log the time spent in each sync stage as metrics."""
+        for stage in Stage:
+            self._log_metric(
+                metrics.Point(
+                    "timer",
+                    metric=ChargebeeMetric.STAGE_DURATION,
+                    value=round(self.stage_timer.seconds[stage], 6),
+                    tags={
+                        metrics.Tag.STREAM: self.name,
+                        "stage": stage.value,
+                        "count": self.stage_timer.counts[stage],
+                    },
+                ),
+            )
+
+    def _log_page_duration(
+        self,
+        response: requests.Response,
+        decode_seconds: float,
+        extract_seconds: float,
+        records: int,
+    ) -> None:
+        """Count a parsed page and log its stage durations as a metric."""
+        http_wait = getattr(response, _HTTP_WAIT_ATTR, 0.0)
+        page_seconds = http_wait + decode_seconds + extract_seconds
+        self.stage_timer.add(Stage.JSON_DECODE, decode_seconds)
+        self.stage_timer.add(Stage.EXTRACT, extract_seconds, records)
+        self.stage_timer.add_page(page_seconds)
+        if not self.config.get("stage_metrics"):
+            return
+        self._log_metric(
+            metrics.Point(
+                "timer",
+                metric=ChargebeeMetric.PAGE_DURATION,
+                value=round(page_seconds, 6),
+                tags={
+                    metrics.Tag.STREAM: self.name,
+                    metrics.Tag.ENDPOINT: self.path,
+                    "records": records,
+                    Stage.HTTP_WAIT.value: round(http_wait, 6),
+                    Stage.JSON_DECODE.value: round(decode_seconds, 6),
+                    Stage.EXTRACT.value: round(extract_seconds, 6),
+                },
+            ),
+        )
+
+    def _log_page_size(self) -> None:
+        """Log the current page size as a metric."""
+        self._log_metric(
+            metrics.Point(
+                "gauge",
+                metric=ChargebeeMetric.PAGE_SIZE,
+                value=self.page_size,
+                tags={metrics.Tag.STREAM: self.name},
+            ),
+        )
+
+    def validate_response(self, response: requests.Response) -> None:
+        """Validate HTTP response, feeding rate limit information to the limiter.
+
+        Args:
+            response: A `requests.Response` object.
+        """
+        self._get_response_rate_limiter(response).update(response)
+        super().validate_response(response)
+
+    def backoff_wait_generator(self) -> Generator[float, None, None]:
+        """Wait exponentially between retries, unless the rate limiter holds requests.
+
+        Throttled requests that carry a `Retry-After` header are retried immediately,
+        because the shared rate limiter already pauses every stream until then.
+
+        Yields:
+            The number of seconds to wait before the next retry.
+        """
+        exception = yield  # type: ignore[misc]
+        attempt = 0
+        while True:
+            response = getattr(exception, "response", None)
+            if (
+                isinstance(exception, RetriableAPIError)
+                and response is not None
+                and response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+                and self._get_response_rate_limiter(response).is_paused()
+            ):
+                exception = yield 0
+                continue
+            exception = yield 2 * 2**attempt
+            attempt += 1
+
+    def backoff_jitter(self, value: float) -> float:
+        """Add jitter to retry waits, leaving rate limiter pauses exact.
+
+        Args:
+            value: Base amount to wait in seconds.
+
+        Returns:
+            Time in seconds to wait until the next request.
+        """
+        if not value:
+            return value
+        return super().backoff_jitter(value)
+
     def get_new_paginator(self) -> BaseAPIPaginator:
         """Create a new pagination helper instance.
 
-        If the source API can make use of the `next_page_token_jsonpath`
-        attribute, or it contains a `X-Next-Page` header in the response
-        then you can remove this method.
+        Returns:
+            A paginator following Chargebee's `next_offset` token.
+        """
+        return NextOffsetPaginator()
+
+    def parse_response(self, response: requests.Response) -> Iterable[dict]:
+        """Parse the records of a list response.
+
+        Responses are decoded once, without JSONPath, when `records_jsonpath` selects
+        from the `list` envelope. With `stream_json_parsing` the body is decoded
+        incrementally as it is read. Decoding and extraction are timed per page.
+
+        Args:
+            response: A raw `requests.Response` object.
+
+        Yields:
+            One item for every record in the response.
+        """
+        clock = time.perf_counter
+        decode_seconds = extract_seconds = 0.0
+        parser = None
+        if self._envelope_resource is None:
+            start = clock()
+            page = json_loads(response.content)
+            decode_seconds = clock() - start
+            records = extract_jsonpath(self.records_jsonpath, input=page)
+        elif self.config.get("stream_json_parsing", False):
+            parser = ListPageParser(response.iter_content(_STREAM_CHUNK_SIZE))
+            records = iter_envelope_records(parser, self._envelope_resource)
+        else:
+            start = clock()
+            page = json_loads(response.content)
+            decode_seconds = clock() - start
+            setattr(response, _NEXT_OFFSET_ATTR, page.get("next_offset"))
+            records = iter_envelope_records(
+                page.get("list", []),
+                self._envelope_resource,
+            )
+
+        count = 0
+        records = iter(records)
+        while True:
+            start = clock()
+            record = next(records, None)
+            # Streamed records are decoded while they are extracted.
+            if parser is None:
+                extract_seconds += clock() - start
+            else:
+                decode_seconds += clock() - start
+            if record is None:
+                break
+            count += 1
+            yield record
 
-        If you need custom pagination that uses page numbers, "next" links, or
-        other approaches, please read the guide: https://sdk.meltano.com/en/v0.25.0/guides/pagination-classes.html.
+        if parser is not None:
+            setattr(response, _NEXT_OFFSET_ATTR, parser.next_offset)
+        self._log_page_duration(response, decode_seconds, extract_seconds, count)
+
+    def get_record_offload(self, context: dict | None) -> RecordOffload | None:
+        """Return the process pool encoding the records of a read, if any.
+
+        Records are only encoded by worker processes when this stream writes them as
+        RECORD messages: not in batch mode, not for reads that need the parsed
+        records (see `RAW_RECORDS`), not when child streams read the parent records or
+        the change index compares them, and not when a stream map may filter them.
+
+        Args:
+            context: The stream context of the read.
 
         Returns:
-            A pagination helper instance.
+            The tap's `RecordOffload`, or None to parse records in this process.
         """
-        return super().get_new_paginator()
+        offload = self._tap.record_offload
+        if (
+            offload is None
+            or (context and context.get(RAW_RECORDS))
+            or not self.selected
+            or self.has_selected_descendents
+            or self.uses_change_index
+            or self.get_batch_config(self.config) is not None
+            or not isinstance(self.stream_maps[0], DefaultStreamMap)
+        ):
+            return None
+        return offload
 
-    def get_url_params(
+    def encode_page(
         self,
-        context: dict | None,  # noqa: ARG002
-        next_page_token: Any | None,
-    ) -> dict[str, Any]:
-        """Return a dictionary of values to be used in URL parameterization.
+        context: dict | None,
+        body: bytes,
+    ) -> tuple[list[EncodedRecord], dict[Stage, float], dict[Stage, int]]:
+        """Turn a page of records into RECORD message lines, in a worker process.
+
+        Does the per-record work of `get_records` and `_write_record_message` for a
+        raw response body: decoding, `post_process`, site tagging, projection, type
+        conformance, stream maps and encoding.
 
         Args:
-            context: The stream context.
-            next_page_token: The next page index or value.
+            context: The context records are post-processed with.
+            body: The raw response body of the page.
 
         Returns:
-            A dictionary of URL query parameters.
+            The encoded records of the page, with the time spent in each stage and the
+            number of calls or records each stage's time covers.
         """
-        params: dict = {
-            "include_deleted": self.config['include_deleted'],
-            "limit": self.config['limit'],
+        timer = StageTimer()
+        clock = time.perf_counter
+        start = clock()
+        page = json_loads(body)
+        timer.add(Stage.JSON_DECODE, clock() - start)
+        start = clock()
+        records = self._extract_page_records(page)
+        timer.add(Stage.EXTRACT, clock() - start, len(records))
+
+        site_id = self.get_site(context)["site_id"]
+        projection = self.projection if self.selected else None
+        # Fields read by de-duplication and state once the record is encoded.
+        keys = [
+            *(self.primary_keys or []),
+            self.replication_key,
+            "resource_version",
+            SITE_ID,
+        ]
+        encoded = []
+        for record in records:
+            start = clock()
+            transformed_record = self.post_process(record, context)
+            timer.add(Stage.POST_PROCESS, clock() - start)
+            if transformed_record is None:
+                continue
+            transformed_record[SITE_ID] = site_id
+            fields = {
+                key: transformed_record[key]
+                for key in keys
+                if key and key in transformed_record
+            }
+            if projection is not None:
+                transformed_record = project(transformed_record, projection)
+            lines = self._encode_record(transformed_record, timer)
+            encoded.append(EncodedRecord(fields, lines))
+        return encoded, timer.seconds, timer.counts
+
+    def _extract_page_records(self, page: dict) -> list[dict]:
+        if self._envelope_resource is None:
+            return list(extract_jsonpath(self.records_jsonpath, input=page))
+        return list(
+            iter_envelope_records(page.get("list", []), self._envelope_resource),
+        )
+
+    def _submit_page(
+        self,
+        offload: RecordOffload,
+        context: dict | None,
+        response: requests.Response,
+    ) -> Future:
+        """Submit a page to `encode_page`, in the context `get_records` reads it in."""
+        record_context = {
+            key: value
+            for key, value in (context or {}).items()
+            if key not in _QUERY_KEYS
         }
-        if next_page_token:
-            params["offset"] = next_page_token
+        return offload.submit(self.name, record_context or None, response.content)
+
+    def _collect_page(
+        self,
+        response: requests.Response,
+        future: Future,
+        next_offset: str | None,
+    ) -> tuple[list[EncodedRecord], str | None]:
+        """Wait for a page submitted to `encode_page` and count its stage timings."""
+        records, seconds, counts = future.result()
+        self._log_page_duration(
+            response,
+            seconds[Stage.JSON_DECODE],
+            seconds[Stage.EXTRACT],
+            counts[Stage.EXTRACT],
+        )
+        for stage in (Stage.POST_PROCESS, Stage.TYPE_CONFORMANCE, Stage.SERIALIZE):
+            self.stage_timer.add(stage, seconds[stage], counts[stage])
+        return records, next_offset
+
+    async def _collect_page_async(
+        self,
+        response: requests.Response,
+        future: Future,
+        next_offset: str | None,
+    ) -> tuple[list[EncodedRecord], str | None]:
+        await asyncio.wrap_future(future)
+        return self._collect_page(response, future, next_offset)
+
+    def get_starting_time_int(self, context: dict | None) -> int | None:
+        """Return the replication start point as a unix timestamp.
+
+        Args:
+            context: The stream context.
+
+        Returns:
+            The timestamp to request records after, if any.
+        """
+        start_value = self.get_starting_replication_key_value(context)
+        if start_value is None:
+            return None
+        return to_unix_timestamp(start_value)
+
+    def get_filter_params(self, filters: dict[str, Any]) -> dict[str, str]:
+        """Validate the configured filters of this stream and encode them.
+
+        Args:
+            filters: Filter values by `<field>[<operator>]` parameter name. Values of
+                the `in`, `not_in` and `between` operators are lists.
+
+        Returns:
+            The filters as list query parameters.
+
+        Raises:
+            ConfigValidationError: If a filter is not supported by the endpoint.
+        """
+        params = {}
+        errors = []
+        for name, value in filters.items():
+            match = _FILTER_PARAM.match(name)
+            if not match:
+                errors.append(f"'{name}' is not of the form <field>[<operator>]")
+                continue
+            field, operator = match.groups()
+            if field == self.replication_key:
+                errors.append(f"'{field}' is the replication key")
+            elif field not in self.filterable_fields:
+                errors.append(f"'{field}' is not filterable")
+            elif operator not in self.filterable_fields[field]:
+                errors.append(
+                    f"'{field}' supports {', '.join(self.filterable_fields[field])}, "
+                    f"not {operator}",
+                )
+            elif (operator in _LIST_FILTERS) != isinstance(value, list):
+                expected = "a list" if operator in _LIST_FILTERS else "one"
+                errors.append(f"'{name}' takes {expected} value")
+            elif operator == "between" and len(value) != 2:  # noqa: PLR2004
+                errors.append(f"'{name}' takes two values")
+            elif isinstance(value, (list, bool)):
+                params[name] = json.dumps(value)
+            else:
+                params[name] = str(value)
+        if errors:
+            msg = f"Invalid filters for stream '{self.name}': {'; '.join(errors)}."
+            raise ConfigValidationError(msg)
+        return params
+
+    def matches_filters(self, record: dict) -> bool:
+        """Return whether a record passes this stream's configured `filters`.
+
+        Applies the filters to records the list endpoint did not filter, such as
+        the entities read from the events feed.
+
+        Args:
+            record: The record, as returned by the API.
+
+        Returns:
+            True if the list endpoint would return the record.
+        """
+        return all(
+            matches_filter(record.get(field), filter_operator, value)
+            for field, filter_operator, value in self._filters
+        )
+
+    def get_query_start(self, context: dict | None) -> int | None:
+        """Return the `[after]` bound of an incremental query.
+
+        Once the stream has a bookmark, the query overlaps the previous run by
+        `window_overlap_seconds`, so records sharing the bookmark's timestamp are not
+        skipped. The records already emitted are dropped by `get_records`.
+
+        Args:
+            context: The stream context.
+
+        Returns:
+            The timestamp to request records after, if any.
+        """
+        start_time_int = self.get_starting_time_int(context)
+        overlap = self.config.get("window_overlap_seconds", 0)
+        if (
+            start_time_int
+            and overlap
+            and self.get_context_state(context).get("replication_key_value") is not None
+        ):
+            start_time_int -= overlap
+        return start_time_int
+
+    def get_version_key(self, record: dict) -> str:
+        """Return a key identifying this version of a record.
+
+        Args:
+            record: The record, after `post_process`.
+
+        Returns:
+            The primary key values and the `resource_version`, or the replication key
+            value for resources without one, joined as `<id>@<version>`.
+        """
+        version = record.get("resource_version")
+        if version is None and self.replication_key:
+            version = record.get(self.replication_key)
+        record_id = "|".join(str(record.get(key)) for key in self.primary_keys or [])
+        return f"{record_id}@{version}"
+
+    def _get_boundary_index(self, context: dict | None) -> BoundaryIndex | None:
+        """Return the de-duplication index of an incremental sync, if enabled.
+
+        Args:
+            context: The stream context.
+
+        Returns:
+            An index seeded with the previous run's boundary keys, or None if
+            `window_overlap_seconds` is not set.
+        """
+        overlap = self.config.get("window_overlap_seconds", 0)
+        if not overlap or not self.replication_key:
+            return None
+        return BoundaryIndex(
+            overlap,
+            self.get_context_state(context).get("boundary_keys", []),
+        )
+
+    def get_url_params(
+        self,
+        context: dict | None,
+        next_page_token: Any | None,
+    ) -> dict[str, Any]:
+        """Return a dictionary of values to be used in URL parameterization.
+
+        Args:
+            context: The stream context.
+            next_page_token: The next page index or value.
+
+        Returns:
+            A dictionary of URL query parameters.
+        """
+        params: dict = {
+            "include_deleted": self.config["include_deleted"],
+            "limit": self.page_size,
+        }
+        if next_page_token:
+            params["offset"] = next_page_token
+        if not (context and context.get(UNFILTERED)):
+            params.update(self.filter_params)
+        if context and RECORD_IDS in context:
+            # Records read by ID, see `request_records_by_id`.
+            params["id[in]"] = json.dumps(context[RECORD_IDS])
         if self.replication_key:
-            try:
-                start_time = self.get_starting_timestamp(context)
-                start_time_int = int(start_time.timestamp())
-            except:
-                start_time = self.get_starting_replication_key_value(context)
-                try:
-                    start_time_int = int(start_time)
-                except:
-                    import datetime
-                    start_time_int = int(datetime.datetime.strptime(start_time, "%Y-%m-%dT%H:%M:%SZ").timestamp())
-            if start_time_int:
-                params[self.replication_key + "[after]"] = str(start_time_int)
+            if context and WINDOW_START in context:
+                # Time slice of a partitioned backfill, see `get_backfill_plan`.
+                after = context[WINDOW_START] - 1
+                params[self.replication_key + "[after]"] = str(after)
+                params[self.replication_key + "[before]"] = str(context[WINDOW_END])
+            elif context and CHECKPOINT_AFTER in context:
+                # Query resumed from a checkpoint, see `request_paged_records`.
+                if context[CHECKPOINT_AFTER] is not None:
+                    params[self.replication_key + "[after]"] = str(
+                        context[CHECKPOINT_AFTER],
+                    )
+            else:
+                start_time_int = self.get_query_start(context)
+                if start_time_int:
+                    params[self.replication_key + "[after]"] = str(start_time_int)
             params["sort_by"] = self.replication_key
         return params
+
+    def get_backfill_plan(self, context: dict | None) -> BackfillPlan | None:
+        """Return the time slices to backfill this stream in, if any.
+
+        A backfill is sliced when `backfill_slice_days` is set and the window between
+        the starting replication value and now spans more than one slice, or when the
+        tap planned to split the stream (see `planned_slices`) and the window spans at
+        least an hour per slice. Slices are widened so there are at most
+        `MAX_BACKFILL_SLICES`. The plan is kept in state so an interrupted backfill
+        resumes with the same plan.
+
+        Args:
+            context: The stream context.
+
+        Returns:
+            The backfill plan, or None to sync the stream with a single cursor.
+        """
+        slice_days = self.config.get("backfill_slice_days")
+        if not self.replication_key or not (slice_days or self.planned_slices > 1):
+            return None
+        if context and WINDOW_START in context:
+            return None
+
+        backfill = self.get_context_state(context).get("backfill")
+        if backfill:
+            return BackfillPlan.from_state(backfill)
+
+        # `[after]` is exclusive, so the first slice starts one second later.
+        start = (self.get_query_start(context) or 0) + 1
+        end = int(time.time()) + 1
+        step = int(slice_days * 24 * 60 * 60) if slice_days else end - start
+        planned_slices = min(
+            self.planned_slices,
+            (end - start) // MIN_PLANNED_SLICE_SECONDS,
+        )
+        if planned_slices > 1:
+            step = min(step, math.ceil((end - start) / planned_slices))
+        if end - start <= step:
+            return None
+        return BackfillPlan.create(start, end, step)
+
+    def request_pages(
+        self,
+        context: dict | None,
+        start_offset: str | None = None,
+    ) -> Iterable[tuple[list[dict], str | None]]:
+        """Request every page of records from the REST endpoint.
+
+        Args:
+            context: The stream context.
+            start_offset: Offset of the first page to request, None for the first page.
+
+        Yields:
+            The parsed records of each page, with the offset of the next page.
+        """
+        transport = self._tap.async_transport
+        if transport is not None:
+            # Pages are fetched on the event loop, at most `prefetch_pages` ahead.
+            for _, page in transport.iter_async(
+                [self.request_pages_async(context, start_offset)],
+                1,
+                max_buffered=max(1, self.config.get("prefetch_pages", 0)),
+            ):
+                yield page
+            return
+
+        offload = self.get_record_offload(context)
+        pending: deque[tuple[requests.Response, Future, str | None]] = deque()
+        paginator = NextOffsetPaginator(start_offset)
+        decorated_request = self.request_decorator(self._request)
+
+        with metrics.http_request_counter(self.name, self.path) as request_counter:
+            request_counter.context = context
+
+            while not paginator.finished:
+                prepared_request = self.prepare_request(
+                    context,
+                    next_page_token=paginator.current_value,
+                )
+                resp = decorated_request(prepared_request, context)
+                request_counter.increment()
+                self.update_sync_costs(prepared_request, resp, context)
+                if offload is None:
+                    records = list(self.parse_response(resp))
+                    paginator.advance(resp)
+                    yield records, paginator.current_value
+                    continue
+
+                # Keep paginating while worker processes encode the page.
+                setattr(resp, _NEXT_OFFSET_ATTR, read_next_offset(resp.content))
+                paginator.advance(resp)
+                future = self._submit_page(offload, context, resp)
+                pending.append((resp, future, paginator.current_value))
+                if len(pending) > offload.max_pending:
+                    yield self._collect_page(*pending.popleft())
+
+            while pending:
+                yield self._collect_page(*pending.popleft())
+
+    async def request_pages_async(
+        self,
+        context: dict | None,
+        start_offset: str | None = None,
+    ) -> AsyncIterator[tuple[list[dict], str | None]]:
+        """Request every page of records with the async transport.
+
+        The coroutine counterpart of `request_pages`, run on the tap's event loop.
+
+        Args:
+            context: The stream context.
+            start_offset: Offset of the first page to request, None for the first page.
+
+        Yields:
+            The parsed records of each page, with the offset of the next page.
+        """
+        offload = self.get_record_offload(context)
+        pending: deque[tuple[requests.Response, Future, str | None]] = deque()
+        paginator = NextOffsetPaginator(start_offset)
+
+        with metrics.http_request_counter(self.name, self.path) as request_counter:
+            request_counter.context = context
+
+            while not paginator.finished:
+                prepared_request = self.prepare_request(
+                    context,
+                    next_page_token=paginator.current_value,
+                )
+                resp = await self.request_async(prepared_request, context)
+                request_counter.increment()
+                self.update_sync_costs(prepared_request, resp, context)
+                if offload is None:
+                    records = list(self.parse_response(resp))
+                    paginator.advance(resp)
+                    yield records, paginator.current_value
+                    continue
+
+                setattr(resp, _NEXT_OFFSET_ATTR, read_next_offset(resp.content))
+                paginator.advance(resp)
+                future = self._submit_page(offload, context, resp)
+                pending.append((resp, future, paginator.current_value))
+                if len(pending) > offload.max_pending:
+                    yield await self._collect_page_async(*pending.popleft())
+
+            while pending:
+                yield await self._collect_page_async(*pending.popleft())
+
+    @property
+    def projection(self) -> Projection | None:
+        """Return the projection of records onto the selected properties.
+
+        The projection is compiled from the catalog once per stream.
+
+        Returns:
+            The projection, or None if every property is selected.
+        """
+        if not self._projection_compiled:
+            self._projection = compile_projection(self.schema, self.mask)
+            self._projection_compiled = True
+        return self._projection
+
+    def probe_changes(self, context: dict | None = None) -> None:
+        """Check with a single one-record request whether the stream has changes.
+
+        Only incremental streams resuming from a bookmark are probed, unless their last
+        sync read a single page (see `request_paged_records`): syncing them takes no
+        more requests than probing them. If the API has no record after the bookmark,
+        the partition is added to `unchanged_partitions` and its next sync skips
+        pagination. Probe failures are logged and leave the partition unmarked.
+
+        Args:
+            context: The stream partition to probe.
+        """
+        state = self.get_context_state(context)
+        if (
+            not self.replication_key
+            or state.get("replication_key_value") is None
+            or "checkpoint" in state
+            or "backfill" in state
+            or state.get("last_sync_pages") == 1
+        ):
+            return
+
+        # Probe strictly after the bookmark, without `window_overlap_seconds`.
+        bookmark = to_unix_timestamp(state["replication_key_value"])
+        params = self.get_url_params(
+            {**(context or {}), CHECKPOINT_AFTER: bookmark},
+            None,
+        )
+        params["limit"] = 1
+        prepared_request = self.build_prepared_request(
+            method=self.rest_method,
+            url=self.get_url(context),
+            params=params,
+            headers=self.http_headers,
+            context=context,
+        )
+
+        try:
+            response = self.request_decorator(self._send_unmetered)(
+                prepared_request,
+                context,
+            )
+            if not json_loads(response.content).get("list"):
+                self.unchanged_partitions.append(context)
+        except Exception:  # noqa: BLE001
+            self.logger.warning(
+                "Change probe of '%s' failed, syncing it anyway.",
+                self.name,
+                exc_info=True,
+            )
+
+    def _send_unmetered(
+        self,
+        prepared_request: requests.PreparedRequest,
+        context: dict | None,
+    ) -> requests.Response:
+        # Bypasses `_request`, so one-off requests do not feed the page size tuner.
+        self.get_rate_limiter(context).acquire()
+        response = self.requests_session.send(prepared_request, timeout=self.timeout)
+        self.validate_response(response)
+        return response
+
+    def sample_custom_fields(self) -> dict[str, dict] | None:
+        """Infer the schema of custom fields from a page of recent records.
+
+        One page of the most recently updated records of each site is requested,
+        regardless of bookmarks and `filters`. Custom fields (`cf_*` properties) and
+        `meta_data` keys are typed from the values they hold.
+
+        Returns:
+            The schema of the custom fields missing from the stream schema, by name,
+            or None if sampling failed.
+        """
+        properties = self.schema["properties"]
+        custom_fields: dict[str, dict] = {}
+        for context in self.partitions or [None]:
+            params = self.get_url_params(
+                {**(context or {}), CHECKPOINT_AFTER: None, UNFILTERED: True},
+                None,
+            )
+            params["limit"] = MAX_PAGE_SIZE
+            if params.pop("sort_by", None):
+                params["sort_by[desc]"] = self.replication_key
+            prepared_request = self.build_prepared_request(
+                method=self.rest_method,
+                url=self.get_url(context),
+                params=params,
+                headers=self.http_headers,
+                context=context,
+            )
+            try:
+                response = self.request_decorator(self._send_unmetered)(
+                    prepared_request,
+                    context,
+                )
+                records = self._extract_page_records(json_loads(response.content))
+            except Exception:  # noqa: BLE001
+                self.logger.warning(
+                    "Could not sample the custom fields of '%s'.",
+                    self.name,
+                    exc_info=True,
+                )
+                return None
+            custom_fields = merge_properties(
+                custom_fields,
+                infer_custom_fields(records, properties),
+            )
+        return custom_fields
+
+    def add_custom_fields(self, custom_fields: dict[str, dict]) -> None:
+        """Add discovered custom fields to the stream schema.
+
+        Properties declared by the stream class are kept, except `meta_data`, whose
+        discovered schema lists its keys.
+
+        Args:
+            custom_fields: The schema of each custom field, by name.
+        """
+        properties = self.schema["properties"]
+        self.schema = {
+            **self.schema,
+            "properties": {
+                **properties,
+                **{
+                    name: schema
+                    for name, schema in custom_fields.items()
+                    if name not in properties or name == META_DATA
+                },
+            },
+        }
+        self._projection_compiled = False
+
+    def get_records(self, context: dict | None) -> Iterable[dict[str, Any]]:
+        """Return a generator of record-type dictionary objects, timing `post_process`.
+
+        With `window_overlap_seconds`, record versions already emitted by this run or
+        near the previous run's bookmark are dropped, and with the change index,
+        records unchanged since the last run. Records are then projected onto
+        the properties selected in the catalog; this happens after `post_process`,
+        which may read deselected properties.
+
+        Args:
+            context: Stream partition or context dictionary.
+
+        Yields:
+            One item per (possibly processed) record in the API.
+        """
+        if context in self.unchanged_partitions:
+            self.unchanged_partitions.remove(context)
+            self.logger.info(
+                "Skipping '%s': no records were changed after its bookmark.",
+                self.name,
+            )
+            return
+
+        site_id = self.get_site(context)["site_id"]
+        boundary_index = self._get_boundary_index(context)
+        changes = self._get_partition_changes(context)
+        projection = self.projection if self.selected else None
+        sync_children = self.has_selected_descendents
+        partition_context = {
+            key: value
+            for key, value in (context or {}).items()
+            if key in self.state_partitioning_keys
+        }
+        for record in self.request_records(context):
+            transformed_record = self._post_process_record(record, context, site_id)
+            if transformed_record is None:
+                # Record filtered out during post_process()
+                continue
+            if boundary_index is not None and self._is_duplicate_version(
+                boundary_index,
+                transformed_record,
+            ):
+                continue
+            if changes is not None and not changes.is_changed(transformed_record):
+                continue
+            parent_record = transformed_record
+            # Encoded records were projected by `encode_page`.
+            if projection is not None and not isinstance(record, EncodedRecord):
+                transformed_record = project(transformed_record, projection)
+            self.stage_timer.add_records(1)
+            if sync_children:
+                # Children read the whole record, which projection may have pruned.
+                yield transformed_record, {
+                    **partition_context,
+                    _PARENT_RECORD: parent_record,
+                }
+            else:
+                yield transformed_record
+        self._sync_pending_children()
+
+        if changes is not None:
+            yield from self._get_tombstones(changes, site_id, projection)
+            self._save_partition_changes(context, changes)
+        if boundary_index is not None:
+            self._save_boundary_keys(context, boundary_index)
+
+    def _post_process_record(
+        self,
+        record: dict,
+        context: dict | None,
+        site_id: str,
+    ) -> dict | None:
+        """Post-process a record read by `request_records`, timing `post_process`.
+
+        Args:
+            record: The record as parsed, or encoded by `encode_page`.
+            context: The stream context.
+            site_id: The ID of the site the record was read from.
+
+        Returns:
+            The processed record, or None if `post_process` filtered it out.
+        """
+        if isinstance(record, EncodedRecord):
+            # Encoded records were processed by `encode_page` in a worker process.
+            return record
+        start = time.perf_counter()
+        transformed_record = self.post_process(record, context)
+        self.stage_timer.add(Stage.POST_PROCESS, time.perf_counter() - start)
+        if transformed_record is not None:
+            transformed_record[SITE_ID] = site_id
+        return transformed_record
+
+    def _is_duplicate_version(
+        self,
+        boundary_index: BoundaryIndex,
+        record: dict,
+    ) -> bool:
+        """Track a record's version and return whether it was already emitted.
+
+        Args:
+            boundary_index: The de-duplication index of the sync.
+            record: The processed record.
+
+        Returns:
+            True if the record version was already emitted.
+        """
+        key = self.get_version_key(record)
+        value = record.get(self.replication_key)
+        if value is not None:
+            boundary_index.add(key, to_unix_timestamp(value))
+        return boundary_index.is_duplicate(key)
+
+    def _get_tombstones(
+        self,
+        changes: PartitionChanges,
+        site_id: str,
+        projection: Projection | None,
+    ) -> Iterator[dict]:
+        """Yield tombstones of the records that disappeared from a partition.
+
+        Args:
+            changes: The partition's changes, once all of its records were compared.
+            site_id: The ID of the partition's site.
+            projection: The projection of the selected properties, if any.
+
+        Yields:
+            A record per disappeared record, see `PartitionChanges.tombstones`.
+        """
+        for tombstone in changes.tombstones():
+            tombstone[SITE_ID] = site_id
+            self.stage_timer.add_records(1)
+            yield tombstone if projection is None else project(tombstone, projection)
+
+    def _save_boundary_keys(
+        self,
+        context: dict | None,
+        boundary_index: BoundaryIndex,
+    ) -> None:
+        """Save the boundary keys of a sync in its partition's state.
+
+        Args:
+            context: The stream partition.
+            boundary_index: The de-duplication index of the sync.
+        """
+        if boundary_index.duplicates:
+            self.logger.info(
+                "Dropped %d duplicate '%s' records.",
+                boundary_index.duplicates,
+                self.name,
+            )
+        boundary_keys = boundary_index.boundary_keys()
+        with self._tap.message_lock:
+            self.get_context_state(context)["boundary_keys"] = boundary_keys
+
+    def _get_partition_changes(self, context: dict | None) -> PartitionChanges | None:
+        """Return the comparison of a partition's records with the change index.
+
+        Args:
+            context: The stream partition.
+
+        Returns:
+            The partition's changes, or None if the stream is not synced by change.
+        """
+        if not self.uses_change_index or not self.selected:
+            return None
+        from tap_chargebee.change_index import PartitionChanges
+
+        digests = self._tap.change_index.load(
+            self.name,
+            self.get_site(context)["site_id"],
+            self.get_context_state(context).get("change_index_run"),
+        )
+        return PartitionChanges(
+            digests,
+            [key for key in self.primary_keys or [] if key != SITE_ID],
+        )
+
+    def _save_partition_changes(
+        self,
+        context: dict | None,
+        changes: PartitionChanges,
+    ) -> None:
+        """Save the changes of a partition, and the run they belong to in its state.
+
+        Args:
+            context: The stream partition.
+            changes: The partition's changes, once all of its records were compared.
+        """
+        run = time.time_ns()
+        self._tap.change_index.save(
+            self.name,
+            self.get_site(context)["site_id"],
+            run,
+            changes.changes,
+        )
+        with self._tap.message_lock:
+            self.get_context_state(context)["change_index_run"] = run
+        self.logger.info(
+            "Change index of '%s': %d new or changed, %d deleted and %d unchanged "
+            "records.",
+            self.name,
+            len(changes.changes) - changes.deleted,
+            changes.deleted,
+            changes.unchanged,
+        )
+
+    def _sync_children(self, child_context: dict | None) -> None:
+        # Children are synced per batch of parent records rather than per record.
+        if not child_context or _PARENT_RECORD not in child_context:
+            super()._sync_children(child_context)
+            return
+        self._pending_parents.append(child_context)
+        if len(self._pending_parents) >= MAX_PARENT_BATCH:
+            self._sync_pending_children()
+
+    def _sync_pending_children(self) -> None:
+        """Sync the child streams of the parent records processed so far.
+
+        Called once a batch is full, once all records of the stream partition were
+        processed, and before progress is saved in the stream state, so the saved
+        progress never covers a parent whose children were not synced.
+        """
+        if not self._pending_parents:
+            return
+        pending, self._pending_parents = self._pending_parents, []
+        child_context = {
+            key: value for key, value in pending[0].items() if key != _PARENT_RECORD
+        }
+        child_context[PARENT_RECORDS] = ParentBatch(
+            self.name,
+            [parent[_PARENT_RECORD] for parent in pending],
+        )
+        super()._sync_children(child_context)
+
+    def get_batches(
+        self,
+        batch_config: BatchConfig,
+        context: dict | None = None,
+    ) -> Iterable[tuple[BaseBatchFileEncoding, list[str]]]:
+        """Write records to JSON Lines or Parquet batch files.
+
+        Records are conformed to the schema, as they would be in RECORD messages.
+
+        Args:
+            batch_config: Batch config for this stream.
+            context: Stream partition or context dictionary.
+
+        Yields:
+            A tuple of (encoding, manifest) for each batch.
+        """
+        selected_schema = {
+            **self.schema,
+            "properties": {
+                name: prop
+                for name, prop in self.schema.get("properties", {}).items()
+                if self.mask.get(("properties", name), True)
+            },
+        }
+        from tap_chargebee.batch import ChargebeeBatcher
+
+        batcher = ChargebeeBatcher(
+            tap_name=self.tap_name,
+            stream_name=self.name,
+            batch_config=batch_config,
+            schema=selected_schema,
+        )
+        records = (
+            self._conform_batch_record(record)
+            for record in self._sync_records(context, write_messages=False)
+        )
+        for manifest in batcher.get_batches(records=records):
+            yield batch_config.encoding, manifest
+
+    def _conform_batch_record(self, record: dict) -> dict:
+        """Prepare a record for a batch file like `_generate_record_messages` does."""
+        start = time.perf_counter()
+        record = conform_record_data_types(
+            stream_name=self.name,
+            record=record,
+            schema=self.schema,
+            level=self.TYPE_CONFORMANCE_LEVEL,
+            logger=self.logger,
+        )
+        self.stage_timer.add(Stage.TYPE_CONFORMANCE, time.perf_counter() - start)
+        return record
+
+    def _sync_records(
+        self,
+        context: dict | None = None,
+        *,
+        write_messages: bool = True,
+    ) -> Generator[dict, Any, Any]:
+        # Times the whole sync; `Stream.sync` itself is final.
+        start = time.perf_counter()
+        try:
+            yield from super()._sync_records(context, write_messages=write_messages)
+        finally:
+            self.stage_timer.add_sync(time.perf_counter() - start)
+
+    def request_paged_records(
+        self,
+        context: dict | None,
+        checkpoint: dict | None = None,
+    ) -> Iterable[dict]:
+        """Request every page of records, checkpointing progress in the stream state.
+
+        Every `checkpoint_pages` pages or `checkpoint_seconds` seconds, once all records
+        of a page have been processed, the query's `[after]` bound and the offset of
+        the next page are saved in the stream state as `checkpoint`, along with the
+        highest replication key value processed so far, and a STATE message is
+        written. A sync interrupted after a checkpoint resumes from the saved offset;
+        if the API rejects it, from the saved replication key value instead. Once a
+        sync completes, the number of pages it read is saved as `last_sync_pages`.
+
+        Args:
+            context: The stream context.
+            checkpoint: The checkpoint to resume from, if any.
+
+        Yields:
+            An item for every record in the response.
+        """
+        offset = None
+        window = bool(context and WINDOW_START in context)
+        if checkpoint is None:
+            # Time windows are bounded by the context rather than the bookmark.
+            after = (
+                self.get_query_start(context)
+                if self.replication_key and not window
+                else None
+            )
+        else:
+            after, offset = self._resume_checkpoint(context, checkpoint)
+
+        pages = self.request_pages({**(context or {}), CHECKPOINT_AFTER: after}, offset)
+        prefetch_pages = self.config.get("prefetch_pages", 0)
+        if prefetch_pages and self._tap.async_transport is None:
+            from tap_chargebee.concurrency import iter_concurrently
+
+            # Fetch and parse pages on a background thread while the caller
+            # processes earlier ones, holding at most `prefetch_pages` pages.
+            pages = (
+                page
+                for _, page in iter_concurrently(
+                    [pages],
+                    1,
+                    max_buffered=prefetch_pages,
+                )
+            )
+
+        checkpoint_pages = self.config.get("checkpoint_pages")
+        checkpoint_seconds = self.config.get("checkpoint_seconds")
+        if (
+            self.get_batch_config(self.config) is not None
+            or window
+            or (context and PARENT_RECORDS in context)
+        ):
+            # Records are only safe once their batch file is written, after the
+            # page that read them; batches are checkpointed by their own STATE.
+            # Time windows are tracked by the backfill or events feed reading them,
+            # and child reads only cover one batch of parents.
+            checkpoint_pages = checkpoint_seconds = None
+        last_checkpoint = time.monotonic()
+        pages_since_checkpoint = 0
+        pages_read = 0
+        # Until its first page is returned, a resumed offset may be rejected.
+        resuming_offset = offset is not None
+        try:
+            for records, next_offset in pages:
+                resuming_offset = False
+                yield from records
+                pages_since_checkpoint += 1
+                pages_read += 1
+                if next_offset and (
+                    (checkpoint_pages and pages_since_checkpoint >= checkpoint_pages)
+                    or (
+                        checkpoint_seconds
+                        and time.monotonic() - last_checkpoint >= checkpoint_seconds
+                    )
+                ):
+                    self._write_checkpoint(context, after, next_offset)
+                    last_checkpoint = time.monotonic()
+                    pages_since_checkpoint = 0
+        except FatalAPIError:
+            if not resuming_offset:
+                raise
+            self.logger.warning(
+                "The checkpoint offset of '%s' was rejected, resuming from its "
+                "replication key value instead.",
+                self.name,
+            )
+            yield from self.request_paged_records(
+                context,
+                {**checkpoint, "offset": None},
+            )
+            return
+
+        with self._tap.message_lock:
+            state = self.get_context_state(context)
+            state.pop("checkpoint", None)
+            if (
+                checkpoint is None
+                and not window
+                and PARENT_RECORDS not in (context or {})
+            ):
+                state["last_sync_pages"] = pages_read
+
+    def _resume_checkpoint(
+        self,
+        context: dict | None,
+        checkpoint: dict,
+    ) -> tuple[int | None, str | None]:
+        """Restore the progress of a checkpoint and return the query to resume.
+
+        Args:
+            context: The stream context.
+            checkpoint: The checkpoint saved by `request_paged_records`.
+
+        Returns:
+            The `[after]` bound and the offset of the first page to request.
+        """
+        value = checkpoint.get("replication_key_value")
+        if value is not None and self.replication_key:
+            # Progress markers were reset when the sync started; restore the ones
+            # covering the records processed before the checkpoint.
+            self._increment_stream_state(
+                {self.replication_key: value},
+                context=context,
+            )
+
+        if checkpoint.get("offset"):
+            self.logger.info(
+                "Resuming '%s' from its checkpoint at offset %s.",
+                self.name,
+                checkpoint["offset"],
+            )
+            return checkpoint.get("after"), checkpoint["offset"]
+
+        if value is None:
+            return checkpoint.get("after"), None
+        # `[after]` is exclusive, and records sharing the checkpoint's timestamp may
+        # not all have been processed.
+        self.logger.info(
+            "Resuming '%s' from its checkpoint at %s.",
+            self.name,
+            value,
+        )
+        return to_unix_timestamp(value) - 1, None
+
+    def _write_checkpoint(
+        self,
+        context: dict | None,
+        after: int | None,
+        offset: str,
+    ) -> None:
+        """Save the progress of the stream's query and write a STATE message.
+
+        Args:
+            context: The stream context.
+            after: The query's `[after]` bound.
+            offset: The offset of the next page to process.
+        """
+        self._sync_pending_children()
+        with self._tap.message_lock:
+            state = self.get_context_state(context)
+            progress_markers = state.get("progress_markers") or {}
+            state["checkpoint"] = {
+                "after": after,
+                "offset": offset,
+                "replication_key_value": progress_markers.get("replication_key_value"),
+            }
+            self._is_state_flushed = False
+            self._write_state_message()
+
+    def get_event_sourced_start(self, context: dict | None) -> int | None:
+        """Return the point to read this stream's changes from the events feed.
+
+        Streams are event-sourced when `event_sourced_sync` is enabled, events embed
+        their resource (see `event_content_key`) and they already have a bookmark;
+        an initial sync always uses the list endpoint. The `events` stream itself then
+        reuses the feed's read of the events. Changes are read from the later of the
+        bookmark and the `event_cursor` of the last feed the stream read, so streams
+        without recent changes do not make the feed read back to their bookmark.
+
+        Args:
+            context: The stream context.
+
+        Returns:
+            The stream's starting unix timestamp, or None to use the list endpoint.
+        """
+        if (
+            not self.config.get("event_sourced_sync")
+            or not (self.event_content_key or self.is_event_feed)
+            or not self.replication_key
+            or not self.selected
+            or (context and WINDOW_START in context)
+        ):
+            return None
+        state = self.get_context_state(context)
+        bookmark = state.get("replication_key_value")
+        if bookmark is None:
+            return None
+        return max(to_unix_timestamp(bookmark), state.get("event_cursor") or 0)
+
+    def request_records(self, context: dict | None) -> Iterable[dict]:
+        """Request records, from the events feed or in parallel time slices if enabled.
+
+        Args:
+            context: The stream context.
+
+        Yields:
+            An item for every record in the response.
+        """
+        # An interrupted sync resumes from its checkpoint with the same cursor.
+        checkpoint = None
+        if not (context and WINDOW_START in context):
+            checkpoint = self.get_context_state(context).get("checkpoint")
+        if checkpoint is not None:
+            yield from self.request_paged_records(context, checkpoint)
+            return
+
+        event_sourced_start = self.get_event_sourced_start(context)
+        if event_sourced_start is not None:
+            feed = self._tap.get_event_feed(context)
+            records = feed.get_records(self, event_sourced_start)
+            if records is not None:
+                self.logger.info(
+                    "Read %d changed '%s' records from the events feed.",
+                    len(records),
+                    self.name,
+                )
+                yield from records
+                if feed.cursor is not None:
+                    with self._tap.message_lock:
+                        state = self.get_context_state(context)
+                        state["event_cursor"] = max(
+                            state.get("event_cursor") or 0,
+                            feed.cursor,
+                        )
+                return
+
+        plan = self.get_backfill_plan(context)
+        if plan is None:
+            yield from self.request_paged_records(context)
+        else:
+            yield from self.request_backfill_records(context, plan)
+
+    def request_records_by_id(
+        self,
+        context: dict | None,
+        ids: list[str],
+    ) -> Iterable[dict]:
+        """Request specific records from the list endpoint, with an `id[in]` filter.
+
+        Args:
+            context: The stream context.
+            ids: IDs of the records to request.
+
+        Yields:
+            The parsed records found, with the configured `filters` applied.
+        """
+        for start in range(0, len(ids), MAX_PAGE_SIZE):
+            batch_context = {
+                **(context or {}),
+                CHECKPOINT_AFTER: None,
+                RAW_RECORDS: True,
+                RECORD_IDS: ids[start : start + MAX_PAGE_SIZE],
+            }
+            for records, _ in self.request_pages(batch_context):
+                yield from records
+
+    def request_backfill_records(
+        self,
+        context: dict | None,
+        plan: BackfillPlan,
+    ) -> Iterable[dict]:
+        """Request the pending time slices of a backfill in parallel.
+
+        Progress is saved in the stream state as slices complete, so an interrupted
+        backfill resumes with the slices still pending.
+
+        Args:
+            context: The stream context.
+            plan: The backfill plan, see `get_backfill_plan`.
+
+        Yields:
+            An item for every record in the responses, in the order they arrive.
+        """
+        with self._tap.message_lock:
+            state = self.get_context_state(context)
+            state["backfill"] = plan.to_state()
+        pending = plan.pending()
+        self.logger.info(
+            "Backfilling '%s' in %d time slices (%d already complete).",
+            self.name,
+            len(plan.completed) + len(pending),
+            len(plan.completed),
+        )
+        state_seconds = self.config.get("checkpoint_seconds") or BACKFILL_STATE_SECONDS
+        last_state = time.monotonic()
+
+        def complete_slice(index: int) -> None:
+            nonlocal last_state
+            self._sync_pending_children()
+            with self._tap.message_lock:
+                plan.completed.add(pending[index][0])
+                state["backfill"] = plan.to_state()
+                self._is_state_flushed = False
+                if time.monotonic() - last_state >= state_seconds:
+                    self._write_state_message()
+                    last_state = time.monotonic()
+
+        slice_contexts = [
+            {**(context or {}), WINDOW_START: lower, WINDOW_END: upper}
+            for _, (lower, upper) in pending
+        ]
+        backfill_workers = self.config.get("backfill_workers", 4)
+        self._slice_parallelism = max(
+            self._slice_parallelism,
+            min(len(pending), backfill_workers),
+        )
+        transport = self._tap.async_transport
+        if transport is not None:
+            # Slices are paginated as coroutines rather than on a thread each.
+            for _, (records, _) in transport.iter_async(
+                [
+                    self.request_pages_async(slice_context)
+                    for slice_context in slice_contexts
+                ],
+                backfill_workers,
+                max_buffered=backfill_workers,
+                on_exhausted=complete_slice,
+            ):
+                yield from records
+        else:
+            from tap_chargebee.concurrency import iter_concurrently
+
+            for _, (records, _) in iter_concurrently(
+                [self.request_pages(slice_context) for slice_context in slice_contexts],
+                backfill_workers,
+                max_buffered=backfill_workers,
+                on_exhausted=complete_slice,
+            ):
+                yield from records
+
+        with self._tap.message_lock:
+            state.pop("backfill", None)
+
+    # Singer output is shared by every stream of the tap, which may be synced from
+    # several worker threads at once (see `TapChargebee.sync_all`). All reads and
+    # writes of the tap state and all writes to stdout go through the tap's lock.
+
+    def get_context_state(self, context: dict | None) -> dict:
+        """Return a writable state dict for the given context."""
+        with self._tap.message_lock:
+            return super().get_context_state(context)
+
+    def _increment_stream_state(
+        self,
+        latest_record: dict[str, Any],
+        *,
+        context: dict | None = None,
+    ) -> None:
+        with self._tap.message_lock:
+            super()._increment_stream_state(latest_record, context=context)
+
+    def _write_starting_replication_value(self, context: dict | None) -> None:
+        with self._tap.message_lock:
+            super()._write_starting_replication_value(context)
+
+    def _write_replication_key_signpost(
+        self,
+        context: dict | None,
+        value: datetime.datetime | str | int | float,
+    ) -> None:
+        with self._tap.message_lock:
+            super()._write_replication_key_signpost(context, value)
+
+    def _finalize_state(self, state: dict | None = None) -> None:
+        with self._tap.message_lock:
+            super()._finalize_state(state)
+
+    def finalize_state_progress_markers(self, state: dict | None = None) -> None:
+        """Reset progress markers, record the sync history and emit state."""
+        with self._tap.message_lock:
+            if (
+                self._tap.stream_scheduling
+                and not self.parent_stream_type
+                and self.stage_timer.sync_seconds
+            ):
+                self.stream_state["sync_history"] = add_sync(
+                    self.sync_history,
+                    self.stage_timer.sync_seconds,
+                    self.stage_timer.records,
+                    self._slice_parallelism,
+                )
+            super().finalize_state_progress_markers(state)
+
+    @property
+    def sync_history(self) -> list[dict]:
+        """Return the durations and record counts of this stream's last syncs.
+
+        Returns:
+            The syncs recorded in the stream state, oldest first.
+        """
+        with self._tap.message_lock:
+            return list(self.stream_state.get("sync_history", []))
+
+    @property
+    def expected_sync_seconds(self) -> float | None:
+        """Return the expected duration of this stream's sync, from its history.
+
+        Returns:
+            The expected duration in seconds, or None if the stream was never synced.
+        """
+        return expected_seconds(self.sync_history)
+
+    def _write_state_message(self) -> None:
+        with self._tap.message_lock:
+            super()._write_state_message()
+
+    def _write_schema_message(self) -> None:
+        with self._tap.message_lock:
+            super()._write_schema_message()
+
+    def _generate_record_messages(
+        self,
+        record: dict,
+    ) -> Generator[RecordMessage, None, None]:
+        # Deselected properties were already dropped by `get_records`.
+        record = conform_record_data_types(
+            stream_name=self.name,
+            record=record,
+            schema=self.schema,
+            level=self.TYPE_CONFORMANCE_LEVEL,
+            logger=self.logger,
+        )
+        for stream_map in self.stream_maps:
+            mapped_record = stream_map.transform(record)
+            # Emit record if not filtered
+            if mapped_record is not None:
+                yield RecordMessage(
+                    stream=stream_map.stream_alias,
+                    record=mapped_record,
+                    version=None,
+                    time_extracted=utc_now(),
+                )
+
+    def _encode_record(self, record: dict, stage_timer: StageTimer) -> str:
+        """Conform a record and encode its RECORD messages, one per line."""
+        clock = time.perf_counter
+        start = clock()
+        record_messages = list(self._generate_record_messages(record))
+        conformed = clock()
+        lines = "".join(format_message(message) + "\n" for message in record_messages)
+        stage_timer.add(Stage.TYPE_CONFORMANCE, conformed - start)
+        stage_timer.add(Stage.SERIALIZE, clock() - conformed)
+        return lines
+
+    def _write_record_message(self, record: dict) -> None:
+        # Conform and encode outside the lock, so only the write is serialized.
+        if isinstance(record, EncodedRecord):
+            lines = record.lines
+        else:
+            lines = self._encode_record(record, self.stage_timer)
+        with self._tap.message_lock:
+            sys.stdout.write(lines)
+            sys.stdout.flush()
+            self._is_state_flushed = False
+
+    def _write_batch_message(
+        self,
+        encoding: BaseBatchFileEncoding,
+        manifest: list[str],
+    ) -> None:
+        with self._tap.message_lock:
+            super()._write_batch_message(encoding, manifest)
+
+
+class ChargebeeChildStream(ChargebeeStream):
+    """A stream of resources that belong to the records of a parent stream.
+
+    Parent streams sync their child streams once per batch of up to
+    `MAX_PARENT_BATCH` records, passed in the `PARENT_RECORDS` context key, rather
+    than once per record. Child records are either flattened from an array property
+    of each parent record (`parent_array_key`), without any request, or listed from
+    the child's own endpoint with one `<parent_id_key>[in]` filter per batch.
+    """
+
+    #: Property of child records holding the ID of their parent.
+    parent_id_key: str
+    #: Property of parent records holding the child records, if the parent embeds
+    #: them. Otherwise they are listed from the child's `path`.
+    parent_array_key: str | None = None
+
+    has_custom_fields = False
+
+    def get_url_params(
+        self,
+        context: dict | None,
+        next_page_token: Any | None,
+    ) -> dict[str, Any]:
+        """Return the URL parameters, filtered on the batch's parent IDs.
+
+        Args:
+            context: The stream context.
+            next_page_token: The next page index or value.
+
+        Returns:
+            A dictionary of URL query parameters.
+        """
+        params = super().get_url_params(context, next_page_token)
+        if context and PARENT_RECORDS in context:
+            params[f"{self.parent_id_key}[in]"] = json.dumps(
+                [parent["id"] for parent in context[PARENT_RECORDS]],
+            )
+        return params
+
+    def request_records(self, context: dict | None) -> Iterable[dict]:
+        """Return the child records of a batch of parent records.
+
+        Args:
+            context: The stream context, with the parent records.
+
+        Yields:
+            An item for every child record, with the ID of its parent.
+        """
+        if not context or PARENT_RECORDS not in context:
+            # Child streams are only synced by their parent stream.
+            return
+        if self.parent_array_key is None:
+            yield from super().request_records(context)
+            return
+        for parent in context[PARENT_RECORDS]:
+            for item in parent.get(self.parent_array_key) or []:
+                yield {**item, self.parent_id_key: parent["id"]}
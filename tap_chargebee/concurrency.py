@@ -0,0 +1,116 @@
+"""Thread helpers for fetching Chargebee data concurrently."""
+
+from __future__ import annotations
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, Sequence, TypeVar
+
+_T = TypeVar("_T")
+
+#: Marks the end of an iterable in the buffers of `iter_buffer`.
+EXHAUSTED = object()
+_PUT_TIMEOUT = 0.1
+
+
+def iter_buffer(
+    buffer: queue.Queue,
+    count: int,
+    on_exhausted: Callable[[int], None] | None = None,
+) -> Iterator[tuple[int, _T]]:
+    """Yield the items workers put in a buffer, until `count` iterables are done.
+
+    Workers put `(index, item, None)` for each item of an iterable, then
+    `(index, EXHAUSTED, None)` once it is done, or `(index, None, error)` if it
+    raised.
+
+    Args:
+        buffer: The buffer the workers put entries in.
+        count: Number of iterables the workers consume.
+        on_exhausted: Called with the index of each iterable once all of its items
+            have been yielded.
+
+    Yields:
+        Tuples of (iterable index, item).
+
+    Raises:
+        BaseException: The error an iterable raised.
+    """
+    remaining = count
+    while remaining:
+        index, item, error = buffer.get()
+        if error is not None:
+            raise error
+        if item is EXHAUSTED:
+            remaining -= 1
+            if on_exhausted:
+                on_exhausted(index)
+            continue
+        yield index, item
+
+
+def _put(buffer: queue.Queue, stop: threading.Event, entry: tuple) -> bool:
+    while not stop.is_set():
+        try:
+            buffer.put(entry, timeout=_PUT_TIMEOUT)
+        except queue.Full:
+            continue
+        return True
+    return False
+
+
+def _drain(
+    buffer: queue.Queue,
+    stop: threading.Event,
+    index: int,
+    iterable: Iterable,
+) -> None:
+    if stop.is_set():
+        return
+    try:
+        for item in iterable:
+            if not _put(buffer, stop, (index, item, None)):
+                return
+    except BaseException as ex:  # noqa: BLE001
+        _put(buffer, stop, (index, None, ex))
+        return
+    _put(buffer, stop, (index, EXHAUSTED, None))
+
+
+def iter_concurrently(
+    iterables: Sequence[Iterable[_T]],
+    max_workers: int,
+    *,
+    max_buffered: int = 1000,
+    on_exhausted: Callable[[int], None] | None = None,
+) -> Iterator[tuple[int, _T]]:
+    """Consume several iterables on worker threads and yield their items.
+
+    Items are yielded on the calling thread in the order they arrive, tagged with the
+    index of the iterable that produced them. At most `max_buffered` items are held
+    in memory; workers block until the caller catches up. If any iterable raises, the
+    exception is re-raised on the calling thread and the remaining workers stop.
+
+    Args:
+        iterables: The iterables to consume.
+        max_workers: Maximum number of iterables consumed at the same time.
+        max_buffered: Maximum number of items waiting to be yielded.
+        on_exhausted: Called on the calling thread with the index of each iterable
+            once all of its items have been yielded.
+
+    Yields:
+        Tuples of (iterable index, item).
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=max_buffered)
+    stop = threading.Event()
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(max_workers, len(iterables) or 1)),
+        thread_name_prefix="tap-chargebee-fetch",
+    ) as executor:
+        for index, iterable in enumerate(iterables):
+            executor.submit(_drain, buffer, stop, index, iterable)
+        try:
+            yield from iter_buffer(buffer, len(iterables), on_exhausted)
+        finally:
+            stop.set()
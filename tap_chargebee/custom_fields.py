@@ -0,0 +1,143 @@
+"""Inference of the schema of custom fields from sampled records."""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any, Iterable
+
+#: Prefix of the names of the custom fields Chargebee adds to resources.
+CUSTOM_FIELD_PREFIX = "cf_"
+
+#: Property holding the free-form JSON metadata of a resource.
+META_DATA = "meta_data"
+
+# Checked in order, as `bool` is a subclass of `int`.
+_JSON_TYPES = (
+    (bool, "boolean"),
+    (int, "integer"),
+    ((float, Decimal), "number"),
+    (str, "string"),
+    (dict, "object"),
+    (list, "array"),
+)
+
+
+def _json_type(value: object) -> str:
+    for python_type, json_type in _JSON_TYPES:
+        if isinstance(value, python_type):
+            return json_type
+    return "string"
+
+
+def infer_schema(values: Iterable[Any]) -> dict:
+    """Infer the JSON schema of a property from sampled values.
+
+    Integers and numbers are merged into `number`, and the properties of objects are
+    inferred from their own values. Properties only sampled as nulls are strings.
+
+    Args:
+        values: The property's values in the sampled records.
+
+    Returns:
+        The property's JSON schema, always nullable.
+    """
+    types: list[str] = []
+    objects: list[dict] = []
+    for value in values:
+        if value is None:
+            continue
+        json_type = _json_type(value)
+        if json_type not in types:
+            types.append(json_type)
+        if json_type == "object":
+            objects.append(value)
+    if "integer" in types and "number" in types:
+        types.remove("integer")
+    schema: dict[str, Any] = {"type": [*(types or ["string"]), "null"]}
+    if objects:
+        schema["properties"] = _infer_properties(objects)
+    return schema
+
+
+def _infer_properties(records: list[dict], names: Iterable[str] | None = None) -> dict:
+    if names is None:
+        names = dict.fromkeys(name for record in records for name in record)
+    return {
+        name: infer_schema(record.get(name) for record in records) for name in names
+    }
+
+
+def infer_custom_fields(records: Iterable[dict], properties: dict) -> dict[str, dict]:
+    """Infer the schema of the custom fields and metadata keys of sampled records.
+
+    Args:
+        records: The sampled records.
+        properties: The properties of the stream's static schema. Custom fields it
+            declares are not inferred.
+
+    Returns:
+        The schema of each custom field missing from `properties`, and of
+        `meta_data` with the properties of its sampled keys, by property name.
+    """
+    records = list(records)
+    names = dict.fromkeys(
+        name
+        for record in records
+        for name in record
+        if name.startswith(CUSTOM_FIELD_PREFIX) and name not in properties
+    )
+    custom_fields = _infer_properties(records, names)
+    meta_data = [
+        record[META_DATA]
+        for record in records
+        if isinstance(record.get(META_DATA), dict)
+    ]
+    meta_data_properties = _infer_properties(meta_data)
+    if meta_data_properties:
+        custom_fields[META_DATA] = {
+            **properties.get(META_DATA, {"type": ["object", "null"]}),
+            "properties": meta_data_properties,
+        }
+    return custom_fields
+
+
+def merge_schemas(first: dict, second: dict) -> dict:
+    """Merge two inferred property schemas, e.g. of the same field on two sites.
+
+    Args:
+        first: A property schema.
+        second: Another schema of the same property.
+
+    Returns:
+        A schema accepting the values of both.
+    """
+    types = [
+        json_type
+        for json_type in dict.fromkeys([*first["type"], *second["type"]])
+        if json_type != "null"
+    ]
+    if "integer" in types and "number" in types:
+        types.remove("integer")
+    merged = {**first, **second, "type": [*types, "null"]}
+    if "properties" in first and "properties" in second:
+        merged["properties"] = merge_properties(
+            first["properties"],
+            second["properties"],
+        )
+    return merged
+
+
+def merge_properties(first: dict, second: dict) -> dict:
+    """Merge two sets of inferred properties.
+
+    Args:
+        first: Property schemas, by name.
+        second: Other property schemas, by name.
+
+    Returns:
+        The properties of both, with the schemas of common properties merged.
+    """
+    merged = dict(first)
+    for name, schema in second.items():
+        merged[name] = merge_schemas(merged[name], schema) if name in merged else schema
+    return merged
@@ -0,0 +1,85 @@
+"""De-duplication of records read more than once across overlapping windows."""
+
+from __future__ import annotations
+
+import heapq
+from collections import OrderedDict
+from typing import Iterable
+
+
+class BoundaryIndex:
+    """Remembers record versions seen near the boundary of incremental windows.
+
+    Each record is identified by a version key, such as `<id>@<resource_version>`.
+    A key is a duplicate if it was among the boundary keys of the previous run, or
+    if it was already seen in this run; in-run keys are kept in a bounded LRU. The
+    keys of all records read within `overlap_seconds` of the highest replication
+    timestamp, duplicates included, become the boundary keys of the next run.
+    """
+
+    def __init__(
+        self,
+        overlap_seconds: int,
+        previous_keys: Iterable[str] = (),
+        cache_size: int = 50_000,
+    ) -> None:
+        """Create an index.
+
+        Args:
+            overlap_seconds: Width of the boundary region, in seconds.
+            previous_keys: Boundary keys saved by the previous run.
+            cache_size: Maximum number of keys remembered within this run.
+        """
+        self.overlap_seconds = overlap_seconds
+        self.previous_keys = frozenset(previous_keys)
+        self.cache_size = cache_size
+        self.duplicates = 0
+        self._seen: OrderedDict[str, None] = OrderedDict()
+        self._boundary: list[tuple[int, str]] = []
+        self._max_timestamp: int | None = None
+
+    def is_duplicate(self, key: str) -> bool:
+        """Return whether a version key was already seen, and remember it if not.
+
+        Args:
+            key: The record's version key.
+
+        Returns:
+            True if the record version was already emitted.
+        """
+        if key in self.previous_keys or key in self._seen:
+            if key in self._seen:
+                self._seen.move_to_end(key)
+            self.duplicates += 1
+            return True
+        self._seen[key] = None
+        if len(self._seen) > self.cache_size:
+            self._seen.popitem(last=False)
+        return False
+
+    def add(self, key: str, timestamp: int) -> None:
+        """Track a record read in this run for the next run's boundary keys.
+
+        Args:
+            key: The record's version key.
+            timestamp: The record's replication key value, as a unix timestamp.
+        """
+        if self._max_timestamp is None or timestamp > self._max_timestamp:
+            self._max_timestamp = timestamp
+        cutoff = self._max_timestamp - self.overlap_seconds
+        if timestamp < cutoff:
+            return
+        heapq.heappush(self._boundary, (timestamp, key))
+        while self._boundary[0][0] < cutoff:
+            heapq.heappop(self._boundary)
+
+    def boundary_keys(self) -> list[str]:
+        """Return the keys of the records in the boundary region.
+
+        Returns:
+            The version keys to save for the next run, or the previous run's keys if
+            no record was read.
+        """
+        if self._max_timestamp is None:
+            return sorted(self.previous_keys)
+        return sorted({key for _, key in self._boundary})
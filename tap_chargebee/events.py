@@ -0,0 +1,172 @@
+"""Event-sourced incremental sync for Chargebee entity streams."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from tap_chargebee.client import RAW_RECORDS, UNFILTERED, WINDOW_END, WINDOW_START
+
+if TYPE_CHECKING:
+    from tap_chargebee.client import ChargebeeStream
+    from tap_chargebee.tap import TapChargebee
+
+
+class EventFeed:
+    """Reads the `events` feed once and fans the changes out to streams.
+
+    Every Chargebee event embeds the resources it touched under `content`, keyed by
+    resource type (`content.subscription`, `content.customer`, ...). The feed reads
+    all events after the earliest start of the streams using it (see
+    `ChargebeeStream.get_event_sourced_start`), and keeps the latest version of each
+    embedded entity for the streams to emit, along with the events themselves when
+    the `events` stream is event-sourced too. `cursor` is the time of the last event
+    read, which streams keep in state so quiet streams do not hold the feed back.
+    With `sites`, each site has its own feed.
+    """
+
+    def __init__(self, tap: TapChargebee, context: dict | None = None) -> None:
+        """Create a feed over the tap's `events` stream.
+
+        Args:
+            tap: The tap whose streams use the feed.
+            context: The site partition of the feed, None without `sites`.
+        """
+        self.tap = tap
+        self.context = context
+        self.start: int | None = None
+        self.cursor: int | None = None
+        # The latest version of each entity, with the time of its latest event.
+        self._entities: dict[str, dict[str, tuple[dict, int]]] | None = None
+        self._events: list[dict] | None = None
+        self._lock = threading.Lock()
+
+    def get_records(self, stream: ChargebeeStream, after: int) -> list[dict] | None:
+        """Return the records of a stream changed after a timestamp.
+
+        Records are filtered by the stream's `filters`. Entities embedded without
+        their primary keys, replication key or required properties are requested
+        from the stream's list endpoint instead.
+
+        Args:
+            stream: The `events` stream, or an entity stream with an
+                `event_content_key`.
+            after: The stream's starting replication value, as a unix timestamp.
+
+        Returns:
+            The events, or the latest version of each changed entity, sorted by
+            replication key, or None if the feed does not reach back to `after`.
+        """
+        with self._lock:
+            if self._entities is None:
+                self._load(after)
+            if self.start is None or self.start > after or self._entities is None:
+                return None
+            if stream.is_event_feed:
+                # The events are only kept until the `events` stream reads them.
+                events, self._events = self._events, None
+                if events is None:
+                    return None
+                return [
+                    event
+                    for event in events
+                    if _as_int(event.get(stream.replication_key), 0) > after
+                    and stream.matches_filters(event)
+                ]
+            if stream.event_content_key is None:
+                return None
+            entities = list(self._entities[stream.event_content_key].values())
+
+        replication_key = stream.replication_key
+        required = {
+            *(stream.primary_keys or ()),
+            replication_key,
+            *stream.schema.get("required", ()),
+        }
+        changed = []
+        incomplete = []
+        for entity, occurred_at in entities:
+            if any(entity.get(name) is None for name in required):
+                incomplete.append(entity["id"])
+            elif _as_int(
+                entity[replication_key],
+                occurred_at,
+            ) > after and stream.matches_filters(entity):
+                changed.append(dict(entity))
+        if incomplete:
+            stream.logger.info(
+                "Requesting %d '%s' records missing from the events feed.",
+                len(incomplete),
+                stream.name,
+            )
+            changed.extend(
+                record
+                for record in stream.request_records_by_id(self.context, incomplete)
+                if _as_int(record.get(replication_key), 0) > after
+                and stream.matches_filters(record)
+            )
+        return sorted(
+            changed,
+            key=lambda record: _as_int(record.get(replication_key), 0),
+        )
+
+    def _load(self, after: int) -> None:
+        """Read every event since the earliest start of the event-sourced streams."""
+        streams = [
+            stream
+            for stream in self.tap.chargebee_streams.values()
+            if stream.event_content_key or stream.is_event_feed
+        ]
+        starts = [after]
+        keep_events = False
+        for stream in streams:
+            start = stream.get_event_sourced_start(self.context)
+            if start is not None:
+                starts.append(start)
+                keep_events = keep_events or stream.is_event_feed
+        self.start = min(starts)
+        self._entities = {
+            stream.event_content_key: {}
+            for stream in streams
+            if stream.event_content_key
+        }
+        self._events = [] if keep_events else None
+
+        events_stream = self.tap.chargebee_streams["events"]
+        events_stream.logger.info(
+            "Reading events after %d for event-sourced streams.",
+            self.start,
+        )
+        # Entity streams need every change, whatever the `events` stream's filters,
+        # and the parsed events rather than their RECORD messages.
+        context = {
+            **(self.context or {}),
+            WINDOW_START: self.start + 1,
+            WINDOW_END: int(time.time()) + 1,
+            UNFILTERED: True,
+            RAW_RECORDS: True,
+        }
+        for event in events_stream.request_records(context):
+            if self._events is not None:
+                self._events.append(event)
+            content = event.get("content") or {}
+            occurred_at = _as_int(event.get("occurred_at"), self.start + 1)
+            self.cursor = max(self.cursor or occurred_at, occurred_at)
+            for key in self._entities.keys() & content.keys():
+                entity = content[key]
+                if not isinstance(entity, dict) or "id" not in entity:
+                    continue
+                known = self._entities[key].get(entity["id"])
+                if known is None or _as_int(
+                    entity.get("resource_version"),
+                    0,
+                ) >= _as_int(known[0].get("resource_version"), 0):
+                    self._entities[key][entity["id"]] = (entity, occurred_at)
+
+
+def _as_int(value: object, default: int) -> int:
+    try:
+        return int(value)  # type: ignore[call-overload]
+    except (TypeError, ValueError):
+        return default
@@ -0,0 +1,207 @@
+"""Timing of the stages a record goes through during a stream sync."""
+
+from __future__ import annotations
+
+import contextlib
+import enum
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Mapping
+
+
+class Stage(str, enum.Enum):
+    """Stages of a stream sync, in the order a record goes through them."""
+
+    #: Sending a request and waiting for the response headers.
+    HTTP_WAIT = "http_wait"
+    #: Decoding the response body, including reading it when parsing while streaming.
+    JSON_DECODE = "json_decode"
+    #: Extracting the records from the decoded response.
+    EXTRACT = "extract"
+    #: `post_process` of each record.
+    POST_PROCESS = "post_process"
+    #: Dropping deselected properties, type conformance and stream maps.
+    TYPE_CONFORMANCE = "type_conformance"
+    #: Encoding RECORD messages and writing them to stdout.
+    SERIALIZE = "serialize"
+
+
+class StageTimer:
+    """Accumulates the time a stream spends in each sync stage.
+
+    Request stages may run on background threads (see `prefetch_pages` and
+    `backfill_slice_days`), so all updates are made under a lock.
+    """
+
+    def __init__(self) -> None:
+        """Create a timer with all stages at zero."""
+        self.seconds = dict.fromkeys(Stage, 0.0)
+        self.counts = dict.fromkeys(Stage, 0)
+        self.records = 0
+        self.pages = 0
+        self.slowest_page_seconds = 0.0
+        self.sync_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, stage: Stage, seconds: float, count: int = 1) -> None:
+        """Add time spent in a stage.
+
+        Args:
+            stage: The stage.
+            seconds: Time spent in the stage.
+            count: Number of calls or records the time covers.
+        """
+        with self._lock:
+            self.seconds[stage] += seconds
+            self.counts[stage] += count
+
+    def add_page(self, seconds: float) -> None:
+        """Count a page fetched in the given time.
+
+        Args:
+            seconds: Time spent fetching, decoding and extracting the page.
+        """
+        with self._lock:
+            self.pages += 1
+            self.slowest_page_seconds = max(self.slowest_page_seconds, seconds)
+
+    def add_records(self, count: int) -> None:
+        """Count records returned by the stream.
+
+        Args:
+            count: Number of records.
+        """
+        with self._lock:
+            self.records += count
+
+    def add_sync(self, seconds: float) -> None:
+        """Add the wall time of a stream sync.
+
+        Args:
+            seconds: Time the sync took.
+        """
+        with self._lock:
+            self.sync_seconds += seconds
+
+
+def _labels(**labels: str) -> str:
+    pairs = []
+    for name, value in labels.items():
+        escaped = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def format_prometheus(timers: Mapping[str, StageTimer]) -> str:
+    """Format stream timers in the Prometheus text exposition format.
+
+    Args:
+        timers: Stage timers by stream name.
+
+    Returns:
+        The metrics, one sample per line.
+    """
+    families: dict[str, tuple[str, str, list[str]]] = {
+        "tap_chargebee_stage_seconds_total": (
+            "counter",
+            "Time spent in each sync stage.",
+            [],
+        ),
+        "tap_chargebee_stage_calls_total": (
+            "counter",
+            "Number of calls or records timed in each sync stage.",
+            [],
+        ),
+        "tap_chargebee_records_total": (
+            "counter",
+            "Number of records returned by the stream.",
+            [],
+        ),
+        "tap_chargebee_pages_total": (
+            "counter",
+            "Number of pages requested by the stream.",
+            [],
+        ),
+        "tap_chargebee_sync_seconds": (
+            "gauge",
+            "Wall time of the stream sync.",
+            [],
+        ),
+        "tap_chargebee_records_per_second": (
+            "gauge",
+            "Records returned per second of stream sync.",
+            [],
+        ),
+        "tap_chargebee_slowest_page_seconds": (
+            "gauge",
+            "Time spent fetching, decoding and extracting the slowest page.",
+            [],
+        ),
+    }
+
+    def sample(family: str, value: float, **labels: str) -> None:
+        families[family][2].append(f"{family}{_labels(**labels)} {value:.6g}")
+
+    for stream_name, timer in sorted(timers.items()):
+        for stage in Stage:
+            sample(
+                "tap_chargebee_stage_seconds_total",
+                timer.seconds[stage],
+                stream=stream_name,
+                stage=stage.value,
+            )
+            sample(
+                "tap_chargebee_stage_calls_total",
+                timer.counts[stage],
+                stream=stream_name,
+                stage=stage.value,
+            )
+        sample("tap_chargebee_records_total", timer.records, stream=stream_name)
+        sample("tap_chargebee_pages_total", timer.pages, stream=stream_name)
+        sample("tap_chargebee_sync_seconds", timer.sync_seconds, stream=stream_name)
+        sample(
+            "tap_chargebee_records_per_second",
+            timer.records / timer.sync_seconds if timer.sync_seconds else 0.0,
+            stream=stream_name,
+        )
+        sample(
+            "tap_chargebee_slowest_page_seconds",
+            timer.slowest_page_seconds,
+            stream=stream_name,
+        )
+
+    lines = []
+    for family, (metric_type, description, samples) in families.items():
+        lines.append(f"# HELP {family} {description}")
+        lines.append(f"# TYPE {family} {metric_type}")
+        lines.extend(samples)
+    last_sync = "tap_chargebee_last_sync_timestamp_seconds"
+    lines.append(f"# HELP {last_sync} End of the last sync.")
+    lines.append(f"# TYPE {last_sync} gauge")
+    lines.append(f"{last_sync} {time.time():.3f}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus_file(path: str | Path, timers: Mapping[str, StageTimer]) -> None:
+    """Atomically write stream timers to a Prometheus text file.
+
+    The file can be read by the node exporter's textfile collector, or served as is.
+
+    Args:
+        path: The file to write.
+        timers: Stage timers by stream name.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w") as tmp:
+            tmp.write(format_prometheus(timers))
+        Path(tmp_path).replace(path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            Path(tmp_path).unlink()
+        raise
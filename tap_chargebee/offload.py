@@ -0,0 +1,106 @@
+"""Offloading of record conformance and serialization to a pool of processes."""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from singer_sdk import Tap
+
+    from tap_chargebee.instrumentation import Stage
+
+# The tap rebuilt in each worker process by `_initialize_worker`.
+_worker_tap: Tap | None = None
+
+
+class EncodedRecord(dict):
+    """A record already encoded as RECORD message lines by a worker process.
+
+    The dict only holds the fields the syncing stream still needs, such as the
+    primary and replication keys; the full record only exists, encoded, in `lines`.
+    """
+
+    lines: str
+
+    def __init__(self, fields: dict, lines: str) -> None:
+        """Create an encoded record.
+
+        Args:
+            fields: The record's bookkeeping fields.
+            lines: The record's encoded RECORD messages, one per line.
+        """
+        super().__init__(fields)
+        self.lines = lines
+
+
+def _initialize_worker(config: dict, catalog: dict | None) -> None:
+    global _worker_tap  # noqa: PLW0603
+    from tap_chargebee.tap import TapChargebee
+
+    # Workers only encode records: requests, metrics and state stay with the tap.
+    logging.disable(logging.INFO)
+    _worker_tap = TapChargebee(config=config, catalog=catalog, parse_env_config=False)
+
+
+def _encode_page(
+    stream_name: str,
+    context: dict | None,
+    body: bytes,
+) -> tuple[list[EncodedRecord], dict[Stage, float], dict[Stage, int]]:
+    return _worker_tap.streams[stream_name].encode_page(context, body)
+
+
+class RecordOffload:
+    """Decodes, conforms and encodes pages of records in a pool of processes.
+
+    Each worker process builds its own instance of the tap from the config and
+    catalog, so `post_process`, the catalog projection and stream maps run as they
+    would in the tap, but on as many cores as there are workers. Pages are submitted
+    as raw response bodies and come back as `EncodedRecord` lists, ready to write.
+    """
+
+    def __init__(self, workers: int, config: dict, catalog: dict | None) -> None:
+        """Start the worker processes.
+
+        Args:
+            workers: Number of worker processes.
+            config: The tap config.
+            catalog: The input catalog, as a dict.
+        """
+        self.workers = workers
+        # Workers are spawned rather than forked from a process running threads.
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_initialize_worker,
+            initargs=(config, catalog),
+        )
+
+    @property
+    def max_pending(self) -> int:
+        """Return the number of pages a stream may have submitted and not collected.
+
+        Returns:
+            Twice the number of workers, so no worker idles between pages.
+        """
+        return 2 * self.workers
+
+    def submit(self, stream_name: str, context: dict | None, body: bytes) -> Future:
+        """Submit a page of records to encode.
+
+        Args:
+            stream_name: Name of the stream the page belongs to.
+            context: The context records are post-processed with.
+            body: The raw response body of the page.
+
+        Returns:
+            A future of the result of `ChargebeeStream.encode_page`.
+        """
+        return self._executor.submit(_encode_page, stream_name, context, body)
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+        self._executor.shutdown()
@@ -0,0 +1,214 @@
+"""Parsing of Chargebee list responses."""
+
+from __future__ import annotations
+
+import codecs
+import json
+import re
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    import requests
+
+_ENVELOPE_JSONPATH = re.compile(r"^\$\.list\[\*\](?:\.(\w+))?$")
+_WHITESPACE = re.compile(r"\s*")
+_DECODER = json.JSONDecoder()
+
+
+def json_loads(data: bytes | str) -> Any:  # noqa: ANN401
+    """Decode a JSON document, using `orjson` when it is installed.
+
+    Args:
+        data: The JSON document.
+
+    Returns:
+        The decoded document.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def set_response_content(response: requests.Response, content: bytes) -> None:
+    """Set the body of a response built without a connection, as already read.
+
+    Args:
+        response: The response.
+        content: Its body.
+    """
+    response._content = content  # noqa: SLF001
+    # Private to `requests`, so missing from its type stubs.
+    response._content_consumed = True  # type: ignore[attr-defined]  # noqa: SLF001
+
+
+def read_next_offset(body: bytes) -> str | None:
+    """Read the `next_offset` of a list response without decoding its records.
+
+    Chargebee writes `next_offset` after the `list` array, so only the end of the
+    body is decoded. If the end of the body is not a top-level `next_offset` field,
+    the whole body is decoded instead.
+
+    Args:
+        body: The response body.
+
+    Returns:
+        The offset of the next page, or None on the last page.
+    """
+    index = body.rfind(b'"next_offset"')
+    if index == -1:
+        return None
+    try:
+        return json_loads(b"{" + body[index:]).get("next_offset")
+    except ValueError:
+        return json_loads(body).get("next_offset")
+
+
+def envelope_resource(records_jsonpath: str) -> str | None:
+    """Return the resource key of a `$.list[*].<resource>` records JSONPath.
+
+    Args:
+        records_jsonpath: A stream's records JSONPath.
+
+    Returns:
+        The resource key, an empty string for `$.list[*]`, or None if the JSONPath
+        does not select from the list envelope.
+    """
+    match = _ENVELOPE_JSONPATH.match(records_jsonpath)
+    if not match:
+        return None
+    return match.group(1) or ""
+
+
+def iter_envelope_records(items: Iterable[dict], resource: str) -> Iterator[dict]:
+    """Yield the resource object of each list item.
+
+    Args:
+        items: Items of the `list` array of a Chargebee list response.
+        resource: The resource key, or an empty string for the items themselves.
+
+    Yields:
+        One record per list item holding the resource.
+    """
+    for item in items:
+        if not resource:
+            yield item
+        elif resource in item:
+            yield item[resource]
+
+
+class ListPageParser:
+    """Incrementally parses a Chargebee list response.
+
+    Iterating the parser yields each item of the top-level `list` array as soon as it
+    has been decoded, reading the body chunk by chunk, so the whole document is never
+    held in memory. Once iteration finishes, the other top-level fields, such as
+    `next_offset`, are available in `fields`.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        """Create a parser over the chunks of a response body.
+
+        Args:
+            chunks: The response body as an iterable of byte chunks.
+        """
+        self.fields: dict[str, Any] = {}
+        self._chunks = iter(chunks)
+        self._decode = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    @property
+    def next_offset(self) -> str | None:
+        """Return the page's `next_offset`, once the list has been read."""
+        return self.fields.get("next_offset")
+
+    def __iter__(self) -> Iterator[dict]:
+        """Yield each item of the `list` array.
+
+        Yields:
+            The decoded list items.
+
+        Raises:
+            ValueError: If the body is not a JSON object.
+        """
+        self._expect("{")
+        if self._peek() == "}":
+            return
+        while True:
+            key = self._decode_value()
+            self._expect(":")
+            if key == "list":
+                yield from self._iter_array()
+            else:
+                self.fields[key] = self._decode_value()
+            if self._expect(",", "}") == "}":
+                return
+
+    def _iter_array(self) -> Iterator[Any]:
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self._decode_value()
+            if self._expect(",", "]") == "]":
+                return
+
+    def _decode_value(self) -> Any:  # noqa: ANN401
+        while True:
+            self._skip_whitespace()
+            try:
+                value, end = _DECODER.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+                self._read(len(self._buffer) - self._pos)
+                continue
+            # A number or literal ending at the buffer boundary may be truncated.
+            if end == len(self._buffer) and not self._eof:
+                self._read()
+                continue
+            self._pos = end
+            return value
+
+    def _expect(self, *tokens: str) -> str:
+        char = self._peek()
+        if char not in tokens:
+            msg = f"Expected one of {tokens} at position {self._pos}, found {char!r}."
+            raise ValueError(msg)
+        self._pos += 1
+        return char
+
+    def _peek(self) -> str:
+        self._skip_whitespace()
+        while self._pos >= len(self._buffer):
+            if self._eof:
+                return ""
+            self._read()
+            self._skip_whitespace()
+        return self._buffer[self._pos]
+
+    def _skip_whitespace(self) -> None:
+        # `\s*` matches at any position.
+        match = _WHITESPACE.match(self._buffer, self._pos)
+        self._pos = match.end() if match else self._pos
+
+    def _read(self, at_least: int = 1) -> None:
+        """Append at least `at_least` more characters to the buffer, unless at EOF."""
+        # Drop consumed text so the buffer only holds the value being decoded.
+        self._buffer = self._buffer[self._pos :]
+        self._pos = 0
+        target = len(self._buffer) + max(1, at_least)
+        while len(self._buffer) < target and not self._eof:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self._buffer += self._decode.decode(b"", final=True)
+                self._eof = True
+            else:
+                self._buffer += self._decode.decode(chunk)
@@ -0,0 +1,74 @@
+"""Projection of records onto the properties selected in the catalog."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Mapping, Optional
+
+# Property names to prune: None to drop a deselected property, or the projection of a
+# selected object property, or of the object items of a selected array property.
+Projection = Dict[str, Optional["Projection"]]
+
+
+def compile_projection(
+    schema: dict,
+    mask: Mapping[tuple[str, ...], bool],
+    breadcrumb: tuple[str, ...] = (),
+) -> Projection | None:
+    """Compile the projection of a schema's deselected properties.
+
+    Array items are projected with the breadcrumbs of their properties under
+    `items`, e.g. `("properties", "line_items", "items", "properties", "amount")`.
+
+    Args:
+        schema: The JSON schema of a stream, or of a nested object property.
+        mask: The stream's selection mask, by property breadcrumb.
+        breadcrumb: The breadcrumb of `schema` within the stream schema.
+
+    Returns:
+        The projection, or None if every property is selected.
+    """
+    projection: Projection = {}
+    for name, property_schema in (schema.get("properties") or {}).items():
+        property_breadcrumb = (*breadcrumb, "properties", name)
+        if not mask.get(property_breadcrumb, True):
+            projection[name] = None
+            continue
+        nested = compile_projection(property_schema, mask, property_breadcrumb)
+        items = property_schema.get("items")
+        if nested is None and isinstance(items, dict):
+            nested = compile_projection(items, mask, (*property_breadcrumb, "items"))
+        if nested is not None:
+            projection[name] = nested
+    return projection or None
+
+
+def project(record: dict, projection: Projection) -> dict:
+    """Return a record without its deselected properties.
+
+    Unlike the SDK's `pop_deselected_record_properties`, this only visits the pruned
+    properties, leaves `record` unchanged, and prunes the objects of arrays too.
+    Properties missing from the schema, such as undiscovered custom fields, are kept.
+
+    Args:
+        record: The record.
+        projection: The projection from `compile_projection`.
+
+    Returns:
+        A new record without the deselected properties.
+    """
+    result: dict[str, Any] = dict(record)
+    for name, nested in projection.items():
+        if name not in result:
+            continue
+        if nested is None:
+            del result[name]
+            continue
+        value = result[name]
+        if isinstance(value, dict):
+            result[name] = project(value, nested)
+        elif isinstance(value, list):
+            result[name] = [
+                project(item, nested) if isinstance(item, dict) else item
+                for item in value
+            ]
+    return result
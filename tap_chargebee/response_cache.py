@@ -0,0 +1,222 @@
+"""On-disk cache of API responses, replayed instead of repeating identical queries."""
+
+from __future__ import annotations
+
+import datetime
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from typing import TYPE_CHECKING
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from tap_chargebee.parsing import set_response_content
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    historical INTEGER NOT NULL,
+    received_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+# Headers describing the body as sent, rather than as cached.
+_DROPPED_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+
+def _is_historical(query: list[tuple[str, str]], now: float) -> bool:
+    """Return whether a query is bounded by a time window that ended before `now`.
+
+    Args:
+        query: The query parameters.
+        now: The time the response was received, as a unix timestamp.
+
+    Returns:
+        True if a `[before]` filter is a unix timestamp before `now`.
+    """
+    return any(
+        name.endswith("[before]") and value.isdigit() and int(value) < now
+        for name, value in query
+    )
+
+
+class ResponseCache:
+    """Compressed successful responses, by request, in SQLite.
+
+    Requests are identified by their method, URL, query parameters in any order and
+    credentials, so sites and API keys never share responses; only a digest of the
+    key is stored. Historical queries, bounded by a time window that had already
+    ended, are replayed until evicted. Other queries may have new results at any time,
+    and their responses expire `ttl` seconds after they were received. Any response
+    is evicted when the cache outgrows `max_bytes`: the least recently used responses
+    are evicted first.
+    """
+
+    def __init__(self, path: Path, ttl: float, max_bytes: int) -> None:
+        """Open the cache, creating it if needed.
+
+        Args:
+            path: The SQLite database file.
+            ttl: Seconds responses to queries that are not historical are replayed for.
+            max_bytes: Maximum total size of the compressed response bodies.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(path), check_same_thread=False)
+        with self._lock, self._connection as connection:
+            connection.executescript(_SCHEMA)
+            connection.execute(
+                "DELETE FROM responses WHERE NOT historical AND received_at <= ?",
+                (time.time() - ttl,),
+            )
+            self._size = connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses",
+            ).fetchone()[0]
+            if self._size > max_bytes:
+                self._evict(connection)
+
+    @staticmethod
+    def request_key(prepared_request: requests.PreparedRequest) -> str:
+        """Return the key identifying a request in the cache.
+
+        Args:
+            prepared_request: The request.
+
+        Returns:
+            A hex digest of the request's method, URL, sorted query parameters and
+            `Authorization` header.
+        """
+        url = urlsplit(prepared_request.url or "")
+        query = urlencode(sorted(parse_qsl(url.query, keep_blank_values=True)))
+        identity = "\n".join(
+            (
+                f"{prepared_request.method} {url.netloc}{url.path}?{query}",
+                prepared_request.headers.get("Authorization", ""),
+            ),
+        )
+        return hashlib.sha256(identity.encode()).hexdigest()
+
+    def get(
+        self,
+        prepared_request: requests.PreparedRequest,
+    ) -> requests.Response | None:
+        """Return the cached response to a request, if any.
+
+        Args:
+            prepared_request: The request.
+
+        Returns:
+            The response, or None if it is not cached or expired.
+        """
+        key = self.request_key(prepared_request)
+        now = time.time()
+        with self._lock, self._connection as connection:
+            row = connection.execute(
+                "SELECT url, headers, body, size, historical, received_at "
+                "FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is not None and not row[4] and row[5] <= now - self.ttl:
+                connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._size -= row[3]
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            connection.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                (now, key),
+            )
+            self.hits += 1
+        url, headers, body = row[:3]
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.url = url
+        response.headers = CaseInsensitiveDict(json.loads(headers))
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.elapsed = datetime.timedelta(0)
+        response.request = prepared_request
+        set_response_content(response, zlib.decompress(body))
+        return response
+
+    def put(
+        self,
+        prepared_request: requests.PreparedRequest,
+        response: requests.Response,
+    ) -> None:
+        """Cache a successful response, evicting the least recently used if needed.
+
+        Args:
+            prepared_request: The request.
+            response: Its response, with the body read.
+        """
+        now = time.time()
+        url = urlsplit(prepared_request.url or "")
+        historical = _is_historical(parse_qsl(url.query), now)
+        body = zlib.compress(response.content)
+        headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name.lower() not in _DROPPED_HEADERS
+        }
+        key = self.request_key(prepared_request)
+        with self._lock, self._connection as connection:
+            previous = connection.execute(
+                "SELECT size FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    response.url,
+                    json.dumps(headers),
+                    body,
+                    len(body),
+                    historical,
+                    now,
+                    now,
+                ),
+            )
+            self._size += len(body) - (previous[0] if previous else 0)
+            if self._size > self.max_bytes:
+                self._evict(connection)
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        """Delete the least recently used responses until the cache fits `max_bytes`.
+
+        Args:
+            connection: The connection, within a transaction.
+        """
+        evicted = []
+        for key, size in connection.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at",
+        ):
+            if self._size <= self.max_bytes:
+                break
+            evicted.append((key,))
+            self._size -= size
+        connection.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+    def close(self) -> None:
+        """Close the database."""
+        self._connection.close()
@@ -0,0 +1,89 @@
+"""Ordering of stream syncs by the durations recorded in previous runs."""
+
+from __future__ import annotations
+
+import math
+from typing import Mapping
+
+#: Number of past syncs kept in the history of each stream.
+HISTORY_LENGTH = 5
+
+
+def add_sync(
+    history: list[dict],
+    seconds: float,
+    records: int,
+    parallelism: int = 1,
+) -> list[dict]:
+    """Add a sync to the history of a stream.
+
+    Args:
+        history: The stream's recorded syncs, oldest first.
+        seconds: Wall time of the sync.
+        records: Number of records the sync returned.
+        parallelism: Number of time slices of the stream fetched at once.
+
+    Returns:
+        The last `HISTORY_LENGTH` syncs.
+    """
+    entry = {"seconds": round(seconds, 3), "records": records}
+    if parallelism > 1:
+        entry["parallelism"] = parallelism
+    return [*history, entry][-HISTORY_LENGTH:]
+
+
+def expected_seconds(history: list[dict] | None) -> float | None:
+    """Return the expected duration of a stream's next sync, unsliced.
+
+    Syncs whose time slices were fetched in parallel count for their wall time
+    multiplied by their parallelism, so splitting a stream does not make it look
+    short enough to stop splitting it.
+
+    Args:
+        history: The stream's recorded syncs.
+
+    Returns:
+        The mean duration of the recorded syncs, or None without history.
+    """
+    if not history:
+        return None
+    return sum(
+        entry["seconds"] * entry.get("parallelism", 1) for entry in history
+    ) / len(history)
+
+
+def plan_syncs(
+    expected: Mapping[str, float | None],
+    workers: int,
+    max_slices: int,
+) -> tuple[list[str], dict[str, int]]:
+    """Plan the order of stream syncs, and which streams to split in time slices.
+
+    Streams are ordered longest expected first, so short streams fill the gaps left
+    by long ones; streams without history come first, as they may be long. A stream
+    expected to take longer than the whole sync would with perfectly balanced
+    workers dominates the sync time, and is split into enough time slices to fit.
+
+    Args:
+        expected: The expected duration of each stream's sync, by stream name.
+        workers: Number of streams synced at once.
+        max_slices: Maximum number of time slices a stream is fetched in at once.
+
+    Returns:
+        The stream names in sync order, and the number of time slices of each
+        stream to split.
+    """
+
+    def longest_first(name: str) -> float:
+        seconds = expected[name]
+        return -math.inf if seconds is None else -seconds
+
+    order = sorted(expected, key=longest_first)
+    total = sum(seconds or 0.0 for seconds in expected.values())
+    balanced = total / max(1, workers)
+    slices = {}
+    if balanced > 0 and max_slices > 1:
+        for name, seconds in expected.items():
+            if seconds is not None and seconds > balanced:
+                slices[name] = min(max_slices, math.ceil(seconds / balanced))
+    return order, slices
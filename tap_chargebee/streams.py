@@ -6,7 +6,16 @@ from pathlib import Path
 
 from singer_sdk import typing as th  # JSON Schema typing helpers
 
-from tap_chargebee.client import ChargebeeStream
+from tap_chargebee.client import (
+    BOOLEAN_FILTERS,
+    ENUM_FILTERS,
+    ID_FILTERS,
+    NUMBER_FILTERS,
+    STRING_FILTERS,
+    TIMESTAMP_FILTERS,
+    ChargebeeChildStream,
+    ChargebeeStream,
+)
 
 
 class SubscriptionsStream(ChargebeeStream):
@@ -16,6 +25,18 @@ class SubscriptionsStream(ChargebeeStream):
     primary_keys = ["id"]
     replication_key = "updated_at"
     records_jsonpath = "$.list[*].subscription"
+    event_content_key = "subscription"
+    filterable_fields = {
+        "id": ID_FILTERS,
+        "customer_id": ID_FILTERS,
+        "status": ENUM_FILTERS,
+        "remaining_billing_cycles": NUMBER_FILTERS,
+        "created_at": TIMESTAMP_FILTERS,
+        "activated_at": TIMESTAMP_FILTERS,
+        "next_billing_at": TIMESTAMP_FILTERS,
+        "has_scheduled_changes": BOOLEAN_FILTERS,
+        "channel": ENUM_FILTERS,
+    }
     schema = th.PropertiesList(
         th.Property("id", th.StringType),
         th.Property("billing_period", th.IntegerType),
@@ -57,6 +78,14 @@ class EventsStream(ChargebeeStream):
     primary_keys = ["id"]
     replication_key = "occurred_at"
     records_jsonpath = "$.list[*].event"
+    has_custom_fields = False
+    is_event_feed = True
+    filterable_fields = {
+        "id": ID_FILTERS,
+        "source": ENUM_FILTERS,
+        "event_type": ENUM_FILTERS,
+        "webhook_status": ENUM_FILTERS,
+    }
     schema = th.PropertiesList(
         th.Property("id", th.StringType),
         th.Property("occurred_at", th.IntegerType),
@@ -87,6 +116,20 @@ class CustomerStream(ChargebeeStream):
     primary_keys = ["id"]
     replication_key = "updated_at"
     records_jsonpath = "$.list[*].customer"
+    event_content_key = "customer"
+    filterable_fields = {
+        "id": ID_FILTERS,
+        "first_name": STRING_FILTERS,
+        "last_name": STRING_FILTERS,
+        "email": STRING_FILTERS,
+        "company": STRING_FILTERS,
+        "phone": STRING_FILTERS,
+        "auto_collection": ENUM_FILTERS,
+        "taxability": ENUM_FILTERS,
+        "created_at": TIMESTAMP_FILTERS,
+        "channel": ENUM_FILTERS,
+        "business_entity_id": ID_FILTERS,
+    }
     schema = th.PropertiesList(
         th.Property("id", th.StringType),
         th.Property("first_name", th.StringType),
@@ -124,6 +167,23 @@ class TransactionStream(ChargebeeStream):
     primary_keys = ["id"]
     replication_key = "updated_at"
     records_jsonpath = "$.list[*].transaction"
+    event_content_key = "transaction"
+    filterable_fields = {
+        "id": ID_FILTERS,
+        "customer_id": ID_FILTERS,
+        "subscription_id": ID_FILTERS,
+        "payment_source_id": ID_FILTERS,
+        "payment_method": ENUM_FILTERS,
+        "gateway": ENUM_FILTERS,
+        "gateway_account_id": ID_FILTERS,
+        "id_at_gateway": STRING_FILTERS,
+        "reference_number": STRING_FILTERS,
+        "type": ENUM_FILTERS,
+        "date": TIMESTAMP_FILTERS,
+        "amount": NUMBER_FILTERS,
+        "amount_capturable": NUMBER_FILTERS,
+        "status": ENUM_FILTERS,
+    }
     schema = th.PropertiesList(
         th.Property("id", th.StringType),
         th.Property("customer_id", th.StringType),
@@ -186,6 +246,17 @@ class CouponsStream(ChargebeeStream):
     primary_keys = ["id"]
     replication_key = "updated_at"
     records_jsonpath = "$.list[*].coupon"
+    event_content_key = "coupon"
+    filterable_fields = {
+        "id": ID_FILTERS,
+        "name": STRING_FILTERS,
+        "discount_type": ENUM_FILTERS,
+        "duration_type": ENUM_FILTERS,
+        "status": ENUM_FILTERS,
+        "apply_on": ENUM_FILTERS,
+        "created_at": TIMESTAMP_FILTERS,
+        "currency_code": ENUM_FILTERS,
+    }
     schema = th.PropertiesList(
         th.Property("id", th.StringType),
         th.Property("name", th.StringType),
@@ -222,6 +293,25 @@ class CreditNotesStream(ChargebeeStream):
     primary_keys = ["id"]
     replication_key = "updated_at"
     records_jsonpath = "$.list[*].credit_note"
+    event_content_key = "credit_note"
+    filterable_fields = {
+        "id": ID_FILTERS,
+        "customer_id": ID_FILTERS,
+        "subscription_id": ID_FILTERS,
+        "reference_invoice_id": ID_FILTERS,
+        "type": ENUM_FILTERS,
+        "reason_code": ENUM_FILTERS,
+        "create_reason_code": STRING_FILTERS,
+        "status": ENUM_FILTERS,
+        "date": TIMESTAMP_FILTERS,
+        "total": NUMBER_FILTERS,
+        "price_type": ENUM_FILTERS,
+        "amount_allocated": NUMBER_FILTERS,
+        "amount_refunded": NUMBER_FILTERS,
+        "amount_available": NUMBER_FILTERS,
+        "voided_at": TIMESTAMP_FILTERS,
+        "channel": ENUM_FILTERS,
+    }
     schema = th.PropertiesList(
         th.Property("id", th.StringType),
         th.Property("customer_id", th.StringType),
@@ -267,6 +357,25 @@ class OrdersStream(ChargebeeStream):
     primary_keys = ["id"]
     replication_key = "updated_at"
     records_jsonpath = "$.list[*].order"
+    event_content_key = "order"
+    filterable_fields = {
+        "id": ID_FILTERS,
+        "subscription_id": ID_FILTERS,
+        "customer_id": ID_FILTERS,
+        "status": ENUM_FILTERS,
+        "price_type": ENUM_FILTERS,
+        "order_date": TIMESTAMP_FILTERS,
+        "shipping_date": TIMESTAMP_FILTERS,
+        "shipped_at": TIMESTAMP_FILTERS,
+        "delivered_at": TIMESTAMP_FILTERS,
+        "cancelled_at": TIMESTAMP_FILTERS,
+        "amount_paid": NUMBER_FILTERS,
+        "refundable_credits": NUMBER_FILTERS,
+        "refundable_credits_issued": NUMBER_FILTERS,
+        "resent_status": ENUM_FILTERS,
+        "is_resent": BOOLEAN_FILTERS,
+        "original_order_id": ID_FILTERS,
+    }
     schema = th.PropertiesList(
         th.Property("id", th.StringType),
         th.Property("document_number", th.StringType),
@@ -327,6 +436,14 @@ class PaymentSourcesStream(ChargebeeStream):
     primary_keys = ["id"]
     replication_key = "updated_at"
     records_jsonpath = "$.list[*].payment_source"
+    event_content_key = "payment_source"
+    filterable_fields = {
+        "id": ID_FILTERS,
+        "customer_id": ID_FILTERS,
+        "type": ENUM_FILTERS,
+        "status": ENUM_FILTERS,
+        "created_at": TIMESTAMP_FILTERS,
+    }
     schema = th.PropertiesList(
         th.Property("id", th.StringType),
         th.Property("updated_at", th.IntegerType),
@@ -352,6 +469,10 @@ class GiftsStream(ChargebeeStream):
     primary_keys = ["id"]
     replication_key = "updated_at"
     records_jsonpath = "$.list[*].gift"
+    event_content_key = "gift"
+    filterable_fields = {
+        "status": ENUM_FILTERS,
+    }
     schema = th.PropertiesList(
         th.Property("id", th.StringType),
         th.Property("status", th.StringType),
@@ -373,6 +494,21 @@ class ItemsStream(ChargebeeStream):
     primary_keys = ["id"]
     replication_key = "updated_at"
     records_jsonpath = "$.list[*].item"
+    event_content_key = "item"
+    filterable_fields = {
+        "id": ID_FILTERS,
+        "item_family_id": ID_FILTERS,
+        "type": ENUM_FILTERS,
+        "name": STRING_FILTERS,
+        "item_applicability": ENUM_FILTERS,
+        "status": ENUM_FILTERS,
+        "is_giftable": BOOLEAN_FILTERS,
+        "enabled_for_checkout": BOOLEAN_FILTERS,
+        "enabled_in_portal": BOOLEAN_FILTERS,
+        "metered": BOOLEAN_FILTERS,
+        "usage_calculation": ENUM_FILTERS,
+        "channel": ENUM_FILTERS,
+    }
     schema = th.PropertiesList(
         th.Property("id", th.StringType),
         th.Property("name", th.StringType),
@@ -407,6 +543,23 @@ class ItemPricesStream(ChargebeeStream):
     primary_keys = ["id"]
     replication_key = "updated_at"
     records_jsonpath = "$.list[*].item_price"
+    event_content_key = "item_price"
+    filterable_fields = {
+        "id": ID_FILTERS,
+        "name": STRING_FILTERS,
+        "pricing_model": ENUM_FILTERS,
+        "item_id": ID_FILTERS,
+        "item_family_id": ID_FILTERS,
+        "item_type": ENUM_FILTERS,
+        "currency_code": STRING_FILTERS,
+        "trial_period": NUMBER_FILTERS,
+        "trial_period_unit": ENUM_FILTERS,
+        "status": ENUM_FILTERS,
+        "period_unit": ENUM_FILTERS,
+        "period": NUMBER_FILTERS,
+        "channel": ENUM_FILTERS,
+        "business_entity_id": ID_FILTERS,
+    }
     schema = th.PropertiesList(
         th.Property("id", th.StringType),
         th.Property("name", th.StringType),
@@ -449,6 +602,12 @@ class ItemFamiliesStream(ChargebeeStream):
     primary_keys = ["id"]
     replication_key = "updated_at"
     records_jsonpath = "$.list[*].item_family"
+    event_content_key = "item_family"
+    filterable_fields = {
+        "id": ID_FILTERS,
+        "name": STRING_FILTERS,
+        "channel": ENUM_FILTERS,
+    }
     schema = th.PropertiesList(
         th.Property("id", th.StringType),
         th.Property("name", th.StringType),
@@ -468,6 +627,26 @@ class InvoicesStream(ChargebeeStream):
     primary_keys = ["id"]
     replication_key = "updated_at"
     records_jsonpath = "$.list[*].invoice"
+    event_content_key = "invoice"
+    filterable_fields = {
+        "id": ID_FILTERS,
+        "subscription_id": ID_FILTERS,
+        "customer_id": ID_FILTERS,
+        "recurring": BOOLEAN_FILTERS,
+        "status": ENUM_FILTERS,
+        "price_type": ENUM_FILTERS,
+        "date": TIMESTAMP_FILTERS,
+        "paid_at": TIMESTAMP_FILTERS,
+        "total": NUMBER_FILTERS,
+        "amount_paid": NUMBER_FILTERS,
+        "amount_adjusted": NUMBER_FILTERS,
+        "credits_applied": NUMBER_FILTERS,
+        "amount_due": NUMBER_FILTERS,
+        "dunning_status": ENUM_FILTERS,
+        "voided_at": TIMESTAMP_FILTERS,
+        "void_reason_code": STRING_FILTERS,
+        "channel": ENUM_FILTERS,
+    }
     schema = th.PropertiesList(
         th.Property("id", th.StringType),
         th.Property("customer_id", th.StringType),
@@ -525,6 +704,12 @@ class PromotionalCreditsStream(ChargebeeStream):
     primary_keys = ["id"]
     replication_key = "created_at"
     records_jsonpath = "$.list[*].promotional_credit"
+    event_content_key = "promotional_credit"
+    filterable_fields = {
+        "id": ID_FILTERS,
+        "type": ENUM_FILTERS,
+        "customer_id": ID_FILTERS,
+    }
     schema = th.PropertiesList(
         th.Property("id", th.StringType),
         th.Property("customer_id", th.StringType),
@@ -547,6 +732,7 @@ class VirtualBankAccountsStream(ChargebeeStream):
     primary_keys = ["id"]
     replication_key = "updated_at"
     records_jsonpath = "$.list[*].virtual_bank_account"
+    event_content_key = "virtual_bank_account"
     schema = th.PropertiesList(
         th.Property("id", th.StringType),
         th.Property("customer_id", th.StringType),
@@ -573,6 +759,12 @@ class UnbilledChargesStream(ChargebeeStream):
     primary_keys = ["id"]
     replication_key = "updated_at"
     records_jsonpath = "$.list[*].unbilled_charge"
+    # The API does not reliably advance `updated_at` when charges change.
+    unreliable_replication_key = True
+    filterable_fields = {
+        "subscription_id": ID_FILTERS,
+        "customer_id": ID_FILTERS,
+    }
     schema = th.PropertiesList(
         th.Property("id", th.StringType),
         th.Property("customer_id", th.StringType),
@@ -606,6 +798,12 @@ class InvoicedUnbilledChargesStream(ChargebeeStream):
     primary_keys = ["id"]
     replication_key = "updated_at"
     records_jsonpath = "$.list[*].unbilled_charge"
+    # The API does not reliably advance `updated_at` when charges change.
+    unreliable_replication_key = True
+    filterable_fields = {
+        "subscription_id": ID_FILTERS,
+        "customer_id": ID_FILTERS,
+    }
     schema = th.PropertiesList(
         th.Property("id", th.StringType),
         th.Property("customer_id", th.StringType),
@@ -627,3 +825,114 @@ class InvoicedUnbilledChargesStream(ChargebeeStream):
         th.Property("updated_at", th.IntegerType),
         th.Property("tiers", th.ArrayType(th.ObjectType())),
     ).to_dict()
+
+
+class SubscriptionItemsStream(ChargebeeChildStream):
+
+    name = "subscription_items"
+    parent_stream_type = SubscriptionsStream
+    parent_id_key = "subscription_id"
+    parent_array_key = "subscription_items"
+    primary_keys = ["subscription_id", "item_price_id"]
+    schema = th.PropertiesList(
+        th.Property("subscription_id", th.StringType),
+        th.Property("item_price_id", th.StringType),
+        th.Property("item_type", th.StringType),
+        th.Property("quantity", th.IntegerType),
+        th.Property("quantity_in_decimal", th.StringType),
+        th.Property("unit_price", th.IntegerType),
+        th.Property("unit_price_in_decimal", th.StringType),
+        th.Property("amount", th.IntegerType),
+        th.Property("amount_in_decimal", th.StringType),
+        th.Property("free_quantity", th.IntegerType),
+        th.Property("trial_end", th.IntegerType),
+        th.Property("billing_cycles", th.IntegerType),
+        th.Property("service_period_days", th.IntegerType),
+        th.Property("charge_on_event", th.StringType),
+        th.Property("charge_once", th.BooleanType),
+        th.Property("charge_on_option", th.StringType),
+        th.Property("object", th.StringType),
+    ).to_dict()
+
+
+class UsagesStream(ChargebeeChildStream):
+
+    name = "usages"
+    path = "/usages"
+    parent_stream_type = SubscriptionsStream
+    parent_id_key = "subscription_id"
+    primary_keys = ["id"]
+    records_jsonpath = "$.list[*].usage"
+    filterable_fields = {
+        "id": ID_FILTERS,
+        "item_price_id": ID_FILTERS,
+        "invoice_id": ID_FILTERS,
+        "source": ENUM_FILTERS,
+        "usage_date": TIMESTAMP_FILTERS,
+    }
+    schema = th.PropertiesList(
+        th.Property("id", th.StringType),
+        th.Property("subscription_id", th.StringType),
+        th.Property("item_price_id", th.StringType),
+        th.Property("invoice_id", th.StringType),
+        th.Property("line_item_id", th.StringType),
+        th.Property("usage_date", th.IntegerType),
+        th.Property("quantity", th.StringType),
+        th.Property("source", th.StringType),
+        th.Property("note", th.StringType),
+        th.Property("resource_version", th.IntegerType),
+        th.Property("updated_at", th.IntegerType),
+        th.Property("created_at", th.IntegerType),
+        th.Property("deleted", th.BooleanType),
+        th.Property("object", th.StringType),
+    ).to_dict()
+
+
+class InvoiceLineItemsStream(ChargebeeChildStream):
+
+    name = "invoice_line_items"
+    parent_stream_type = InvoicesStream
+    parent_id_key = "invoice_id"
+    parent_array_key = "line_items"
+    primary_keys = ["invoice_id", "id"]
+    schema = th.PropertiesList(
+        th.Property("id", th.StringType),
+        th.Property("invoice_id", th.StringType),
+        th.Property("subscription_id", th.StringType),
+        th.Property("customer_id", th.StringType),
+        th.Property("date_from", th.IntegerType),
+        th.Property("date_to", th.IntegerType),
+        th.Property("unit_amount", th.IntegerType),
+        th.Property("quantity", th.IntegerType),
+        th.Property("amount", th.IntegerType),
+        th.Property("pricing_model", th.StringType),
+        th.Property("is_taxed", th.BooleanType),
+        th.Property("tax_amount", th.IntegerType),
+        th.Property("tax_rate", th.NumberType),
+        th.Property("discount_amount", th.IntegerType),
+        th.Property("item_level_discount_amount", th.IntegerType),
+        th.Property("description", th.StringType),
+        th.Property("entity_description", th.StringType),
+        th.Property("entity_type", th.StringType),
+        th.Property("entity_id", th.StringType),
+        th.Property("tax_exempt_reason", th.StringType),
+        th.Property("object", th.StringType),
+    ).to_dict()
+
+
+class TransactionLinkedInvoicesStream(ChargebeeChildStream):
+
+    name = "transaction_linked_invoices"
+    parent_stream_type = TransactionStream
+    parent_id_key = "transaction_id"
+    parent_array_key = "linked_invoices"
+    primary_keys = ["transaction_id", "invoice_id"]
+    schema = th.PropertiesList(
+        th.Property("transaction_id", th.StringType),
+        th.Property("invoice_id", th.StringType),
+        th.Property("applied_amount", th.IntegerType),
+        th.Property("applied_at", th.IntegerType),
+        th.Property("invoice_date", th.IntegerType),
+        th.Property("invoice_total", th.IntegerType),
+        th.Property("invoice_status", th.StringType),
+    ).to_dict()
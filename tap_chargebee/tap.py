@@ -2,10 +2,37 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, cast
+
+import requests
+from requests.adapters import HTTPAdapter
 from singer_sdk import Tap
 from singer_sdk import typing as th  # JSON schema typing helpers
+from singer_sdk._singerlib import Catalog, StateMessage, write_message
+from singer_sdk.exceptions import ConfigValidationError
 
 from tap_chargebee import streams
+from tap_chargebee.cache import (
+    default_cache_dir,
+    package_fingerprint,
+    read_json_file,
+    write_json_file,
+)
+from tap_chargebee.client import SITE_ID, RateLimiter
+from tap_chargebee.instrumentation import write_prometheus_file
+from tap_chargebee.scheduling import plan_syncs
+
+if TYPE_CHECKING:
+    from tap_chargebee.change_index import ChangeIndex
+    from tap_chargebee.events import EventFeed
+    from tap_chargebee.offload import RecordOffload
+    from tap_chargebee.response_cache import ResponseCache
+    from tap_chargebee.transport import AsyncTransport
 
 
 class TapChargebee(Tap):
@@ -17,15 +44,41 @@ class TapChargebee(Tap):
         th.Property(
             "api_key",
             th.StringType,
-            required=True,
             secret=True,  # Flag config as protected.
-            description="Chargebee API key",
+            description="Chargebee API key. Required unless `sites` is set",
         ),
         th.Property(
             "site_id",
             th.StringType,
-            required=True,
-            description="ID for your Chargebee site (first part of the URL)",
+            description=(
+                "ID for your Chargebee site (first part of the URL). Required unless "
+                "`sites` is set"
+            ),
+        ),
+        th.Property(
+            "sites",
+            th.ArrayType(
+                th.ObjectType(
+                    th.Property("site_id", th.StringType, required=True),
+                    th.Property("api_key", th.StringType, required=True, secret=True),
+                    th.Property("api_url", th.StringType),
+                    th.Property("requests_per_minute", th.IntegerType),
+                ),
+            ),
+            description=(
+                "Sites to sync in one run instead of `site_id` and `api_key`. Streams "
+                "are partitioned by site, records are tagged with their `site_id` and "
+                "each site has its own rate limit. `api_url` and `requests_per_minute` "
+                "default to the top-level settings"
+            ),
+        ),
+        th.Property(
+            "api_url",
+            th.StringType,
+            description=(
+                "Override the API URL root, which defaults to "
+                "`https://<site_id>.chargebee.com/api/v2`"
+            ),
         ),
         th.Property(
             "start_date",
@@ -42,36 +95,929 @@ class TapChargebee(Tap):
             "limit",
             th.IntegerType,
             description="Page size limit for API calls",
+            default=100,
+        ),
+        th.Property(
+            "adaptive_page_size",
+            th.BooleanType,
+            description=(
+                "Start each stream at the largest page size allowed by `limit` and "
+                "shrink or grow it with response time and size"
+            ),
+            default=False,
+        ),
+        th.Property(
+            "stream_json_parsing",
+            th.BooleanType,
+            description=(
+                "Decode list responses incrementally while they are downloaded, "
+                "keeping memory use to one record at a time"
+            ),
+            default=False,
+        ),
+        th.Property(
+            "prefetch_pages",
+            th.IntegerType,
+            description=(
+                "Number of pages each stream fetches ahead in the background while "
+                "earlier pages are processed. 0 fetches pages one at a time"
+            ),
+            default=0,
+        ),
+        th.Property(
+            "max_workers",
+            th.IntegerType,
+            description="Number of streams to sync concurrently",
+            default=1,
+        ),
+        th.Property(
+            "stream_scheduling",
+            th.BooleanType,
+            description=(
+                "With `max_workers`, sync the streams expected to take longest first, "
+                "from the durations recorded in the state, and split a stream that "
+                "would otherwise dominate the sync time into time slices fetched in "
+                "parallel (up to `backfill_workers`)"
+            ),
+            default=True,
+        ),
+        th.Property(
+            "requests_per_minute",
+            th.IntegerType,
+            description=(
+                "Maximum number of API requests per minute across all streams. When "
+                "unset, the rate is learned from the API's rate limit responses"
+            ),
+        ),
+        th.Property(
+            "http_pool_size",
+            th.IntegerType,
+            description="Number of keep-alive connections kept open to the API",
             default=10,
-        )
+        ),
+        th.Property(
+            "async_transport",
+            th.BooleanType,
+            description=(
+                "Send API requests from an asyncio event loop instead of one thread "
+                "per request, so backfill slices and streams wait on the API without "
+                "a thread each. Requires the `async` extra (httpx)"
+            ),
+            default=False,
+        ),
+        th.Property(
+            "process_workers",
+            th.IntegerType,
+            description=(
+                "Number of worker processes decoding, conforming and encoding pages "
+                "of records, so RECORD messages are produced on several cores. 0 "
+                "processes records in the tap process"
+            ),
+            default=0,
+        ),
+        th.Property(
+            "event_sourced_sync",
+            th.BooleanType,
+            description=(
+                "Read incremental changes of entity streams from the events feed "
+                "instead of listing each entity endpoint"
+            ),
+            default=False,
+        ),
+        th.Property(
+            "backfill_slice_days",
+            th.IntegerType,
+            description=(
+                "Split backfills spanning more than this many days into time slices "
+                "that are fetched in parallel (at most 100 slices, widened if needed)"
+            ),
+        ),
+        th.Property(
+            "backfill_workers",
+            th.IntegerType,
+            description=(
+                "Number of backfill time slices to fetch concurrently per stream"
+            ),
+            default=4,
+        ),
+        th.Property(
+            "filters",
+            th.ObjectType(),
+            description=(
+                "List filters to apply, by stream name, as an object mapping Chargebee "
+                "filter parameters to values, e.g. "
+                '`{"events": {"event_type[in]": ["subscription_created"]}}`. Values of '
+                "`in`, `not_in` and `between` filters are lists"
+            ),
+        ),
+        th.Property(
+            "change_probe",
+            th.BooleanType,
+            description=(
+                "Before syncing, request one record after each stream's bookmark, "
+                "concurrently, and skip the streams with no newer records. Streams "
+                "whose last sync read a single page are not probed"
+            ),
+            default=False,
+        ),
+        th.Property(
+            "window_overlap_seconds",
+            th.IntegerType,
+            description=(
+                "Start incremental syncs this many seconds before the bookmark, so "
+                "records sharing its timestamp are not skipped. Record versions "
+                "already emitted are dropped"
+            ),
+            default=0,
+        ),
+        th.Property(
+            "checkpoint_pages",
+            th.IntegerType,
+            description=(
+                "Save a resumable checkpoint in the stream state every this many pages"
+            ),
+        ),
+        th.Property(
+            "checkpoint_seconds",
+            th.IntegerType,
+            description=(
+                "Save a resumable checkpoint in the stream state every this many "
+                "seconds of a stream sync"
+            ),
+        ),
+        th.Property(
+            "batch_config",
+            th.ObjectType(
+                th.Property(
+                    "encoding",
+                    th.ObjectType(
+                        th.Property(
+                            "format",
+                            th.StringType,
+                            allowed_values=["jsonl", "parquet"],
+                            description=(
+                                "Format of batch files. `parquet` requires the "
+                                "`parquet` extra"
+                            ),
+                        ),
+                        th.Property(
+                            "compression",
+                            th.StringType,
+                            allowed_values=["gzip", "none"],
+                            description="Compression of batch files",
+                        ),
+                    ),
+                ),
+                th.Property(
+                    "storage",
+                    th.ObjectType(
+                        th.Property(
+                            "root",
+                            th.StringType,
+                            description="Root URL of batch files, e.g. file:///tmp",
+                        ),
+                        th.Property(
+                            "prefix",
+                            th.StringType,
+                            description="File name prefix of batch files",
+                        ),
+                    ),
+                ),
+                th.Property(
+                    "batch_size",
+                    th.IntegerType,
+                    description="Maximum number of records per batch file",
+                ),
+            ),
+            description=(
+                "Write records to batch files and emit BATCH messages instead of "
+                "RECORD messages"
+            ),
+        ),
+        th.Property(
+            "stage_metrics",
+            th.BooleanType,
+            description=(
+                "Log the time spent in each sync stage (HTTP wait, JSON decode, "
+                "extraction, post-processing, type conformance, serialization) per "
+                "page and per stream as metrics"
+            ),
+            default=False,
+        ),
+        th.Property(
+            "metrics_file",
+            th.StringType,
+            description=(
+                "Write per-stream stage timings and throughput to this file in the "
+                "Prometheus text format at the end of the sync"
+            ),
+        ),
+        th.Property(
+            "cache_dir",
+            th.StringType,
+            description=(
+                "Directory of the files cached across runs. Defaults to "
+                "`$XDG_CACHE_HOME/tap-chargebee` or `~/.cache/tap-chargebee`"
+            ),
+        ),
+        th.Property(
+            "discovery_cache",
+            th.BooleanType,
+            description=(
+                "Cache the discovered catalog in `cache_dir`, keyed by the tap and "
+                "SDK versions, so discovery does not build every stream"
+            ),
+            default=False,
+        ),
+        th.Property(
+            "custom_fields_discovery",
+            th.BooleanType,
+            description=(
+                "Sample a page of recent records of each stream to type its custom "
+                "fields (`cf_*`) and `meta_data` keys, and add them to the stream "
+                "schema. Samples are cached in `cache_dir`"
+            ),
+            default=False,
+        ),
+        th.Property(
+            "custom_fields_ttl_hours",
+            th.IntegerType,
+            description="Number of hours sampled custom fields are reused for",
+            default=24,
+        ),
+        th.Property(
+            "response_cache",
+            th.BooleanType,
+            description=(
+                "Cache API responses in `cache_dir` and replay them instead of "
+                "sending identical queries again, e.g. when rerunning a failed "
+                "backfill or iterating on stream code"
+            ),
+            default=False,
+        ),
+        th.Property(
+            "response_cache_ttl_seconds",
+            th.IntegerType,
+            description=(
+                "Number of seconds cached responses to open-ended queries are replayed "
+                "for. Responses to queries bounded by a time window that had already "
+                "ended do not expire"
+            ),
+            default=300,
+        ),
+        th.Property(
+            "response_cache_max_mb",
+            th.IntegerType,
+            description=(
+                "Maximum size of the compressed cached responses, in megabytes. The "
+                "least recently used responses are evicted first"
+            ),
+            default=1024,
+        ),
+        th.Property(
+            "change_index",
+            th.BooleanType,
+            description=(
+                "Sync the streams whose `updated_at` is not reliably advanced "
+                "(`unbilled_charges`, `invoiced_unbilled_charges`) as full-table "
+                "streams that only emit new or changed records, and a tombstone with "
+                "`deleted` set to true per record that disappeared. Record digests "
+                "are kept in `cache_dir`"
+            ),
+            default=False,
+        ),
     ).to_dict()
 
+    #: Every stream of the tap, in catalog order.
+    stream_types: list[type[streams.ChargebeeStream]] = [
+        streams.BusinessEntitiesStream,
+        streams.CreditNotesStream,
+        streams.CouponsStream,
+        streams.CustomerStream,
+        streams.EventsStream,
+        streams.GiftsStream,
+        streams.InvoicedUnbilledChargesStream,
+        streams.InvoicesStream,
+        streams.InvoiceLineItemsStream,
+        streams.ItemsStream,
+        streams.ItemFamiliesStream,
+        streams.ItemPricesStream,
+        streams.OrdersStream,
+        streams.PaymentSourcesStream,
+        streams.PromotionalCreditsStream,
+        streams.SubscriptionsStream,
+        streams.SubscriptionItemsStream,
+        streams.TransactionStream,
+        streams.TransactionLinkedInvoicesStream,
+        streams.UnbilledChargesStream,
+        streams.UsagesStream,
+        streams.VirtualBankAccountsStream,
+    ]
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the tap.
+
+        Args:
+            *args: Positional arguments for the SDK `Tap`.
+            **kwargs: Keyword arguments for the SDK `Tap`.
+        """
+        # Serializes Singer messages and tap state across concurrently synced streams.
+        # Shared HTTP helpers are only created under it: they are read for every
+        # request, which must not wait for other streams' output.
+        self.message_lock = threading.RLock()
+        self._sites: dict[str, dict] | None = None
+        self._rate_limiters: dict[str, RateLimiter] = {}
+        self._requests_session: requests.Session | None = None
+        self._event_feeds: dict[str | None, EventFeed] = {}
+        self._async_transport: AsyncTransport | None = None
+        self._record_offload: RecordOffload | None = None
+        self._change_index: ChangeIndex | None = None
+        self._response_cache: ResponseCache | None = None
+        super().__init__(*args, **kwargs)
+
+    @property
+    def chargebee_streams(self) -> dict[str, streams.ChargebeeStream]:
+        """Return the streams of the tap, typed as the Chargebee streams they are.
+
+        Returns:
+            The `streams` mapping.
+        """
+        return cast("dict[str, streams.ChargebeeStream]", self.streams)
+
+    @property
+    def multi_site(self) -> bool:
+        """Return whether sites are configured with `sites`.
+
+        Returns:
+            True if streams are partitioned by site.
+        """
+        return "sites" in self.config
+
+    @property
+    def stream_scheduling(self) -> bool:
+        """Return whether streams are scheduled from their sync history.
+
+        Returns:
+            True if `stream_scheduling` is enabled and streams sync concurrently.
+        """
+        return (
+            self.config.get("stream_scheduling", True)
+            and self.config.get("max_workers", 1) > 1
+        )
+
+    @property
+    def sites(self) -> dict[str, dict]:
+        """Return the settings of every site to sync.
+
+        Returns:
+            The `site_id`, `api_key`, `api_url` and `requests_per_minute` of each
+            site, by site ID, with the top-level settings as defaults.
+
+        Raises:
+            ConfigValidationError: If no site is configured, or one is listed twice.
+        """
+        if self._sites is not None:
+            return self._sites
+        defaults = {
+            "api_url": self.config.get("api_url"),
+            "requests_per_minute": self.config.get("requests_per_minute"),
+        }
+        if self.multi_site:
+            configured = self.config["sites"]
+        elif self.config.get("site_id") and self.config.get("api_key"):
+            configured = [
+                {
+                    "site_id": self.config["site_id"],
+                    "api_key": self.config["api_key"],
+                },
+            ]
+        else:
+            msg = "Either `site_id` and `api_key`, or `sites` must be configured."
+            raise ConfigValidationError(msg)
+
+        sites: dict[str, dict] = {}
+        for site in configured:
+            if site["site_id"] in sites:
+                msg = f"Site '{site['site_id']}' is configured more than once."
+                raise ConfigValidationError(msg)
+            sites[site["site_id"]] = {
+                **defaults,
+                **{key: value for key, value in site.items() if value is not None},
+            }
+        if not sites:
+            msg = "At least one site must be configured in `sites`."
+            raise ConfigValidationError(msg)
+        self._sites = sites
+        return sites
+
+    def get_rate_limiter(self, site_id: str | None = None) -> RateLimiter:
+        """Return the rate limiter shared by every stream of a site.
+
+        Args:
+            site_id: The site, or None for the first configured site.
+
+        Returns:
+            The site's rate limiter.
+        """
+        if site_id is None:
+            site_id = next(iter(self.sites))
+        rate_limiter = self._rate_limiters.get(site_id)
+        if rate_limiter is None:
+            with self.message_lock:
+                rate_limiter = self._rate_limiters.get(site_id)
+                if rate_limiter is None:
+                    rate_limiter = RateLimiter(
+                        self.sites[site_id].get("requests_per_minute"),
+                    )
+                    self._rate_limiters[site_id] = rate_limiter
+        return rate_limiter
+
+    @property
+    def requests_session(self) -> requests.Session:
+        """Return the pooled, keep-alive HTTP session shared by every stream.
+
+        Returns:
+            The tap's `requests.Session`.
+        """
+        if self._requests_session is None:
+            with self.message_lock:
+                if self._requests_session is None:
+                    pool_size = self.config.get("http_pool_size", 10)
+                    adapter = HTTPAdapter(pool_maxsize=pool_size)
+                    session = requests.Session()
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    session.headers.update(
+                        {
+                            "Accept-Encoding": "gzip, deflate",
+                            "Connection": "keep-alive",
+                        },
+                    )
+                    self._requests_session = session
+        return self._requests_session
+
+    @property
+    def async_transport(self) -> AsyncTransport | None:
+        """Return the async transport shared by every stream, if enabled.
+
+        Returns:
+            The tap's async transport, or None to send requests synchronously.
+        """
+        if not self.config.get("async_transport"):
+            return None
+        if self._async_transport is None:
+            # Imported here, as httpx is slow to import and only used by the transport.
+            from tap_chargebee.transport import AsyncTransport
+
+            with self.message_lock:
+                if self._async_transport is None:
+                    self._async_transport = AsyncTransport(
+                        self.config.get("http_pool_size", 10),
+                    )
+        return self._async_transport
+
+    @property
+    def record_offload(self) -> RecordOffload | None:
+        """Return the worker processes encoding records, if enabled.
+
+        Returns:
+            The tap's record offload, or None to encode records in the tap process.
+        """
+        if not self.config.get("process_workers"):
+            return None
+        if self._record_offload is None:
+            from tap_chargebee.offload import RecordOffload
+
+            with self.message_lock:
+                if self._record_offload is None:
+                    catalog = self.input_catalog
+                    self._record_offload = RecordOffload(
+                        self.config["process_workers"],
+                        dict(self.config),
+                        catalog.to_dict() if catalog is not None else None,
+                    )
+        return self._record_offload
+
+    @property
+    def change_index(self) -> ChangeIndex:
+        """Return the index of the records emitted by streams synced by change.
+
+        Returns:
+            The change index, in `cache_dir`.
+        """
+        if self._change_index is None:
+            from tap_chargebee.change_index import ChangeIndex
+
+            with self.message_lock:
+                if self._change_index is None:
+                    self._change_index = ChangeIndex(
+                        self.cache_dir / "change-index.sqlite",
+                    )
+        return self._change_index
+
+    @property
+    def response_cache(self) -> ResponseCache | None:
+        """Return the cache of API responses shared by every stream, if enabled.
+
+        Returns:
+            The response cache, in `cache_dir`, or None to always send requests.
+        """
+        if not self.config.get("response_cache"):
+            return None
+        if self._response_cache is None:
+            from tap_chargebee.response_cache import ResponseCache
+
+            with self.message_lock:
+                if self._response_cache is None:
+                    self._response_cache = ResponseCache(
+                        self.cache_dir / "responses.sqlite",
+                        ttl=self.config.get("response_cache_ttl_seconds", 300),
+                        max_bytes=self.config.get("response_cache_max_mb", 1024)
+                        * 1024
+                        * 1024,
+                    )
+        return self._response_cache
+
+    def get_event_feed(self, context: dict | None) -> EventFeed:
+        """Return the events feed shared by the event-sourced streams of a site.
+
+        Args:
+            context: The site partition of the streams, None without `sites`.
+
+        Returns:
+            The site's event feed.
+        """
+        from tap_chargebee.events import EventFeed
+
+        key = (context or {}).get(SITE_ID)
+        with self.message_lock:
+            if key not in self._event_feeds:
+                self._event_feeds[key] = EventFeed(self, context)
+            return self._event_feeds[key]
+
+    @property
+    def cache_dir(self) -> Path:
+        """Return the directory of the files cached across runs.
+
+        Returns:
+            The configured `cache_dir`, or the user's cache directory.
+        """
+        if self.config.get("cache_dir"):
+            return Path(self.config["cache_dir"]).expanduser()
+        return default_cache_dir()
+
+    @property
+    def _singer_catalog(self) -> Catalog:
+        """Return the discovered catalog, cached on disk with `discovery_cache`.
+
+        Returns:
+            The catalog of every stream.
+        """
+        if not self.config.get("discovery_cache"):
+            return super()._singer_catalog
+        path = self._catalog_cache_path()
+        cached = read_json_file(path) if path is not None else None
+        if cached is not None:
+            return Catalog.from_dict(cached)
+        catalog = super()._singer_catalog
+        # Custom fields sampled while building the streams are now cached.
+        path = self._catalog_cache_path()
+        if path is None:
+            return catalog
+        try:
+            write_json_file(path, catalog.to_dict())
+        except OSError as ex:
+            self.logger.warning("Could not cache the catalog in %s: %s", path, ex)
+        return catalog
+
+    def _catalog_cache_path(self) -> Path | None:
+        """Return the file caching the discovered catalog.
+
+        Returns:
+            The path, or None if custom fields must be sampled before discovery.
+        """
+        key = (
+            f"{package_fingerprint()}:{self.multi_site}:"
+            f"{self.config.get('change_index', False)}"
+        )
+        if self.config.get("custom_fields_discovery"):
+            custom_fields = read_json_file(self._custom_fields_path()) or {}
+            if not all(
+                self._is_fresh(custom_fields.get(stream_type.name))
+                for stream_type in self.stream_types
+                if stream_type.has_custom_fields
+            ):
+                return None
+            key += ":" + json.dumps(custom_fields, sort_keys=True)
+        digest = hashlib.sha256(key.encode()).hexdigest()[:16]
+        return self.cache_dir / f"catalog-{digest}.json"
+
+    def _custom_fields_path(self) -> Path:
+        """Return the file caching the sampled custom fields of the configured sites.
+
+        Returns:
+            The path.
+        """
+        sites = sorted(
+            (site_id, site.get("api_url")) for site_id, site in self.sites.items()
+        )
+        digest = hashlib.sha256(json.dumps(sites).encode()).hexdigest()[:16]
+        return self.cache_dir / f"custom-fields-{digest}.json"
+
+    def _is_fresh(self, cached: dict | None) -> bool:
+        """Return whether custom fields sampled for a stream can be reused.
+
+        Args:
+            cached: The stream's entry in the custom fields cache, if any.
+
+        Returns:
+            True if the entry is younger than `custom_fields_ttl_hours`.
+        """
+        ttl = self.config.get("custom_fields_ttl_hours", 24) * 60 * 60
+        return cached is not None and time.time() - cached["sampled_at"] < ttl
+
+    def discover_custom_fields(
+        self,
+        stream_list: list[streams.ChargebeeStream],
+    ) -> None:
+        """Add the custom fields of each stream to its schema.
+
+        Streams without custom fields sampled in the last `custom_fields_ttl_hours`
+        are sampled concurrently, and the results cached in `cache_dir`. A stream
+        whose sampling fails keeps its previous sample, if any.
+
+        Args:
+            stream_list: The streams to add custom fields to.
+        """
+        path = self._custom_fields_path()
+        cached = read_json_file(path) or {}
+        stale = [
+            stream
+            for stream in stream_list
+            if stream.has_custom_fields and not self._is_fresh(cached.get(stream.name))
+        ]
+        if stale:
+            from concurrent.futures import ThreadPoolExecutor
+
+            self.logger.info(
+                "Sampling the custom fields of %d streams.",
+                len(stale),
+            )
+            with ThreadPoolExecutor(
+                max_workers=min(len(stale), self.config.get("http_pool_size", 10)),
+                thread_name_prefix=f"{self.name}-sample",
+            ) as executor:
+                sampled = list(
+                    executor.map(lambda stream: stream.sample_custom_fields(), stale),
+                )
+            sampled_at = time.time()
+            for stream, custom_fields in zip(stale, sampled):
+                if custom_fields is not None:
+                    cached[stream.name] = {
+                        "sampled_at": sampled_at,
+                        "custom_fields": custom_fields,
+                    }
+            try:
+                write_json_file(path, cached)
+            except OSError as ex:
+                self.logger.warning(
+                    "Could not cache the custom fields in %s: %s",
+                    path,
+                    ex,
+                )
+        for stream in stream_list:
+            if stream.has_custom_fields and stream.name in cached:
+                stream.add_custom_fields(cached[stream.name]["custom_fields"])
+
     def discover_streams(self) -> list[streams.ChargebeeStream]:
         """Return a list of discovered streams.
 
+        With an input catalog, only the streams it selects are built, along with the
+        parents of selected child streams and, with `event_sourced_sync`, the
+        `events` stream. With `custom_fields_discovery`, their custom fields are
+        added to their schemas.
+
         Returns:
             A list of discovered streams.
         """
-        return [
-            streams.BusinessEntitiesStream(self),
-            streams.CreditNotesStream(self),
-            streams.CouponsStream(self),
-            streams.CustomerStream(self),
-            streams.EventsStream(self),
-            streams.GiftsStream(self),
-            streams.InvoicedUnbilledChargesStream(self),
-            streams.InvoicesStream(self),
-            streams.ItemsStream(self),
-            streams.ItemFamiliesStream(self),
-            streams.ItemPricesStream(self),
-            streams.OrdersStream(self),
-            streams.PaymentSourcesStream(self),
-            streams.PromotionalCreditsStream(self),
-            streams.SubscriptionsStream(self),
-            streams.TransactionStream(self),
-            streams.UnbilledChargesStream(self),
-            streams.VirtualBankAccountsStream(self),
+        stream_types = self.stream_types
+        # Fail early on invalid site settings.
+        self.sites  # noqa: B018
+        unknown = set(self.config.get("filters", {})) - {
+            stream_type.name for stream_type in stream_types
+        }
+        if unknown:
+            names = ", ".join(sorted(unknown))
+            msg = f"Filters configured for unknown streams: {names}."
+            raise ConfigValidationError(msg)
+
+        catalog = self.input_catalog
+        if catalog is None:
+            stream_list = [stream_type(self) for stream_type in stream_types]
+        else:
+            stream_list = [
+                stream_type(self)
+                for stream_type in self._required_stream_types(catalog)
+            ]
+        if self.config.get("custom_fields_discovery"):
+            self.discover_custom_fields(stream_list)
+        return stream_list
+
+    def _required_stream_types(
+        self,
+        catalog: Catalog,
+    ) -> list[type[streams.ChargebeeStream]]:
+        """Return the stream types needed to sync the streams an input catalog selects.
+
+        Args:
+            catalog: The input catalog.
+
+        Returns:
+            The selected stream types, their ancestors and, with
+            `event_sourced_sync`, the `events` stream type.
+        """
+        stream_types = self.stream_types
+        required = set()
+        for stream_type in stream_types:
+            entry = catalog.get_stream(stream_type.name)
+            if entry is not None and entry.metadata.resolve_selection().get((), True):
+                required.add(stream_type)
+        if self.config.get("event_sourced_sync"):
+            required.add(streams.EventsStream)
+        for stream_type in list(required):
+            parent_type = stream_type.parent_stream_type
+            while parent_type is not None:
+                required.add(parent_type)
+                parent_type = parent_type.parent_stream_type
+        return [stream_type for stream_type in stream_types if stream_type in required]
+
+    # `Tap.sync_all` is final; `_sync_all` mirrors its loop for singer-sdk 0.31.1,
+    # which is pinned, and `test_sync_all_mirrors_the_sdk_loop` fails on upgrade.
+    def sync_all(self) -> None:  # type: ignore[misc]
+        """Sync all streams, then write the metrics file if configured."""
+        try:
+            if self.config.get("change_probe"):
+                self.probe_streams()
+            self._sync_all()
+        finally:
+            if self._async_transport is not None:
+                self._async_transport.close()
+                self._async_transport = None
+            if self._record_offload is not None:
+                self._record_offload.close()
+                self._record_offload = None
+            if self._change_index is not None:
+                self._change_index.close()
+                self._change_index = None
+            if self._response_cache is not None:
+                self.logger.info(
+                    "Response cache: %d hits, %d misses.",
+                    self._response_cache.hits,
+                    self._response_cache.misses,
+                )
+                self._response_cache.close()
+                self._response_cache = None
+            if self.config.get("metrics_file"):
+                write_prometheus_file(
+                    self.config["metrics_file"],
+                    {
+                        name: stream.stage_timer
+                        for name, stream in self.streams.items()
+                        if stream.selected
+                    },
+                )
+
+    def probe_streams(self) -> None:
+        """Probe every site partition of the selected top-level streams concurrently."""
+        partitions_to_probe = [
+            (stream, context)
+            for stream in self.streams.values()
+            if stream.selected and not stream.parent_stream_type
+            for context in stream.partitions or [None]
+        ]
+        if not partitions_to_probe:
+            return
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(
+            max_workers=min(
+                len(partitions_to_probe),
+                self.config.get("http_pool_size", 10),
+            ),
+            thread_name_prefix=f"{self.name}-probe",
+        ) as executor:
+            list(
+                executor.map(
+                    lambda partition: partition[0].probe_changes(partition[1]),
+                    partitions_to_probe,
+                ),
+            )
+        unchanged = [
+            stream.name if context is None else f"{stream.name}@{context[SITE_ID]}"
+            for stream, context in partitions_to_probe
+            if context in stream.unchanged_partitions
         ]
+        self.logger.info(
+            "Change probe found %d of %d streams unchanged: %s",
+            len(unchanged),
+            len(partitions_to_probe),
+            ", ".join(unchanged) or "none",
+        )
+
+    def _sync_all(self) -> None:
+        """Sync all streams, running up to `max_workers` streams concurrently.
+
+        The SDK's `Tap.sync_all` loop, with the top-level streams synced on a thread
+        pool; their children are synced by their parents, as in the SDK.
+        """
+        max_workers = self.config.get("max_workers", 1)
+        if max_workers <= 1:
+            super().sync_all()
+            return
+        from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+
+        self._reset_state_progress_markers()
+        self._set_compatible_replication_methods()
+        write_message(StateMessage(value=self.state))
+
+        streams_to_sync = []
+        for stream in self.chargebee_streams.values():
+            if not stream.selected and not stream.has_selected_descendents:
+                self.logger.info("Skipping deselected stream '%s'.", stream.name)
+                continue
+            if stream.parent_stream_type:
+                continue
+            streams_to_sync.append(stream)
+        if self.stream_scheduling:
+            streams_to_sync = self.schedule_streams(streams_to_sync, max_workers)
+
+        self.logger.info(
+            "Syncing %d streams with %d workers.",
+            len(streams_to_sync),
+            max_workers,
+        )
+        with ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix=self.name,
+        ) as executor:
+            futures = [
+                executor.submit(self._sync_stream, stream) for stream in streams_to_sync
+            ]
+            done, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+            for future in not_done:
+                future.cancel()
+            for future in done:
+                future.result()
+
+        for stream in self.chargebee_streams.values():
+            stream.log_sync_costs()
+
+    def schedule_streams(
+        self,
+        streams_to_sync: list[streams.ChargebeeStream],
+        workers: int,
+    ) -> list[streams.ChargebeeStream]:
+        """Order streams longest expected first, and plan time slices of long streams.
+
+        Args:
+            streams_to_sync: The top-level streams to sync.
+            workers: Number of streams synced at once.
+
+        Returns:
+            The streams in the order to sync them.
+        """
+        by_name = {stream.name: stream for stream in streams_to_sync}
+        expected = {
+            stream.name: stream.expected_sync_seconds for stream in streams_to_sync
+        }
+        order, slices = plan_syncs(
+            expected,
+            workers,
+            self.config.get("backfill_workers", 4),
+        )
+        for name, count in slices.items():
+            by_name[name].planned_slices = count
+        self.logger.info(
+            "Stream sync order: %s",
+            ", ".join(
+                name
+                if expected[name] is None
+                else f"{name} (~{expected[name]:.0f}s"
+                + (f", {slices[name]} slices)" if name in slices else ")")
+                for name in order
+            ),
+        )
+        return [by_name[name] for name in order]
+
+    @staticmethod
+    def _sync_stream(stream: streams.ChargebeeStream) -> None:
+        """Sync a single stream and commit its final bookmarks.
+
+        Args:
+            stream: The stream to sync.
+        """
+        stream.sync()
+        stream.finalize_state_progress_markers()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,224 @@
+"""Asynchronous HTTP transport, sending the requests of every stream from one loop."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import queue
+import threading
+from typing import (
+    Any,
+    AsyncIterable,
+    Callable,
+    Coroutine,
+    Iterator,
+    Sequence,
+    TypeVar,
+)
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from tap_chargebee.concurrency import EXHAUSTED, iter_buffer
+from tap_chargebee.parsing import set_response_content
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None  # type: ignore[assignment]
+
+_T = TypeVar("_T")
+
+_PUT_INTERVAL = 0.01
+
+# Transport errors retried like the SDK retries `requests` connection errors.
+RETRIABLE_ERRORS: tuple[type[BaseException], ...] = (
+    (ConnectionResetError, httpx.TransportError)
+    if httpx is not None
+    else (ConnectionResetError,)
+)
+
+
+def to_requests_response(
+    response: httpx.Response,
+    prepared_request: requests.PreparedRequest,
+) -> requests.Response:
+    """Wrap a read `httpx` response so stream methods can handle it unchanged.
+
+    Args:
+        response: The `httpx` response, with its body read.
+        prepared_request: The request the response answers.
+
+    Returns:
+        An equivalent `requests.Response`.
+    """
+    result = requests.Response()
+    result.status_code = response.status_code
+    result.headers = CaseInsensitiveDict(response.headers)
+    result.reason = response.reason_phrase
+    result.url = str(response.url)
+    result.encoding = response.encoding
+    result.elapsed = response.elapsed
+    result.request = prepared_request
+    set_response_content(result, response.content)
+    return result
+
+
+async def _put(buffer: queue.Queue, stop: threading.Event, entry: tuple) -> bool:
+    while not stop.is_set():
+        try:
+            buffer.put_nowait(entry)
+        except queue.Full:
+            await asyncio.sleep(_PUT_INTERVAL)
+            continue
+        return True
+    return False
+
+
+async def _drain(
+    buffer: queue.Queue,
+    stop: threading.Event,
+    index: int,
+    iterable: AsyncIterable,
+    semaphore: asyncio.Semaphore,
+) -> None:
+    async with semaphore:
+        if stop.is_set():
+            return
+        try:
+            async for item in iterable:
+                if not await _put(buffer, stop, (index, item, None)):
+                    return
+        except Exception as ex:  # noqa: BLE001
+            await _put(buffer, stop, (index, None, ex))
+            return
+        await _put(buffer, stop, (index, EXHAUSTED, None))
+
+
+class AsyncTransport:
+    """Sends requests from an asyncio event loop running on a background thread.
+
+    Streams keep processing records on their own threads. Their queries run on the
+    loop as coroutines (see `ChargebeeStream.request_pages_async`), so many streams
+    and backfill time slices can wait on the API at once without a thread each;
+    at most `pool_size` requests are in flight.
+    """
+
+    def __init__(self, pool_size: int = 10) -> None:
+        """Start the event loop and its HTTP client.
+
+        Args:
+            pool_size: Maximum number of connections open to the API.
+
+        Raises:
+            RuntimeError: If `httpx` is not installed.
+        """
+        if httpx is None:
+            msg = "The async transport requires the `async` extra (httpx)."
+            raise RuntimeError(msg)
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self.loop.run_forever,
+            name="tap-chargebee-loop",
+            daemon=True,
+        )
+        self._thread.start()
+        # httpx logs every request at INFO; the SDK already logs request metrics.
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+        self._client: httpx.AsyncClient = self.run(self._create_client(pool_size))
+
+    @staticmethod
+    async def _create_client(pool_size: int) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size,
+            ),
+        )
+
+    def run(self, coroutine: Coroutine[Any, Any, _T]) -> _T:
+        """Run a coroutine on the event loop and wait for its result.
+
+        Args:
+            coroutine: The coroutine.
+
+        Returns:
+            The coroutine's result.
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    async def send(
+        self,
+        prepared_request: requests.PreparedRequest,
+        timeout: float | None,
+    ) -> requests.Response:
+        """Send a prepared request and read its response.
+
+        Args:
+            prepared_request: The request, authenticated and with session headers.
+            timeout: The request timeout in seconds.
+
+        Returns:
+            The response, as a `requests.Response`.
+        """
+        request = self._client.build_request(
+            prepared_request.method or "GET",
+            prepared_request.url or "",
+            headers=dict(prepared_request.headers),
+            content=prepared_request.body,
+            timeout=timeout,
+        )
+        response = await self._client.send(request)
+        return to_requests_response(response, prepared_request)
+
+    def iter_async(
+        self,
+        iterables: Sequence[AsyncIterable[_T]],
+        max_concurrency: int,
+        *,
+        max_buffered: int = 1000,
+        on_exhausted: Callable[[int], None] | None = None,
+    ) -> Iterator[tuple[int, _T]]:
+        """Consume several async iterables on the event loop and yield their items.
+
+        The asynchronous counterpart of `iter_concurrently`: items are yielded on the
+        calling thread in the order they arrive, tagged with the index of the iterable
+        that produced them, and at most `max_buffered` items are held in memory. If
+        any iterable raises, the exception is re-raised on the calling thread and the
+        remaining iterables are cancelled.
+
+        Args:
+            iterables: The async iterables to consume.
+            max_concurrency: Maximum number of iterables consumed at the same time.
+            max_buffered: Maximum number of items waiting to be yielded.
+            on_exhausted: Called on the calling thread with the index of each iterable
+                once all of its items have been yielded.
+
+        Yields:
+            Tuples of (iterable index, item).
+        """
+        buffer: queue.Queue = queue.Queue(maxsize=max_buffered)
+        stop = threading.Event()
+
+        async def drain_all() -> None:
+            semaphore = asyncio.Semaphore(max(1, max_concurrency))
+            await asyncio.gather(
+                *(
+                    _drain(buffer, stop, index, iterable, semaphore)
+                    for index, iterable in enumerate(iterables)
+                ),
+            )
+
+        future = asyncio.run_coroutine_threadsafe(drain_all(), self.loop)
+        try:
+            yield from iter_buffer(buffer, len(iterables), on_exhausted)
+        finally:
+            stop.set()
+            future.cancel()
+
+    def close(self) -> None:
+        """Close the HTTP client and stop the event loop."""
+        self.run(self._client.aclose())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
@@ -0,0 +1,141 @@
+"""End-to-end throughput benchmark of the tap against the local fixture server.
+
+Run with `python -m tests.benchmark`. Each stream, and then a run of every stream,
+is synced in its own subprocess so that peak RSS is measured per run. Extra tap
+settings, for example `--settings '{"max_workers": 4}'`, are applied to every run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+from tests.fixture_server import ChargebeeFixtureServer
+
+ALL_STREAMS = "*"
+
+
+class _RecordCounter:
+    """Stand-in for stdout that counts the RECORD messages written to it."""
+
+    def __init__(self) -> None:
+        self.records = 0
+
+    def write(self, text: str) -> int:
+        self.records += text.count('"type": "RECORD"')
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+
+def _run_child(config: dict, stream_name: str) -> None:
+    """Sync one stream, or all of them, and print the run's measurements."""
+    from tap_chargebee.tap import TapChargebee
+
+    catalog = TapChargebee(config=config, parse_env_config=False).catalog_dict
+    for entry in catalog["streams"]:
+        selected = stream_name in (ALL_STREAMS, entry["tap_stream_id"])
+        for metadata in entry["metadata"]:
+            if not metadata["breadcrumb"]:
+                metadata["metadata"]["selected"] = selected
+    tap = TapChargebee(config=config, catalog=catalog, parse_env_config=False)
+
+    counter = _RecordCounter()
+    stdout, sys.stdout = sys.stdout, counter
+    start = time.perf_counter()
+    try:
+        tap.sync_all()
+    finally:
+        sys.stdout = stdout
+    elapsed = time.perf_counter() - start
+
+    result = {
+        "records": counter.records,
+        "seconds": elapsed,
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+    print(json.dumps(result))  # noqa: T201
+
+
+def _run(server: ChargebeeFixtureServer, config: dict, stream_name: str) -> dict:
+    """Run one benchmark subprocess and return its measurements."""
+    requests_before = sum(server.requests.values())
+    # Runs this module with the interpreter running the tests.
+    process = subprocess.run(
+        [  # noqa: S603
+            sys.executable,
+            "-m",
+            "tests.benchmark",
+            "--child",
+            json.dumps(config),
+            stream_name,
+        ],
+        capture_output=True,
+        check=False,
+        text=True,
+    )
+    if process.returncode:
+        sys.stderr.write(process.stderr)
+        msg = f"Benchmark of {stream_name!r} failed."
+        raise RuntimeError(msg)
+    result = json.loads(process.stdout.splitlines()[-1])
+    result["requests"] = sum(server.requests.values()) - requests_before
+    return result
+
+
+def main() -> None:
+    """Run the benchmark and print a report."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--rate-limit-every", type=int, default=0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--streams", help="Comma-separated streams to benchmark")
+    parser.add_argument("--settings", default="{}", help="Extra tap settings as JSON")
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _run_child(json.loads(args.child[0]), args.child[1])
+        return
+
+    with ChargebeeFixtureServer(
+        args.records,
+        latency=args.latency,
+        rate_limit_every=args.rate_limit_every,
+        retry_after=args.retry_after,
+    ) as server:
+        config = {
+            "api_key": "benchmark",
+            "site_id": "benchmark",
+            "api_url": server.url,
+            "start_date": "2000-01-01T00:00:00Z",
+            **json.loads(args.settings),
+        }
+        from tap_chargebee.tap import TapChargebee
+
+        names = list(TapChargebee(config=config, parse_env_config=False).streams)
+        if args.streams:
+            names = [name for name in names if name in args.streams.split(",")]
+
+        header = f"{'stream':<28}{'records':>9}{'requests':>10}{'seconds':>9}"
+        header += f"{'records/s':>11}{'peak RSS MB':>13}"
+        print(header)  # noqa: T201
+        for name in [*names, ALL_STREAMS]:
+            result = _run(server, config, name)
+            label = "(all streams)" if name == ALL_STREAMS else name
+            print(  # noqa: T201
+                f"{label:<28}{result['records']:>9}{result['requests']:>10}"
+                f"{result['seconds']:>9.2f}"
+                f"{result['records'] / max(result['seconds'], 1e-9):>11.0f}"
+                f"{result['max_rss_mb']:>13.1f}",
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,18 @@
 """Test Configuration."""
 
+from __future__ import annotations
+
+from typing import Iterator
+
+import pytest
+
+from tests.fixture_server import ChargebeeFixtureServer
+
 pytest_plugins = ("singer_sdk.testing.pytest_plugin",)
+
+
+@pytest.fixture()
+def server() -> Iterator[ChargebeeFixtureServer]:
+    """Serve 50 records per stream over the last 30 days."""
+    with ChargebeeFixtureServer(50) as fixture:
+        yield fixture
@@ -0,0 +1,287 @@
+"""Local stand-in for the Chargebee list API, serving generated records."""
+
+from __future__ import annotations
+
+import datetime
+import json
+import threading
+import time
+from collections import Counter
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+from urllib.parse import parse_qsl, urlparse
+
+from tap_chargebee import streams
+from tap_chargebee.client import ChargebeeChildStream, ChargebeeStream
+from tap_chargebee.parsing import envelope_resource
+
+API_PREFIX = "/api/v2"
+#: Number of days the generated replication key values span.
+RECORD_DAYS = 30
+
+
+def _stream_classes() -> list[type[ChargebeeStream]]:
+    return [
+        cls
+        for cls in vars(streams).values()
+        if isinstance(cls, type)
+        and issubclass(cls, ChargebeeStream)
+        and cls is not ChargebeeStream
+        and getattr(cls, "path", None)
+    ]
+
+
+def _is_type(prop: dict, json_type: str) -> bool:
+    types = prop.get("type", [])
+    return json_type in ([types] if isinstance(types, str) else types)
+
+
+def _iso(timestamp: int) -> str:
+    return datetime.datetime.fromtimestamp(
+        timestamp,
+        tz=datetime.timezone.utc,
+    ).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _nested_stream_classes() -> list[type[ChargebeeChildStream]]:
+    return [
+        cls
+        for cls in vars(streams).values()
+        if isinstance(cls, type)
+        and issubclass(cls, ChargebeeChildStream)
+        and cls.parent_array_key
+    ]
+
+
+# Values of each JSON type, from a property name, record index and timestamp.
+_VALUES: tuple[tuple[str, Callable[[str, int, int], object]], ...] = (
+    (
+        "integer",
+        lambda name, index, timestamp: timestamp if name.endswith("_at") else index,
+    ),
+    ("number", lambda _name, index, _timestamp: index * 1.5),
+    ("boolean", lambda _name, index, _timestamp: index % 2 == 0),
+    ("string", lambda name, index, _timestamp: f"{name}-{index}"),
+    ("array", lambda _name, _index, _timestamp: []),
+    ("object", lambda _name, _index, _timestamp: {}),
+)
+
+
+def _value(name: str, prop: dict, index: int, timestamp: int) -> object:
+    # IDs of related resources match the IDs of the records with the same index.
+    if name == "id" or (name.endswith("_id") and _is_type(prop, "string")):
+        return f"{index:08d}"
+    if prop.get("format") == "date-time":
+        return _iso(timestamp)
+    for json_type, value in _VALUES:
+        if _is_type(prop, json_type):
+            return value(name, index, timestamp)
+    return None
+
+
+class _Endpoint:
+    """Generated records of one list endpoint."""
+
+    def __init__(
+        self,
+        stream_class: type[ChargebeeStream],
+        records: int,
+        start: int,
+        end: int,
+    ) -> None:
+        self.resource = envelope_resource(stream_class.records_jsonpath) or ""
+        self.replication_key = stream_class.replication_key
+        properties = stream_class.schema["properties"]
+        step = max(1, (end - start) // max(1, records))
+        self.timestamps = [start + index * step for index in range(records)]
+        self.records = [
+            {
+                name: _value(name, prop, index, timestamp)
+                for name, prop in properties.items()
+            }
+            for index, timestamp in enumerate(self.timestamps)
+        ]
+
+    def page(self, params: dict[str, str]) -> dict:
+        """Return the list response for the given query parameters."""
+        after = before = None
+        if self.replication_key:
+            after = params.get(f"{self.replication_key}[after]")
+            before = params.get(f"{self.replication_key}[before]")
+        matches = {}
+        for name, value in params.items():
+            if name.endswith("[is]"):
+                matches[name[: -len("[is]")]] = {value}
+            elif name.endswith("[in]"):
+                matches[name[: -len("[in]")]] = set(json.loads(value))
+        selected = [
+            record
+            for record, timestamp in zip(self.records, self.timestamps)
+            if (after is None or timestamp > int(after))
+            and (before is None or timestamp < int(before))
+            and all(str(record.get(key)) in values for key, values in matches.items())
+        ]
+        offset = int(params.get("offset") or 0)
+        limit = int(params.get("limit") or 10)
+        body: dict = {
+            "list": [
+                {self.resource: record} if self.resource else record
+                for record in selected[offset : offset + limit]
+            ],
+        }
+        if offset + limit < len(selected):
+            body["next_offset"] = str(offset + limit)
+        return body
+
+
+class ChargebeeFixtureServer:
+    """Serves generated, paginated list responses for every stream path.
+
+    Each endpoint returns `records_per_stream` records whose replication keys are
+    spread over the `RECORD_DAYS` before the server was created, honoring the `limit`,
+    `offset` and `<replication_key>[after]`/`[before]` parameters the tap sends, and
+    `[is]`/`[in]` filters on any field.
+    Every `rate_limit_every`-th request is answered with a 429 and a `Retry-After`
+    header, and every response is delayed by `latency` seconds.
+    """
+
+    def __init__(
+        self,
+        records_per_stream: int = 25,
+        *,
+        latency: float = 0.0,
+        rate_limit_every: int = 0,
+        retry_after: float = 1.0,
+    ) -> None:
+        """Generate the records served by each endpoint.
+
+        Args:
+            records_per_stream: Number of records each endpoint serves.
+            latency: Seconds to wait before answering each request.
+            rate_limit_every: Answer every n-th request with a 429, 0 to disable.
+            retry_after: Value of the `Retry-After` header sent with a 429.
+        """
+        end = int(time.time())
+        start = end - RECORD_DAYS * 24 * 60 * 60
+        self.endpoints = {
+            f"{API_PREFIX}{cls.path}": _Endpoint(cls, records_per_stream, start, end)
+            for cls in _stream_classes()
+        }
+        # Parents embed one record of each of their nested child streams.
+        for cls in _nested_stream_classes():
+            parent = self.endpoints[API_PREFIX + cls.parent_stream_type.path]
+            for index, (record, timestamp) in enumerate(
+                zip(parent.records, parent.timestamps),
+            ):
+                record[cls.parent_array_key] = [
+                    {
+                        name: _value(name, prop, index, timestamp)
+                        for name, prop in cls.schema["properties"].items()
+                        if name != cls.parent_id_key
+                    },
+                ]
+        # Events embed the subscription and customer with the same index.
+        events = self.endpoints[API_PREFIX + "/events"]
+        for index, event in enumerate(events.records):
+            event["content"] = {
+                key: dict(self.endpoints[API_PREFIX + path].records[index])
+                for key, path in (
+                    ("subscription", "/subscriptions"),
+                    ("customer", "/customers"),
+                )
+            }
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.requests: Counter = Counter()
+        # Client addresses of the connections requests were received on.
+        self.connections: set[tuple[str, int]] = set()
+        self._lock = threading.Lock()
+        self._server: ThreadingHTTPServer | None = None
+
+    @property
+    def url(self) -> str:
+        """Return the API URL root to configure the tap with."""
+        if self._server is None:
+            msg = "The fixture server has not been started."
+            raise RuntimeError(msg)
+        return f"http://127.0.0.1:{self._server.server_port}{API_PREFIX}"
+
+    def start(self) -> ChargebeeFixtureServer:
+        """Start serving on a free local port, on a daemon thread.
+
+        Returns:
+            The running server.
+        """
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self) -> None:  # noqa: N802
+                fixture.handle(self)
+
+            def log_message(self, *args: object) -> None:
+                pass
+
+        class Server(ThreadingHTTPServer):
+            # Accept bursts of concurrent connections without SYN retransmits.
+            request_queue_size = 128
+
+        self._server = Server(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> ChargebeeFixtureServer:
+        """Start serving."""
+        return self.start()
+
+    def __exit__(self, *args: object) -> None:
+        """Stop serving."""
+        self.stop()
+
+    def handle(self, handler: BaseHTTPRequestHandler) -> None:
+        """Answer one request."""
+        url = urlparse(handler.path)
+        params = dict(parse_qsl(url.query))
+        with self._lock:
+            self.requests[url.path] += 1
+            self.connections.add(handler.client_address)
+            request_number = sum(self.requests.values())
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        endpoint = self.endpoints.get(url.path)
+        headers = {}
+        if endpoint is None:
+            status, body = HTTPStatus.NOT_FOUND, {"message": "Not found"}
+        elif self.rate_limit_every and request_number % self.rate_limit_every == 0:
+            status = HTTPStatus.TOO_MANY_REQUESTS
+            body = {"api_error_code": "api_request_limit_exceeded"}
+            headers["Retry-After"] = str(self.retry_after)
+        else:
+            try:
+                status, body = HTTPStatus.OK, endpoint.page(params)
+            except ValueError as ex:
+                status = HTTPStatus.BAD_REQUEST
+                body = {"api_error_code": "invalid_request", "message": str(ex)}
+
+        payload = json.dumps(body).encode()
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(payload)))
+        for name, value in headers.items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(payload)
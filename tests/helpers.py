@@ -0,0 +1,99 @@
+"""Helpers running syncs against the fixture server and reading their output."""
+
+from __future__ import annotations
+
+import contextlib
+import datetime
+import io
+import json
+import time
+from typing import TYPE_CHECKING
+
+import requests
+
+from tap_chargebee.tap import TapChargebee
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from tests.fixture_server import ChargebeeFixtureServer
+
+DAY = 24 * 60 * 60
+
+
+def iso(timestamp: int) -> str:
+    """Format a unix timestamp as a Chargebee date-time."""
+    return datetime.datetime.fromtimestamp(
+        timestamp,
+        tz=datetime.timezone.utc,
+    ).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def tap_config(
+    server: ChargebeeFixtureServer,
+    cache_dir: Path,
+    **settings: object,
+) -> dict:
+    """Return a tap config reading from the fixture server, with extra settings."""
+    return {
+        "api_key": "test",
+        "site_id": "test",
+        "api_url": server.url,
+        "start_date": iso(int(time.time()) - 60 * DAY),
+        "cache_dir": str(cache_dir),
+        **settings,
+    }
+
+
+def sync(config: dict, streams: set[str], state: dict | None = None) -> list[dict]:
+    """Sync the given streams and return the Singer messages written."""
+    catalog = TapChargebee(config=config, parse_env_config=False).catalog.to_dict()
+    for entry in catalog["streams"]:
+        for metadata in entry["metadata"]:
+            if metadata["breadcrumb"] == []:
+                metadata["metadata"]["selected"] = entry["tap_stream_id"] in streams
+    tap = TapChargebee(
+        config=config,
+        catalog=catalog,
+        state=state or {},
+        parse_env_config=False,
+    )
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        tap.sync_all()
+    return [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+def records(messages: list[dict], stream: str) -> list[dict]:
+    """Return the records of a stream, in the order they were written."""
+    return [
+        message["record"]
+        for message in messages
+        if message["type"] == "RECORD" and message["stream"] == stream
+    ]
+
+
+def states(messages: list[dict]) -> list[dict]:
+    """Return the values of the STATE messages, in the order they were written."""
+    return [message["value"] for message in messages if message["type"] == "STATE"]
+
+
+def bookmark(state: dict, stream: str) -> dict:
+    """Return the bookmark of a stream in a state, or an empty one."""
+    return state.get("bookmarks", {}).get(stream, {})
+
+
+def response(
+    status_code: int,
+    headers: dict | None = None,
+    elapsed: float = 0.0,
+    body: bytes = b"{}",
+) -> requests.Response:
+    """Return a read API response."""
+    result = requests.Response()
+    result.status_code = status_code
+    result.url = "https://x.chargebee.com/api/v2"
+    result.headers.update(headers or {})
+    result.elapsed = datetime.timedelta(seconds=elapsed)
+    result._content = body  # noqa: SLF001
+    return result
@@ -0,0 +1,68 @@
+"""Tests sending requests from an asyncio event loop with `async_transport`."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from tests.fixture_server import API_PREFIX, ChargebeeFixtureServer
+from tests.helpers import DAY, bookmark, iso, records, states, sync, tap_config
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+pytest.importorskip("httpx")
+
+
+def test_async_sync_matches_sync_transport(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+) -> None:
+    expected = sync(tap_config(server, tmp_path, limit=10), {"customers"})
+    server.requests.clear()
+
+    messages = sync(
+        tap_config(server, tmp_path, limit=10, async_transport=True, prefetch_pages=2),
+        {"customers"},
+    )
+
+    assert records(messages, "customers") == records(expected, "customers")
+    assert (
+        bookmark(states(messages)[-1], "customers")["replication_key_value"]
+        == bookmark(states(expected)[-1], "customers")["replication_key_value"]
+    )
+    assert server.requests[API_PREFIX + "/customers"] == 5
+
+
+def test_async_backfill_requests_every_slice(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+) -> None:
+    config = tap_config(
+        server,
+        tmp_path,
+        async_transport=True,
+        backfill_slice_days=7,
+        backfill_workers=4,
+        start_date=iso(server.endpoints[API_PREFIX + "/customers"].timestamps[0] - DAY),
+    )
+
+    messages = sync(config, {"customers"})
+
+    assert sorted(record["id"] for record in records(messages, "customers")) == [
+        record["id"] for record in server.endpoints[API_PREFIX + "/customers"].records
+    ]
+    assert server.requests[API_PREFIX + "/customers"] == 5
+
+
+def test_async_requests_are_retried_after_rate_limits(tmp_path: Path) -> None:
+    with ChargebeeFixtureServer(30, rate_limit_every=2, retry_after=0.01) as server:
+        messages = sync(
+            tap_config(server, tmp_path, limit=10, async_transport=True),
+            {"customers"},
+        )
+
+        assert len(records(messages, "customers")) == 30
+        # Three pages, and the two rate limited requests retried.
+        assert server.requests[API_PREFIX + "/customers"] == 5
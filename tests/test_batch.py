@@ -0,0 +1,99 @@
+"""Tests writing batch files and BATCH messages with `batch_config`."""
+
+from __future__ import annotations
+
+import gzip
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING
+from urllib.parse import urlparse
+
+import pytest
+
+from tests.fixture_server import API_PREFIX
+from tests.helpers import bookmark, records, states, sync, tap_config
+
+if TYPE_CHECKING:
+    from tests.fixture_server import ChargebeeFixtureServer
+
+
+def _batch_config(root: Path, encoding: dict) -> dict:
+    return {
+        "encoding": encoding,
+        "storage": {"root": root.as_uri(), "prefix": "batch-"},
+        "batch_size": 20,
+    }
+
+
+def _manifest(messages: list[dict], stream: str) -> list[Path]:
+    return [
+        Path(urlparse(url).path)
+        for message in messages
+        if message["type"] == "BATCH" and message["stream"] == stream
+        for url in message["manifest"]
+    ]
+
+
+@pytest.mark.parametrize(
+    ("compression", "suffix"),
+    [("gzip", ".json.gz"), ("none", ".json")],
+)
+def test_jsonl_batches_hold_the_synced_records(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+    compression: str,
+    suffix: str,
+) -> None:
+    expected = sync(tap_config(server, tmp_path), {"customers"})
+    encoding = {"format": "jsonl", "compression": compression}
+    config = tap_config(
+        server,
+        tmp_path,
+        batch_config=_batch_config(tmp_path / "batches", encoding),
+    )
+
+    messages = sync(config, {"customers"})
+
+    files = _manifest(messages, "customers")
+    assert len(files) == 3
+    assert all(path.name.endswith(suffix) for path in files)
+    opener = gzip.open if compression == "gzip" else open
+    batched = []
+    for path in files:
+        with opener(path, "rt") as f:
+            batched.extend(json.loads(line) for line in f)
+    assert [record["id"] for record in batched] == [
+        record["id"] for record in records(expected, "customers")
+    ]
+    assert records(messages, "customers") == []
+    assert (
+        bookmark(states(messages)[-1], "customers")["replication_key_value"]
+        == bookmark(states(expected)[-1], "customers")["replication_key_value"]
+    )
+
+
+def test_parquet_batches_hold_the_synced_records(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+) -> None:
+    parquet = pytest.importorskip("pyarrow.parquet")
+    encoding = {"format": "parquet", "compression": "gzip"}
+    config = tap_config(
+        server,
+        tmp_path,
+        batch_config=_batch_config(tmp_path / "batches", encoding),
+    )
+
+    messages = sync(config, {"customers"})
+
+    files = _manifest(messages, "customers")
+    assert [path.suffix for path in files] == [".parquet"] * 3
+    rows = [
+        row
+        for path in files
+        for row in parquet.read_table(path).to_pylist()  # noqa: PD012
+    ]
+    expected = server.endpoints[API_PREFIX + "/customers"].records
+    assert [row["id"] for row in rows] == [record["id"] for record in expected]
+    # Nested objects and arrays are stored as JSON text.
+    assert json.loads(rows[0]["billing_address"]) == expected[0]["billing_address"]
@@ -0,0 +1,86 @@
+"""Tests the change index, which syncs streams without a reliable replication key."""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+from tap_chargebee.change_index import ChangeIndex, PartitionChanges
+from tests.fixture_server import API_PREFIX
+from tests.helpers import records, states, sync, tap_config
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from tests.fixture_server import ChargebeeFixtureServer
+
+
+def test_change_index_commits_pending_changes_once_acknowledged(
+    tmp_path: Path,
+) -> None:
+    index = ChangeIndex(tmp_path / "index.sqlite")
+    assert index.load("charges", "site", None) == {}
+    index.save("charges", "site", 1, [("a", "1"), ("b", "1")])
+
+    # The target received the state of run 1.
+    assert index.load("charges", "site", 1) == {"a": "1", "b": "1"}
+    index.save("charges", "site", 2, [("a", "2"), ("b", None)])
+    # The target did not receive the state of run 2.
+    assert index.load("charges", "site", 1) == {"a": "1", "b": "1"}
+    index.save("charges", "site", 3, [("a", "2"), ("b", None)])
+    assert index.load("charges", "site", 3) == {"a": "2"}
+    # A state matching no run resets the partition.
+    assert index.load("charges", "site", 1) == {}
+    index.close()
+
+
+def test_partition_changes_compare_records_and_emit_tombstones() -> None:
+    changes = PartitionChanges(
+        {
+            json.dumps(["1"]): "v1",
+            json.dumps(["2"]): "v1",
+            json.dumps(["3"]): "v1",
+        },
+        ["id"],
+    )
+
+    assert not changes.is_changed({"id": "1", "resource_version": "v1"})
+    assert changes.is_changed({"id": "2", "resource_version": "v2"})
+    assert changes.is_changed({"id": "4", "resource_version": "v1"})
+
+    assert changes.tombstones() == [{"id": "3", "deleted": True}]
+    assert (changes.unchanged, changes.deleted) == (1, 1)
+    assert changes.changes == [
+        (json.dumps(["2"]), "v2"),
+        (json.dumps(["4"]), "v1"),
+        (json.dumps(["3"]), None),
+    ]
+
+
+def test_change_index_emits_changes_once_committed(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+) -> None:
+    config = tap_config(server, tmp_path, change_index=True)
+    endpoint = server.endpoints[API_PREFIX + "/unbilled_charges"]
+
+    first = sync(config, {"unbilled_charges"})
+    unchanged = sync(config, {"unbilled_charges"}, states(first)[-1])
+    endpoint.records[0]["unit_amount"] = -1
+    deleted_id = endpoint.records.pop(1)["id"]
+    endpoint.timestamps.pop(1)
+    changed = sync(config, {"unbilled_charges"}, states(unchanged)[-1])
+    # The target never received the state of `changed`: its changes are replayed.
+    replayed = sync(config, {"unbilled_charges"}, states(unchanged)[-1])
+    committed = sync(config, {"unbilled_charges"}, states(replayed)[-1])
+
+    assert len(records(first, "unbilled_charges")) == 50
+    assert records(unchanged, "unbilled_charges") == []
+    for messages in (changed, replayed):
+        updated, tombstone = records(messages, "unbilled_charges")
+        assert updated["id"] == endpoint.records[0]["id"]
+        assert updated["unit_amount"] == -1
+        assert tombstone["id"] == deleted_id
+        assert tombstone["deleted"] is True
+        assert tombstone.get("unit_amount") is None
+    assert records(committed, "unbilled_charges") == []
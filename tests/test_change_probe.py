@@ -0,0 +1,81 @@
+"""Tests probing streams for changes before syncing them with `change_probe`."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from tap_chargebee.client import ChargebeeStream
+from tests.fixture_server import API_PREFIX
+from tests.helpers import bookmark, iso, records, states, sync, tap_config
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from tests.fixture_server import ChargebeeFixtureServer
+
+
+@pytest.fixture()
+def probes(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Record the name of each stream probed."""
+    probed: list[str] = []
+    probe_changes = ChargebeeStream.probe_changes
+
+    def record_probe(stream: ChargebeeStream, context: dict | None = None) -> None:
+        probed.append(stream.name)
+        probe_changes(stream, context)
+
+    monkeypatch.setattr(ChargebeeStream, "probe_changes", record_probe)
+    return probed
+
+
+def test_sync_saves_the_number_of_pages_read(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+) -> None:
+    messages = sync(tap_config(server, tmp_path, limit=10), {"coupons"})
+
+    assert bookmark(states(messages)[-1], "coupons")["last_sync_pages"] == 5
+
+
+def test_change_probe_skips_unchanged_streams(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+    probes: list[str],
+) -> None:
+    config = tap_config(server, tmp_path, limit=10)
+    first = sync(config, {"coupons"})
+    server.requests.clear()
+
+    second = sync({**config, "change_probe": True}, {"coupons"}, states(first)[-1])
+
+    assert probes == ["coupons"]
+    assert records(second, "coupons") == []
+    # The probe is the only request.
+    assert server.requests[API_PREFIX + "/coupons"] == 1
+
+
+def test_change_probe_skips_streams_synced_in_one_page(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+    probes: list[str],
+) -> None:
+    config = tap_config(server, tmp_path, change_probe=True)
+    coupons = server.endpoints[API_PREFIX + "/coupons"]
+    state = {
+        "bookmarks": {
+            "coupons": {
+                "replication_key": "updated_at",
+                "replication_key_value": iso(coupons.timestamps[40]),
+                "last_sync_pages": 1,
+            },
+        },
+    }
+
+    messages = sync(config, {"coupons"}, state)
+
+    assert probes == ["coupons"]
+    assert len(records(messages, "coupons")) == 9
+    # Only the page of changes is requested, without a probe before it.
+    assert server.requests[API_PREFIX + "/coupons"] == 1
@@ -0,0 +1,47 @@
+"""Tests resuming a stream's pagination from a checkpoint."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from tests.helpers import bookmark, records, states, sync, tap_config
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from tests.fixture_server import ChargebeeFixtureServer
+
+
+def test_checkpoint_resumes_from_offset(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+) -> None:
+    config = tap_config(server, tmp_path, limit=10, checkpoint_pages=1)
+    messages = sync(config, {"customers"})
+    checkpoint = next(
+        state
+        for state in states(messages)
+        if bookmark(state, "customers").get("checkpoint", {}).get("offset") == "20"
+    )
+
+    resumed = sync(config, {"customers"}, checkpoint)
+
+    ids = [record["id"] for record in records(messages, "customers")]
+    assert [record["id"] for record in records(resumed, "customers")] == ids[20:]
+    assert "checkpoint" not in bookmark(states(resumed)[-1], "customers")
+
+
+def test_checkpoints_are_written_every_checkpoint_pages(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+) -> None:
+    config = tap_config(server, tmp_path, limit=10, checkpoint_pages=2)
+
+    messages = sync(config, {"customers"})
+
+    offsets = [
+        bookmark(state, "customers")["checkpoint"]["offset"]
+        for state in states(messages)
+        if "checkpoint" in bookmark(state, "customers")
+    ]
+    assert offsets == ["20", "40"]
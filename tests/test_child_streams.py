@@ -0,0 +1,59 @@
+"""Tests syncing child streams in batches of parent records."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from tap_chargebee.client import MAX_PARENT_BATCH
+from tests.fixture_server import API_PREFIX, ChargebeeFixtureServer
+from tests.helpers import records, sync, tap_config
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.mark.parametrize(
+    ("stream", "parent_path", "parent_id_key"),
+    [
+        ("subscription_items", "/subscriptions", "subscription_id"),
+        ("invoice_line_items", "/invoices", "invoice_id"),
+        ("transaction_linked_invoices", "/transactions", "transaction_id"),
+    ],
+)
+def test_nested_child_streams_read_their_parent_records(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+    stream: str,
+    parent_path: str,
+    parent_id_key: str,
+) -> None:
+    messages = sync(tap_config(server, tmp_path), {stream})
+
+    parents = server.endpoints[API_PREFIX + parent_path].records
+    assert [record[parent_id_key] for record in records(messages, stream)] == [
+        parent["id"] for parent in parents
+    ]
+    # The parent stream is not selected, so only children are written.
+    parent_stream = parent_path.lstrip("/")
+    assert records(messages, parent_stream) == []
+    assert server.requests[API_PREFIX + parent_path] == 1
+
+
+def test_endpoint_child_streams_request_batches_of_parents(tmp_path: Path) -> None:
+    parents = MAX_PARENT_BATCH + 20
+    with ChargebeeFixtureServer(parents) as server:
+        messages = sync(
+            tap_config(server, tmp_path),
+            {"subscriptions", "usages"},
+        )
+
+        usages = records(messages, "usages")
+        assert len(records(messages, "subscriptions")) == parents
+        assert sorted(usage["subscription_id"] for usage in usages) == [
+            subscription["id"]
+            for subscription in server.endpoints[API_PREFIX + "/subscriptions"].records
+        ]
+        # One request per batch of parents, rather than one per parent.
+        assert server.requests[API_PREFIX + "/usages"] == 2
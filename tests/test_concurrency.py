@@ -0,0 +1,89 @@
+"""Tests syncing several streams concurrently with `max_workers`."""
+
+from __future__ import annotations
+
+import hashlib
+import inspect
+import textwrap
+import threading
+from typing import TYPE_CHECKING, Iterable
+
+import pytest
+from singer_sdk import Tap
+from singer_sdk.exceptions import FatalAPIError
+
+from tap_chargebee.client import ChargebeeStream
+from tests.fixture_server import API_PREFIX
+from tests.helpers import bookmark, records, states, sync, tap_config
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from tests.fixture_server import ChargebeeFixtureServer
+
+STREAMS = {"customers", "invoices", "coupons", "credit_notes"}
+
+# Digest of `Tap.sync_all` in singer-sdk 0.31.1, mirrored by `TapChargebee._sync_all`.
+SDK_SYNC_ALL_DIGEST = "06c9ff64393383e2f33b1cfff7dc66ee05aba9aa444df5b8dd72e0b2f569c2b4"
+
+
+def test_sync_all_mirrors_the_sdk_loop() -> None:
+    source = textwrap.dedent(inspect.getsource(Tap.sync_all))
+
+    assert hashlib.sha256(source.encode()).hexdigest() == SDK_SYNC_ALL_DIGEST, (
+        "Tap.sync_all changed upstream: update TapChargebee._sync_all to match it, "
+        "then SDK_SYNC_ALL_DIGEST."
+    )
+
+
+def test_concurrent_sync_matches_sequential_sync(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+) -> None:
+    sequential = sync(tap_config(server, tmp_path, max_workers=1), STREAMS)
+
+    concurrent = sync(tap_config(server, tmp_path, max_workers=4), STREAMS)
+
+    for stream in STREAMS:
+        assert records(concurrent, stream) == records(sequential, stream)
+        assert (
+            bookmark(states(concurrent)[-1], stream)["replication_key_value"]
+            == bookmark(states(sequential)[-1], stream)["replication_key_value"]
+        )
+
+
+def test_streams_are_synced_at_the_same_time(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # Every stream waits for another one to start: a sequential sync times out.
+    barrier = threading.Barrier(2, timeout=10)
+    request_records = ChargebeeStream.request_records
+
+    def wait_for_another_stream(
+        stream: ChargebeeStream,
+        context: dict | None,
+    ) -> Iterable[dict]:
+        barrier.wait()
+        return request_records(stream, context)
+
+    monkeypatch.setattr(ChargebeeStream, "request_records", wait_for_another_stream)
+
+    messages = sync(
+        tap_config(server, tmp_path, max_workers=2),
+        {"customers", "coupons"},
+    )
+
+    assert len(records(messages, "customers")) == 50
+    assert len(records(messages, "coupons")) == 50
+
+
+def test_stream_errors_fail_the_concurrent_sync(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+) -> None:
+    del server.endpoints[API_PREFIX + "/coupons"]
+
+    with pytest.raises(FatalAPIError):
+        sync(tap_config(server, tmp_path, max_workers=4), STREAMS)
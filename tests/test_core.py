@@ -1,14 +1,24 @@
 """Tests standard tap features using the built-in SDK tests library."""
 
 import datetime
+import tempfile
 
 from singer_sdk.testing import get_tap_test_class
 
 from tap_chargebee.tap import TapChargebee
+from tests.fixture_server import ChargebeeFixtureServer
+
+FIXTURE_SERVER = ChargebeeFixtureServer().start()
 
 SAMPLE_CONFIG = {
-    "start_date": datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%d"),
-    # TODO: Initialize minimal tap config
+    "api_key": "test",
+    "site_id": "test",
+    "api_url": FIXTURE_SERVER.url,
+    "limit": 10,
+    "cache_dir": tempfile.mkdtemp(),
+    "start_date": (
+        datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=365)
+    ).strftime("%Y-%m-%dT%H:%M:%SZ"),
 }
 
 
@@ -17,6 +27,3 @@ TestTapChargebee = get_tap_test_class(
     tap_class=TapChargebee,
     config=SAMPLE_CONFIG,
 )
-
-
-# TODO: Create additional tests as appropriate for your tap.
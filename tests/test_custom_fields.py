@@ -0,0 +1,88 @@
+"""Tests discovering custom fields from sampled records."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from tap_chargebee.tap import TapChargebee
+from tests.fixture_server import API_PREFIX, ChargebeeFixtureServer
+from tests.helpers import records, sync, tap_config
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.fixture()
+def custom_fields(server: ChargebeeFixtureServer) -> ChargebeeFixtureServer:
+    """Add custom fields and metadata to the customers the server returns."""
+    for index, customer in enumerate(
+        server.endpoints[API_PREFIX + "/customers"].records,
+    ):
+        customer["cf_tier"] = f"tier-{index % 3}"
+        customer["cf_seats"] = index
+        customer["meta_data"] = {"region": "eu"}
+    return server
+
+
+def _customer_properties(config: dict) -> dict:
+    catalog = TapChargebee(config=config, parse_env_config=False).catalog_dict
+    (entry,) = (
+        entry for entry in catalog["streams"] if entry["tap_stream_id"] == "customers"
+    )
+    return entry["schema"]["properties"]
+
+
+def test_custom_fields_are_discovered_and_synced(
+    custom_fields: ChargebeeFixtureServer,
+    tmp_path: Path,
+) -> None:
+    config = tap_config(custom_fields, tmp_path, custom_fields_discovery=True)
+
+    properties = _customer_properties(config)
+    assert properties["cf_tier"] == {"type": ["string", "null"]}
+    assert properties["cf_seats"] == {"type": ["integer", "null"]}
+    assert properties["meta_data"]["properties"] == {
+        "region": {"type": ["string", "null"]},
+    }
+
+    customers = records(sync(config, {"customers"}), "customers")
+    assert [customer["cf_tier"] for customer in customers[:3]] == [
+        "tier-0",
+        "tier-1",
+        "tier-2",
+    ]
+    assert customers[0]["meta_data"] == {"region": "eu"}
+
+
+def test_undiscovered_custom_fields_are_dropped(
+    custom_fields: ChargebeeFixtureServer,
+    tmp_path: Path,
+) -> None:
+    config = tap_config(custom_fields, tmp_path)
+
+    assert "cf_tier" not in _customer_properties(config)
+    customers = records(sync(config, {"customers"}), "customers")
+    assert "cf_tier" not in customers[0]
+
+
+@pytest.mark.parametrize(("ttl_hours", "samples"), [(24, 1), (0, 2)])
+def test_sampled_custom_fields_are_cached(
+    custom_fields: ChargebeeFixtureServer,
+    tmp_path: Path,
+    ttl_hours: int,
+    samples: int,
+) -> None:
+    config = tap_config(
+        custom_fields,
+        tmp_path,
+        custom_fields_discovery=True,
+        custom_fields_ttl_hours=ttl_hours,
+    )
+
+    _customer_properties(config)
+    properties = _customer_properties(config)
+
+    assert "cf_tier" in properties
+    assert custom_fields.requests[API_PREFIX + "/customers"] == samples
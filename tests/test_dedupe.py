@@ -0,0 +1,65 @@
+"""Tests dropping record versions already emitted near the previous bookmark."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from tap_chargebee.dedupe import BoundaryIndex
+from tests.fixture_server import API_PREFIX
+from tests.helpers import DAY, bookmark, records, states, sync, tap_config
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from tests.fixture_server import ChargebeeFixtureServer
+
+
+def test_boundary_index_drops_versions_seen_before() -> None:
+    first = BoundaryIndex(overlap_seconds=10)
+    for key, timestamp in (("a@1", 100), ("b@1", 105), ("c@1", 115)):
+        assert not first.is_duplicate(key)
+        first.add(key, timestamp)
+    assert first.boundary_keys() == ["b@1", "c@1"]
+
+    second = BoundaryIndex(10, first.boundary_keys())
+
+    assert second.is_duplicate("c@1")
+    assert not second.is_duplicate("c@2")
+    assert second.is_duplicate("c@2")
+    assert second.duplicates == 2
+
+
+def test_boundary_index_keeps_previous_keys_without_records() -> None:
+    index = BoundaryIndex(10, ["b@1", "a@1"])
+
+    assert index.boundary_keys() == ["a@1", "b@1"]
+
+
+def test_overlapping_window_drops_emitted_versions(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+) -> None:
+    config = tap_config(server, tmp_path, window_overlap_seconds=10 * DAY)
+    first = sync(config, {"customers"})
+
+    second = sync(config, {"customers"}, states(first)[-1])
+
+    assert len(records(first, "customers")) == 50
+    assert records(second, "customers") == []
+    assert bookmark(states(second)[-1], "customers")["boundary_keys"]
+
+
+def test_overlapping_window_emits_new_versions(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+) -> None:
+    config = tap_config(server, tmp_path, window_overlap_seconds=10 * DAY)
+    first = sync(config, {"customers"})
+    changed = server.endpoints[API_PREFIX + "/customers"].records[-2]
+    changed["resource_version"] += 1000
+
+    second = sync(config, {"customers"}, states(first)[-1])
+
+    assert [record["id"] for record in records(second, "customers")] == [
+        changed["id"],
+    ]
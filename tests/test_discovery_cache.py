@@ -0,0 +1,75 @@
+"""Tests caching the discovered catalog across runs."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from tap_chargebee.tap import TapChargebee
+from tests.helpers import records, sync, tap_config
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from tests.fixture_server import ChargebeeFixtureServer
+
+
+@pytest.fixture()
+def discoveries(monkeypatch: pytest.MonkeyPatch) -> list[int]:
+    """Count the streams built by each call to `TapChargebee.discover_streams`."""
+    calls: list[int] = []
+    discover_streams = TapChargebee.discover_streams
+
+    def spy(self: TapChargebee) -> list:
+        stream_list = discover_streams(self)
+        calls.append(len(stream_list))
+        return stream_list
+
+    monkeypatch.setattr(TapChargebee, "discover_streams", spy)
+    return calls
+
+
+def test_cached_catalog_skips_discovery(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+    discoveries: list[int],
+) -> None:
+    config = tap_config(server, tmp_path, discovery_cache=True)
+
+    catalog = TapChargebee(config=config, parse_env_config=False).catalog_dict
+    assert len(discoveries) == 1
+    assert list(tmp_path.glob("catalog-*.json"))
+
+    cached = TapChargebee(config=config, parse_env_config=False).catalog_dict
+    assert cached == catalog
+    assert len(discoveries) == 1
+
+
+def test_catalog_cache_is_keyed_by_settings(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+    discoveries: list[int],
+) -> None:
+    config = tap_config(server, tmp_path, discovery_cache=True)
+    TapChargebee(config=config, parse_env_config=False)
+    TapChargebee(
+        config={**config, "change_index": True},
+        parse_env_config=False,
+    )
+
+    assert len(discoveries) == 2
+    assert len(list(tmp_path.glob("catalog-*.json"))) == 2
+
+
+def test_sync_with_cached_catalog(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+) -> None:
+    expected = records(sync(tap_config(server, tmp_path), {"customers"}), "customers")
+    config = tap_config(server, tmp_path, discovery_cache=True)
+    sync(config, {"customers"})
+
+    messages = sync(config, {"customers"})
+
+    assert records(messages, "customers") == expected
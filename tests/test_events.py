@@ -0,0 +1,123 @@
+"""Tests event-sourced incremental syncs, reading the events feed once."""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+
+from tests.fixture_server import API_PREFIX
+from tests.helpers import DAY, bookmark, iso, records, states, sync, tap_config
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from tests.fixture_server import ChargebeeFixtureServer
+
+
+def test_event_sourced_sync_reads_the_events_feed(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+) -> None:
+    config = tap_config(server, tmp_path, event_sourced_sync=True)
+    since = int(time.time()) - 10 * DAY
+    state = {
+        "bookmarks": {"subscriptions": {"replication_key_value": iso(since)}},
+    }
+
+    messages = sync(config, {"subscriptions"}, state)
+
+    events = server.endpoints[API_PREFIX + "/events"]
+    assert sorted(record["id"] for record in records(messages, "subscriptions")) == [
+        record["id"]
+        for record, timestamp in zip(events.records, events.timestamps)
+        if timestamp > since
+    ]
+    assert server.requests[API_PREFIX + "/subscriptions"] == 0
+    assert server.requests[API_PREFIX + "/events"] > 0
+
+
+def test_event_feed_is_read_once_with_the_events_stream(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+) -> None:
+    config = tap_config(
+        server,
+        tmp_path,
+        event_sourced_sync=True,
+        filters={
+            "subscriptions": {"id[in]": ["00000045"]},
+            "events": {"id[starts_with]": "0000004"},
+        },
+    )
+    events = server.endpoints[API_PREFIX + "/events"]
+    state = {
+        "bookmarks": {
+            "subscriptions": {"replication_key_value": iso(events.timestamps[30])},
+            "events": {"replication_key_value": events.timestamps[40]},
+        },
+    }
+
+    messages = sync(config, {"subscriptions", "events"}, state)
+
+    assert [record["id"] for record in records(messages, "subscriptions")] == [
+        "00000045",
+    ]
+    assert [record["id"] for record in records(messages, "events")] == [
+        f"{index:08d}" for index in range(41, 50)
+    ]
+    assert server.requests[API_PREFIX + "/events"] == 1
+
+
+def test_event_sourced_entities_without_replication_key_are_requested(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+) -> None:
+    config = tap_config(server, tmp_path, event_sourced_sync=True)
+    events = server.endpoints[API_PREFIX + "/events"]
+    for event in events.records[:48]:
+        del event["content"]["subscription"]["updated_at"]
+    state = {
+        "bookmarks": {
+            "subscriptions": {"replication_key_value": iso(events.timestamps[45])},
+        },
+    }
+
+    messages = sync(config, {"subscriptions"}, state)
+
+    subscriptions = server.endpoints[API_PREFIX + "/subscriptions"]
+    assert [record["id"] for record in records(messages, "subscriptions")] == [
+        f"{index:08d}" for index in range(46, 50)
+    ]
+    assert [record["updated_at"] for record in records(messages, "subscriptions")] == [
+        *subscriptions.timestamps[46:],
+    ]
+    # Only the two incomplete entities are requested, in a single request.
+    assert server.requests[API_PREFIX + "/subscriptions"] == 1
+
+
+def test_quiet_streams_do_not_hold_the_events_feed_back(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+) -> None:
+    # Events embed subscriptions but never coupons, whose bookmark stays old.
+    config = tap_config(server, tmp_path, event_sourced_sync=True, limit=10)
+    events = server.endpoints[API_PREFIX + "/events"]
+    state = {
+        "bookmarks": {
+            "subscriptions": {"replication_key_value": iso(events.timestamps[45])},
+            "coupons": {"replication_key_value": iso(events.timestamps[2])},
+        },
+    }
+    first = sync(config, {"subscriptions", "coupons"}, state)
+    first_requests = server.requests[API_PREFIX + "/events"]
+    server.requests.clear()
+
+    second = sync(config, {"subscriptions", "coupons"}, states(first)[-1])
+
+    coupons = bookmark(states(first)[-1], "coupons")
+    assert coupons["replication_key_value"] == iso(events.timestamps[2])
+    assert coupons["event_cursor"] == events.timestamps[-1]
+    assert first_requests > 1
+    assert server.requests[API_PREFIX + "/events"] == 1
+    assert records(second, "subscriptions") == records(second, "coupons") == []
+    assert server.requests[API_PREFIX + "/coupons"] == 0
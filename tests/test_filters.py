@@ -0,0 +1,54 @@
+"""Tests pushing the configured `filters` down to the list endpoints."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+from singer_sdk.exceptions import ConfigValidationError
+
+from tests.helpers import records, sync, tap_config
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from tests.fixture_server import ChargebeeFixtureServer
+
+
+def test_filters_are_pushed_down(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+) -> None:
+    config = tap_config(
+        server,
+        tmp_path,
+        filters={"customers": {"id[in]": ["00000001", "00000003"]}},
+    )
+
+    messages = sync(config, {"customers"})
+
+    assert [record["id"] for record in records(messages, "customers")] == [
+        "00000001",
+        "00000003",
+    ]
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        {"customers": {"deleted[is]": "true"}},
+        {"customers": {"id[after]": "00000001"}},
+        {"customers": {"id[in]": "00000001"}},
+        {"customers": {"updated_at[after]": "0"}},
+        {"unknown_stream": {"id[is]": "00000001"}},
+    ],
+)
+def test_invalid_filters_are_rejected(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+    filters: dict,
+) -> None:
+    config = tap_config(server, tmp_path, filters=filters)
+
+    with pytest.raises(ConfigValidationError):
+        sync(config, {"customers"})
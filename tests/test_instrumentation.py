@@ -0,0 +1,87 @@
+"""Tests the stage timings logged with `stage_metrics` and written to `metrics_file`."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from tap_chargebee.client import ChargebeeMetric, ChargebeeStream
+from tap_chargebee.instrumentation import Stage
+from tests.helpers import sync, tap_config
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from singer_sdk import metrics
+
+    from tests.fixture_server import ChargebeeFixtureServer
+
+
+@pytest.fixture()
+def points(monkeypatch: pytest.MonkeyPatch) -> list[metrics.Point]:
+    """Collect the metrics logged by streams."""
+    logged: list[metrics.Point] = []
+    monkeypatch.setattr(
+        ChargebeeStream,
+        "_log_metric",
+        lambda _stream, point: logged.append(point),
+    )
+    return logged
+
+
+def test_stage_metrics_log_page_and_stage_durations(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+    points: list[metrics.Point],
+) -> None:
+    sync(tap_config(server, tmp_path, limit=10, stage_metrics=True), {"customers"})
+
+    pages = [point for point in points if point.metric == ChargebeeMetric.PAGE_DURATION]
+    stages = {
+        point.tags["stage"]: point
+        for point in points
+        if point.metric == ChargebeeMetric.STAGE_DURATION
+    }
+    assert [point.tags["records"] for point in pages] == [10] * 5
+    assert set(stages) == {stage.value for stage in Stage}
+    assert stages[Stage.EXTRACT.value].tags["count"] == 50
+    assert stages[Stage.HTTP_WAIT.value].tags["count"] == 5
+
+
+def test_stage_metrics_are_not_logged_by_default(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+    points: list[metrics.Point],
+) -> None:
+    sync(tap_config(server, tmp_path, limit=10), {"customers"})
+
+    assert not [
+        point
+        for point in points
+        if point.metric
+        in (ChargebeeMetric.PAGE_DURATION, ChargebeeMetric.STAGE_DURATION)
+    ]
+
+
+def test_metrics_file_holds_the_stream_timings(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+) -> None:
+    path = tmp_path / "metrics" / "tap.prom"
+
+    sync(
+        tap_config(server, tmp_path, limit=10, metrics_file=str(path)),
+        {"customers", "coupons"},
+    )
+
+    samples = dict(
+        line.rsplit(" ", 1)
+        for line in path.read_text().splitlines()
+        if not line.startswith("#")
+    )
+    for stream in ("customers", "coupons"):
+        assert samples[f'tap_chargebee_records_total{{stream="{stream}"}}'] == "50"
+        assert samples[f'tap_chargebee_pages_total{{stream="{stream}"}}'] == "5"
+        assert float(samples[f'tap_chargebee_sync_seconds{{stream="{stream}"}}']) > 0
+    assert 'tap_chargebee_records_total{stream="invoices"}' not in samples
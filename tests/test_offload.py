@@ -0,0 +1,49 @@
+"""Tests encoding records in worker processes with `process_workers`."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from tap_chargebee.offload import RecordOffload
+from tests.helpers import bookmark, records, states, sync, tap_config
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+    from pathlib import Path
+
+    import pytest
+
+    from tests.fixture_server import ChargebeeFixtureServer
+
+STREAMS = {"customers", "invoices"}
+
+
+def test_offloaded_sync_matches_in_process_sync(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    submitted = []
+    submit = RecordOffload.submit
+
+    def count_pages(
+        offload: RecordOffload,
+        stream_name: str,
+        context: dict | None,
+        body: bytes,
+    ) -> Future:
+        submitted.append(stream_name)
+        return submit(offload, stream_name, context, body)
+
+    monkeypatch.setattr(RecordOffload, "submit", count_pages)
+    expected = sync(tap_config(server, tmp_path, limit=10), STREAMS)
+
+    messages = sync(tap_config(server, tmp_path, limit=10, process_workers=2), STREAMS)
+
+    assert sorted(submitted) == ["customers"] * 5 + ["invoices"] * 5
+    for stream in STREAMS:
+        assert records(messages, stream) == records(expected, stream)
+        assert (
+            bookmark(states(messages)[-1], stream)["replication_key_value"]
+            == bookmark(states(expected)[-1], stream)["replication_key_value"]
+        )
@@ -0,0 +1,56 @@
+"""Tests the default page size and its adaptive tuning."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from tap_chargebee import client
+from tap_chargebee.client import PageSizeTuner
+from tests.fixture_server import API_PREFIX, ChargebeeFixtureServer
+from tests.helpers import records, sync, tap_config
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+
+def test_page_size_tuner_halves_slow_pages_and_doubles_fast_ones() -> None:
+    tuner = PageSizeTuner(maximum=100, target_seconds=1.0, max_bytes=1000)
+
+    assert tuner.update(elapsed=2.0, size_bytes=10)
+    assert tuner.size == 50
+    assert tuner.update(elapsed=0.1, size_bytes=2000)
+    assert tuner.size == 25
+    assert not tuner.update(elapsed=0.5, size_bytes=10)
+    assert tuner.update(elapsed=0.1, size_bytes=10)
+    assert tuner.size == 50
+
+
+def test_streams_request_the_largest_page_size_by_default(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+) -> None:
+    messages = sync(tap_config(server, tmp_path), {"customers"})
+
+    assert len(records(messages, "customers")) == 50
+    assert server.requests[API_PREFIX + "/customers"] == 1
+
+
+def test_adaptive_page_size_shrinks_slow_pages(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    class ImpatientTuner(PageSizeTuner):
+        def __init__(self, maximum: int) -> None:
+            super().__init__(maximum, target_seconds=0.01)
+
+    monkeypatch.setattr(client, "PageSizeTuner", ImpatientTuner)
+
+    with ChargebeeFixtureServer(200, latency=0.02) as server:
+        config = tap_config(server, tmp_path, adaptive_page_size=True)
+        messages = sync(config, {"customers"})
+
+    assert len(records(messages, "customers")) == 200
+    # Pages of 100, 50, 25, 12, 10 and the last 3 records.
+    assert server.requests[API_PREFIX + "/customers"] == 6
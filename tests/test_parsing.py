@@ -0,0 +1,67 @@
+"""Tests decoding list pages, streamed or whole."""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+
+from tap_chargebee.parsing import ListPageParser, read_next_offset
+from tests.helpers import records, sync, tap_config
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from tests.fixture_server import ChargebeeFixtureServer
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 10_000])
+def test_list_page_parser_across_chunk_boundaries(chunk_size: int) -> None:
+    items = [
+        {"customer": {"id": "é-1", "amount": 12345, "rate": 1.5e-3}},
+        {"customer": {"id": "ü-2", "active": True, "meta_data": None}},
+    ]
+    body = json.dumps(
+        {"list": items, "next_offset": '["1", "2"]'},
+        ensure_ascii=False,
+    ).encode()
+    chunks = [body[i : i + chunk_size] for i in range(0, len(body), chunk_size)]
+
+    parser = ListPageParser(chunks)
+
+    assert list(parser) == items
+    assert parser.next_offset == '["1", "2"]'
+
+
+def test_list_page_parser_rejects_non_objects() -> None:
+    with pytest.raises(ValueError, match="Expected"):
+        list(ListPageParser([b"[1, 2]"]))
+
+
+@pytest.mark.parametrize(
+    ("body", "next_offset"),
+    [
+        (b'{"list": [{"a": 1}], "next_offset": "[\\"1\\"]"}', '["1"]'),
+        (b'{"list": [{"next_offset": "x"}]}', None),
+        (b'{"next_offset": "1", "list": []}', "1"),
+    ],
+)
+def test_read_next_offset(body: bytes, next_offset: str | None) -> None:
+    assert read_next_offset(body) == next_offset
+
+
+def test_streamed_pages_decode_like_whole_pages(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+) -> None:
+    whole = sync(tap_config(server, tmp_path, limit=20), {"customers", "invoices"})
+
+    streamed = sync(
+        tap_config(server, tmp_path, limit=20, stream_json_parsing=True),
+        {"customers", "invoices"},
+    )
+
+    for stream in ("customers", "invoices"):
+        assert len(records(streamed, stream)) == 50
+        assert records(streamed, stream) == records(whole, stream)
@@ -0,0 +1,63 @@
+"""Tests prefetching pages on a background thread with `prefetch_pages`."""
+
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING
+
+from tap_chargebee.client import ChargebeeStream
+from tests.fixture_server import API_PREFIX
+from tests.helpers import bookmark, records, states, sync, tap_config
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+    import requests
+
+    from tests.fixture_server import ChargebeeFixtureServer
+
+
+def test_prefetched_sync_matches_sequential_sync(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+) -> None:
+    sequential = sync(tap_config(server, tmp_path, limit=10), {"customers"})
+    sequential_requests = server.requests[API_PREFIX + "/customers"]
+    server.requests.clear()
+
+    prefetched = sync(
+        tap_config(server, tmp_path, limit=10, prefetch_pages=2),
+        {"customers"},
+    )
+
+    assert records(prefetched, "customers") == records(sequential, "customers")
+    assert (
+        bookmark(states(prefetched)[-1], "customers")["replication_key_value"]
+        == bookmark(states(sequential)[-1], "customers")["replication_key_value"]
+    )
+    assert server.requests[API_PREFIX + "/customers"] == sequential_requests == 5
+
+
+def test_pages_are_requested_on_a_background_thread(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    threads = set()
+    send = ChargebeeStream._request  # noqa: SLF001
+
+    def record_thread(
+        stream: ChargebeeStream,
+        prepared_request: requests.PreparedRequest,
+        context: dict | None,
+    ) -> requests.Response:
+        threads.add(threading.current_thread())
+        return send(stream, prepared_request, context)
+
+    monkeypatch.setattr(ChargebeeStream, "_request", record_thread)
+
+    sync(tap_config(server, tmp_path, limit=10, prefetch_pages=2), {"customers"})
+
+    assert threads
+    assert threading.main_thread() not in threads
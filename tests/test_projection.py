@@ -0,0 +1,88 @@
+"""Tests projecting records onto the properties selected in the catalog."""
+
+from __future__ import annotations
+
+from tap_chargebee.projection import compile_projection, project
+
+
+def test_projection_drops_deselected_properties() -> None:
+    schema = {
+        "properties": {
+            "id": {"type": "string"},
+            "billing_address": {
+                "type": "object",
+                "properties": {"city": {"type": "string"}, "line1": {"type": "string"}},
+            },
+            "email": {"type": "string"},
+        },
+    }
+    mask = {
+        ("properties", "email"): False,
+        ("properties", "billing_address", "properties", "line1"): False,
+    }
+    record = {
+        "id": "1",
+        "email": "a@b.c",
+        "billing_address": {"city": "Paris", "line1": "1 rue"},
+        "unknown": 1,
+    }
+
+    projection = compile_projection(schema, mask)
+
+    assert projection is not None
+    assert project(record, projection) == {
+        "id": "1",
+        "billing_address": {"city": "Paris"},
+        "unknown": 1,
+    }
+    assert "email" in record
+
+
+def test_projection_is_none_when_every_property_is_selected() -> None:
+    schema = {"properties": {"id": {"type": "string"}}}
+
+    assert compile_projection(schema, {("properties", "id"): True}) is None
+
+
+def test_projection_keeps_properties_missing_from_the_schema() -> None:
+    schema = {"properties": {"id": {"type": "string"}, "email": {"type": "string"}}}
+    projection = compile_projection(schema, {("properties", "email"): False})
+    record = {"id": "1", "email": "a@b.c", "cf_plan_tier": "gold", "meta": {"a": 1}}
+
+    assert projection == {"email": None}
+    assert project(record, projection) == {
+        "id": "1",
+        "cf_plan_tier": "gold",
+        "meta": {"a": 1},
+    }
+
+
+def test_projection_prunes_array_items() -> None:
+    schema = {
+        "properties": {
+            "id": {"type": "string"},
+            "line_items": {
+                "type": ["array", "null"],
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "id": {"type": "string"},
+                        "amount": {"type": "integer"},
+                    },
+                },
+            },
+        },
+    }
+    mask = {("properties", "line_items", "items", "properties", "amount"): False}
+    record = {
+        "id": "1",
+        "line_items": [{"id": "a", "amount": 10, "cf_note": "x"}, None],
+    }
+
+    projection = compile_projection(schema, mask)
+
+    assert projection == {"line_items": {"amount": None}}
+    assert project(record, projection) == {
+        "id": "1",
+        "line_items": [{"id": "a", "cf_note": "x"}, None],
+    }
@@ -0,0 +1,68 @@
+"""Tests pacing requests with the shared, adaptive rate limiter."""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+
+from tap_chargebee.client import RateLimiter
+from tests.fixture_server import ChargebeeFixtureServer
+from tests.helpers import records, response, sync, tap_config
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_rate_limiter_halves_once_per_episode() -> None:
+    limiter = RateLimiter(requests_per_minute=600)
+
+    limiter.update(response(429))
+    # Sent before the decrease, at the old rate.
+    limiter.update(response(429, elapsed=1.0))
+
+    assert limiter.rate == 5
+
+
+def test_rate_limiter_ignores_429s_during_retry_after_pause() -> None:
+    limiter = RateLimiter(requests_per_minute=600)
+
+    limiter.update(response(429, {"Retry-After": "60"}))
+    limiter.update(response(429))
+
+    assert limiter.is_paused()
+    assert limiter.rate == 5
+
+
+def test_rate_limiter_recovers_linearly() -> None:
+    limiter = RateLimiter(requests_per_minute=600)
+    limiter.update(response(429))
+
+    for _ in range(RateLimiter.RECOVERY_RESPONSES // 2):
+        limiter.update(response(200))
+
+    assert limiter.rate == pytest.approx(10)
+
+
+def test_rate_limiter_follows_rate_limit_headers() -> None:
+    limiter = RateLimiter(requests_per_minute=600)
+
+    limiter.update(
+        response(200, {"X-RateLimit-Remaining": "30", "X-RateLimit-Reset": "60"}),
+    )
+
+    assert limiter.rate == 0.5
+
+
+def test_sync_completes_under_rate_limiting(tmp_path: Path) -> None:
+    with ChargebeeFixtureServer(50, rate_limit_every=5, retry_after=0.01) as server:
+        config = tap_config(server, tmp_path, backfill_slice_days=1, limit=10)
+        started = time.monotonic()
+        messages = sync(config, {"customers", "invoices"})
+        elapsed = time.monotonic() - started
+
+    assert len(records(messages, "customers")) == 50
+    assert len(records(messages, "invoices")) == 50
+    # Without a rate limit, the same sync finishes in well under a second.
+    assert elapsed < 15
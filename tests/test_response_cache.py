@@ -0,0 +1,116 @@
+"""Tests the on-disk cache of API responses."""
+
+from __future__ import annotations
+
+import zlib
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+
+import pytest
+import requests
+
+from tap_chargebee import response_cache
+from tap_chargebee.response_cache import ResponseCache
+from tests.fixture_server import API_PREFIX
+from tests.helpers import records, response, sync, tap_config
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from tests.fixture_server import ChargebeeFixtureServer
+
+
+def _request(url: str) -> requests.PreparedRequest:
+    return requests.Request("GET", url).prepare()
+
+
+@pytest.fixture()
+def clock(monkeypatch: pytest.MonkeyPatch) -> SimpleNamespace:
+    """Replace the response cache's clock with one advanced by hand."""
+    clock = SimpleNamespace(now=1_000_000.0)
+    clock.time = lambda: clock.now
+    monkeypatch.setattr(response_cache, "time", clock)
+    return clock
+
+
+def test_response_cache_expires_after_ttl(
+    tmp_path: Path,
+    clock: SimpleNamespace,
+) -> None:
+    cache = ResponseCache(tmp_path / "cache.sqlite", ttl=60, max_bytes=1 << 20)
+    recent = _request("https://x.chargebee.com/api/v2/customers?limit=100")
+    historical = _request(
+        "https://x.chargebee.com/api/v2/customers?updated_at[before]=1000",
+    )
+    cache.put(recent, response(200, body=b'{"list": []}'))
+    cache.put(historical, response(200, body=b'{"list": [1]}'))
+
+    clock.now += 30
+    hit = cache.get(recent)
+    clock.now += 31
+
+    assert hit is not None
+    assert hit.json() == {"list": []}
+    assert cache.get(recent) is None
+    assert cache.get(historical) is not None
+    assert (cache.hits, cache.misses) == (2, 1)
+    cache.close()
+
+
+def test_response_cache_keys_ignore_query_order(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path / "cache.sqlite", ttl=60, max_bytes=1 << 20)
+    cache.put(_request("https://x/api?a=1&b=2"), response(200))
+
+    assert cache.get(_request("https://x/api?b=2&a=1")) is not None
+    cache.close()
+
+
+def test_response_cache_keys_include_credentials(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path / "cache.sqlite", ttl=60, max_bytes=1 << 20)
+    cached = requests.Request("GET", "https://x/api", auth=("key-a", "")).prepare()
+    cache.put(cached, response(200))
+
+    other = requests.Request("GET", "https://x/api", auth=("key-b", "")).prepare()
+    same = requests.Request("GET", "https://x/api", auth=("key-a", "")).prepare()
+    assert cache.get(other) is None
+    assert cache.get(same) is not None
+    cache.close()
+
+
+def test_response_cache_evicts_least_recently_used(
+    tmp_path: Path,
+    clock: SimpleNamespace,
+) -> None:
+    bodies = {name: name.encode() * 100 for name in ("a", "b", "c")}
+    size = max(len(zlib.compress(body)) for body in bodies.values())
+    cache = ResponseCache(tmp_path / "cache.sqlite", ttl=60, max_bytes=2 * size)
+    for name in ("a", "b"):
+        clock.now += 1
+        cache.put(_request(f"https://x/{name}"), response(200, body=bodies[name]))
+    clock.now += 1
+    cache.get(_request("https://x/a"))
+
+    clock.now += 1
+    cache.put(_request("https://x/c"), response(200, body=bodies["c"]))
+
+    assert cache.get(_request("https://x/b")) is None
+    assert cache.get(_request("https://x/a")) is not None
+    assert cache.get(_request("https://x/c")) is not None
+    cache.close()
+
+
+def test_sync_replays_cached_responses_for_the_same_credentials(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+) -> None:
+    config = tap_config(server, tmp_path, response_cache=True)
+    sync(config, {"coupons"})
+    requests_sent = server.requests[API_PREFIX + "/coupons"]
+
+    replayed = sync(config, {"coupons"})
+    replayed_requests = server.requests[API_PREFIX + "/coupons"]
+    sync({**config, "api_key": "other"}, {"coupons"})
+
+    assert len(records(replayed, "coupons")) == 50
+    assert replayed_requests == requests_sent
+    assert server.requests[API_PREFIX + "/coupons"] == 2 * requests_sent
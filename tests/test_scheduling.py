@@ -0,0 +1,67 @@
+"""Tests scheduling streams across workers from their sync history."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from tap_chargebee.scheduling import plan_syncs
+from tests.helpers import bookmark, states, sync, tap_config
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from tests.fixture_server import ChargebeeFixtureServer
+
+
+def test_plan_syncs_orders_longest_first_and_splits_dominant_streams() -> None:
+    order, slices = plan_syncs(
+        {"invoices": 600.0, "customers": 60.0, "coupons": 1.0, "new": None},
+        workers=4,
+        max_slices=4,
+    )
+
+    assert order == ["new", "invoices", "customers", "coupons"]
+    # 661 seconds over 4 workers: invoices dominates, split to fit ~165 seconds.
+    assert slices == {"invoices": 4}
+
+
+def test_plan_syncs_keeps_balanced_streams_whole() -> None:
+    order, slices = plan_syncs(
+        {"invoices": 10.0, "customers": 10.0},
+        workers=2,
+        max_slices=4,
+    )
+
+    assert order == ["invoices", "customers"]
+    assert slices == {}
+
+
+def test_plan_syncs_caps_slices() -> None:
+    _, slices = plan_syncs({"invoices": 1000.0, "coupons": 1.0}, 8, max_slices=2)
+
+    assert slices == {"invoices": 2}
+
+
+@pytest.mark.parametrize(
+    ("settings", "recorded"),
+    [
+        ({"max_workers": 2}, True),
+        ({"max_workers": 2, "stream_scheduling": False}, False),
+        ({}, False),
+    ],
+)
+def test_sync_history_is_recorded_for_stream_scheduling(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+    settings: dict,
+    recorded: bool,  # noqa: FBT001
+) -> None:
+    config = tap_config(server, tmp_path, **settings)
+
+    messages = sync(config, {"customers", "invoices"})
+
+    state = states(messages)[-1]
+    for stream in ("customers", "invoices"):
+        assert ("sync_history" in bookmark(state, stream)) is recorded
@@ -0,0 +1,44 @@
+"""Tests sharing one pooled, keep-alive HTTP session across streams."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from tap_chargebee.tap import TapChargebee
+from tests.fixture_server import API_PREFIX
+from tests.helpers import records, sync, tap_config
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from tests.fixture_server import ChargebeeFixtureServer
+
+
+def test_streams_share_one_pooled_session(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+) -> None:
+    tap = TapChargebee(
+        config=tap_config(server, tmp_path, http_pool_size=3),
+        parse_env_config=False,
+    )
+
+    sessions = {id(stream.requests_session) for stream in tap.streams.values()}
+
+    assert sessions == {id(tap.requests_session)}
+    adapter = tap.requests_session.get_adapter(server.url)
+    assert adapter.poolmanager.connection_pool_kw["maxsize"] == 3
+
+
+def test_pages_reuse_a_keep_alive_connection(
+    server: ChargebeeFixtureServer,
+    tmp_path: Path,
+) -> None:
+    config = tap_config(server, tmp_path, limit=10, http_pool_size=2)
+
+    messages = sync(config, {"customers", "coupons"})
+
+    assert len(records(messages, "customers")) == 50
+    assert len(records(messages, "coupons")) == 50
+    assert server.requests[API_PREFIX + "/customers"] == 5
+    assert len(server.connections) == 1
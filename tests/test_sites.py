@@ -0,0 +1,74 @@
+"""Tests syncing several Chargebee sites in one run with `sites`."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Iterator
+
+import pytest
+
+from tests.fixture_server import API_PREFIX, ChargebeeFixtureServer
+from tests.helpers import records, states, sync, tap_config
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.fixture()
+def other_server() -> Iterator[ChargebeeFixtureServer]:
+    """Serve a second site, with 20 records per stream."""
+    with ChargebeeFixtureServer(20) as fixture:
+        yield fixture
+
+
+def _sites_config(
+    server: ChargebeeFixtureServer,
+    other_server: ChargebeeFixtureServer,
+    tmp_path: Path,
+) -> dict:
+    config = tap_config(server, tmp_path)
+    del config["site_id"], config["api_key"], config["api_url"]
+    config["sites"] = [
+        {"site_id": "acme-eu", "api_key": "eu", "api_url": server.url},
+        {"site_id": "acme-us", "api_key": "us", "api_url": other_server.url},
+    ]
+    return config
+
+
+def test_records_are_tagged_with_their_site(
+    server: ChargebeeFixtureServer,
+    other_server: ChargebeeFixtureServer,
+    tmp_path: Path,
+) -> None:
+    messages = sync(_sites_config(server, other_server, tmp_path), {"customers"})
+
+    sites = [record["site_id"] for record in records(messages, "customers")]
+    assert sorted(sites) == ["acme-eu"] * 50 + ["acme-us"] * 20
+    assert server.requests[API_PREFIX + "/customers"] == 1
+    assert other_server.requests[API_PREFIX + "/customers"] == 1
+    schema = next(
+        message
+        for message in messages
+        if message["type"] == "SCHEMA" and message["stream"] == "customers"
+    )
+    assert schema["key_properties"] == ["id", "site_id"]
+
+
+def test_each_site_keeps_its_own_bookmark(
+    server: ChargebeeFixtureServer,
+    other_server: ChargebeeFixtureServer,
+    tmp_path: Path,
+) -> None:
+    config = _sites_config(server, other_server, tmp_path)
+    first = sync(config, {"customers"})
+    server.requests.clear()
+    other_server.requests.clear()
+
+    second = sync(config, {"customers"}, states(first)[-1])
+
+    partitions = states(first)[-1]["bookmarks"]["customers"]["partitions"]
+    assert sorted(partition["context"]["site_id"] for partition in partitions) == [
+        "acme-eu",
+        "acme-us",
+    ]
+    assert all(partition["replication_key_value"] for partition in partitions)
+    assert records(second, "customers") == []